@@ -0,0 +1,217 @@
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from entities.expense_batch import ExpenseBatch
+from repository import exporter
+from repository.dates import DateLike
+from repository.repository import Repository
+
+# datetime.date(1970, 1, 1).toordinal(), to move ordinals onto NumPy's epoch.
+EPOCH_ORDINAL = 719163
+
+
+class MonthChange(NamedTuple):
+    """Monthly totals and their change from the month before."""
+
+    months: np.ndarray
+    totals: np.ndarray
+    deltas: np.ndarray
+    ratios: np.ndarray
+
+
+class ColumnFile(NamedTuple):
+    """The memory-mapped columns of an export and its dictionaries."""
+
+    columns: dict[str, np.ndarray]
+    tags: dict[int, str]
+    currencies: list[str]
+
+    def name(self, index: int) -> str:
+        """Decode the name of the expense at row 'index'."""
+
+        start, end = self.columns["name_offsets"][index : index + 2]
+        return self.columns["names"][start:end].tobytes().decode()
+
+
+def load_columns(path: Union[str, Path]) -> ColumnFile:
+    """Map a file written by exporter.write_columns without reading it.
+
+    The file is mapped once, read-only, and every column is a view into it,
+    so pages are only loaded as the arrays are touched.
+    """
+
+    header = exporter.read_header(path)
+    mapped = np.memmap(path, mode="r")
+    columns = {
+        name: np.frombuffer(
+            mapped,
+            dtype=np.dtype(column["type"]).newbyteorder("<"),
+            count=column["length"],
+            offset=column["offset"],
+        )
+        for name, column in header["columns"].items()
+    }
+    tags = {int(id): name for id, name in header["tags"].items()}
+    return ColumnFile(columns, tags, header["currencies"])
+
+
+class Analytics:
+    """Vectorized spending analytics over a columnar snapshot of the ledger.
+
+    The snapshot is loaded once into contiguous arrays; every method then works
+    on whole arrays with NumPy instead of looping over Expense objects.
+    """
+
+    def __init__(self, batch: ExpenseBatch) -> None:
+        """Wrap the batch columns as NumPy arrays without copying them."""
+
+        self._use(
+            *(
+                np.frombuffer(column, dtype=column.typecode)
+                for column in (
+                    batch.ids,
+                    batch.costs,
+                    batch.days,
+                    batch.tag_offsets,
+                    batch.tag_ids,
+                )
+            )
+        )
+
+    def _use(
+        self,
+        ids: np.ndarray,
+        costs: np.ndarray,
+        days: np.ndarray,
+        tag_offsets: np.ndarray,
+        tag_ids: np.ndarray,
+    ) -> None:
+        self.ids = ids
+        self.costs = costs
+        self.days = days
+        self.tag_ids = tag_ids
+        # Row index of every tag link, so per-tag work is a gather of costs.
+        self.tag_rows = np.repeat(np.arange(len(ids)), np.diff(tag_offsets))
+
+    @classmethod
+    def from_repository(
+        cls,
+        db: Repository,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> "Analytics":
+        """Load expenses, optionally within [start, end), from the database."""
+
+        return cls(db.get_batch(start, end))
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "Analytics":
+        """Memory-map a columnar export instead of querying the database."""
+
+        columns = load_columns(path).columns
+        analytics = cls.__new__(cls)
+        analytics._use(
+            columns["ids"],
+            columns["costs"],
+            columns["days"],
+            columns["tag_offsets"],
+            columns["tag_ids"],
+        )
+        return analytics
+
+    def daily_totals(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return every day from first to last expense and its total spend.
+
+        Expenses without a readable date are left out.
+        """
+
+        days, costs = self._dated()
+        if not len(days):
+            return np.array([], dtype="datetime64[D]"), np.array([])
+        first = days.min()
+        totals = np.bincount(days - first, weights=costs)
+        dates = np.arange(len(totals)) + (first - EPOCH_ORDINAL)
+        return dates.astype("datetime64[D]"), totals
+
+    def _dated(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return days and costs of the expenses with a readable date.
+
+        get_batch and the columnar export store day 0 for missing or
+        unparseable dates. Left in, one such legacy row would stretch every
+        series back to year 1.
+        """
+
+        dated = self.days > 0
+        if dated.all():
+            return self.days, self.costs
+        return self.days[dated], self.costs[dated]
+
+    def rolling_spend(self, window: int = 30) -> tuple[np.ndarray, np.ndarray]:
+        """Return each day and the total spent over the 'window' days ending on it."""
+
+        dates, totals = self.daily_totals()
+        cumulative = np.concatenate(([0.0], np.cumsum(totals)))
+        start = np.maximum(np.arange(1, len(cumulative)) - window, 0)
+        return dates, cumulative[1:] - cumulative[start]
+
+    def month_over_month(self) -> MonthChange:
+        """Return monthly totals with the change from the previous month.
+
+        Months without expenses inside the range are included with a total of
+        zero. 'ratios' is the relative change, NaN where the previous month is
+        zero; the first month has no predecessor and gets NaN for both.
+        Expenses without a readable date are left out.
+        """
+
+        days, costs = self._dated()
+        days = (days - EPOCH_ORDINAL).astype("datetime64[D]")
+        months = days.astype("datetime64[M]").astype(np.int64)
+        if not len(months):
+            empty = np.array([])
+            return MonthChange(empty.astype("datetime64[M]"), empty, empty, empty)
+        first = months.min()
+        totals = np.bincount(months - first, weights=costs)
+        labels = (np.arange(len(totals)) + first).astype("datetime64[M]")
+        previous = np.concatenate(([np.nan], totals[:-1]))
+        deltas = totals - previous
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(previous != 0, deltas / previous, np.nan)
+        return MonthChange(labels, totals, deltas, ratios)
+
+    def tag_percentiles(
+        self, percentiles: tuple[float, ...] = (50, 90, 99)
+    ) -> dict[int, np.ndarray]:
+        """Return the requested cost percentiles for every tag id.
+
+        Links are sorted by tag once, so the loop runs per tag rather than per
+        expense.
+        """
+
+        costs = self.costs[self.tag_rows]
+        order = np.argsort(self.tag_ids, kind="stable")
+        sorted_tags = self.tag_ids[order]
+        sorted_costs = costs[order]
+        tags, starts = np.unique(sorted_tags, return_index=True)
+        ends = np.append(starts[1:], len(sorted_tags))
+        return {
+            int(tag): np.percentile(sorted_costs[start:end], percentiles)
+            for tag, start, end in zip(tags, starts, ends)
+        }
+
+    def outliers(self, threshold: float = 3.5) -> np.ndarray:
+        """Return ids of unusually expensive expenses by modified z-score.
+
+        Unlike a fixed cost cut-off, the median and median absolute deviation
+        adapt to the ledger, so the same threshold works for any spending level.
+        """
+
+        if not len(self.costs):
+            return self.ids[:0]
+        median = np.median(self.costs)
+        deviation = np.median(np.abs(self.costs - median))
+        if deviation == 0:
+            return self.ids[self.costs > median]
+        scores = 0.6745 * (self.costs - median) / deviation
+        return self.ids[scores > threshold]
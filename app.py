@@ -1,18 +1,39 @@
+import logging
+import os
 import tkinter as tk
 
 from components.ReadoutBox import ReadoutBox
 from components.InputBox import InputBox
-from repository.repository import Repository
+from repository.worker import RepositoryWorker
+
+# EXPENSES_LOG_LEVEL sets the logging level, e.g. DEBUG or INFO.
+# EXPENSES_PROFILE logs a Repository profile every that many seconds.
+LOG_LEVEL = os.environ.get("EXPENSES_LOG_LEVEL", "WARNING").upper()
+PROFILE_SECONDS = os.environ.get("EXPENSES_PROFILE")
+
+
+def profile(db: RepositoryWorker, seconds: float) -> None:
+    """Instrument the worker's Repository and log its profile periodically."""
+
+    from repository.instrumentation import Instrumentation
+
+    db.submit(lambda repository: Instrumentation(repository).dump_every(seconds))
 
 
 def main() -> None:
     """Set up interactive window."""
+    logging.basicConfig(
+        level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
     root = tk.Tk()
-    db = Repository()
+    db = RepositoryWorker(root)
+    if PROFILE_SECONDS:
+        profile(db, float(PROFILE_SECONDS))
     InputBox(root, db).pack(side="left")
     ReadoutBox(root, db).pack(side="right")
     root.title("Expenses Tracker")
     root.mainloop()
+    db.close()
 
 
 if __name__ == "__main__":
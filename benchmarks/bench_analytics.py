@@ -0,0 +1,94 @@
+"""Compare the NumPy analytics module with pure-Python loops over Expenses.
+
+Run from the project root: python -m benchmarks.bench_analytics
+"""
+import statistics
+from collections import defaultdict
+from datetime import date
+
+from analytics.analytics import Analytics
+from constants import Lookup
+from entities.expense import Expense
+from repository.repository import Repository
+from benchmarks.common import populate, timed
+
+
+def python_rolling_spend(expenses: list[Expense], window: int = 30) -> list[float]:
+    daily: dict[int, float] = defaultdict(float)
+    for expense in expenses:
+        daily[date.fromisoformat(expense.date).toordinal()] += expense.cost
+    first, last = min(daily), max(daily)
+    rolling = []
+    running = 0.0
+    for day in range(first, last + 1):
+        running += daily.get(day, 0.0) - daily.get(day - window, 0.0)
+        rolling.append(running)
+    return rolling
+
+
+def python_month_over_month(expenses: list[Expense]) -> list[float]:
+    totals: dict[str, float] = defaultdict(float)
+    for expense in expenses:
+        totals[expense.date[:7]] += expense.cost
+    months = sorted(totals)
+    return [totals[b] - totals[a] for a, b in zip(months, months[1:])]
+
+
+def python_tag_percentiles(expenses: list[Expense]) -> dict[str, list[float]]:
+    costs: dict[str, list[float]] = defaultdict(list)
+    for expense in expenses:
+        for tag in expense.tags:
+            costs[tag].append(expense.cost)
+    return {
+        tag: statistics.quantiles(values, n=100, method="inclusive")
+        for tag, values in costs.items()
+    }
+
+
+def python_outliers(expenses: list[Expense], threshold: float = 3.5) -> list[int]:
+    costs = [expense.cost for expense in expenses]
+    median = statistics.median(costs)
+    deviation = statistics.median(abs(cost - median) for cost in costs)
+    return [
+        expense.key
+        for expense in expenses
+        if 0.6745 * (expense.cost - median) / deviation > threshold
+    ]
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    loaded = 0
+    for rows in (100_000, 1_000_000):
+        populate(db, rows - loaded, seed=rows)
+        loaded = rows
+
+        expenses = db.get_all()
+        analytics = Analytics.from_repository(db)
+        name_from_id = db.lookup[Lookup.NAME_FROM_ID]
+        percentiles = analytics.tag_percentiles((50,))
+        python_percentiles = python_tag_percentiles(expenses)
+        for tag_id, values in percentiles.items():
+            assert abs(values[0] - python_percentiles[name_from_id[tag_id]][49]) < 1
+        assert sorted(analytics.outliers()) == sorted(python_outliers(expenses))
+
+        print(f"{rows} rows")
+        print(
+            f"  load          get_batch {timed(db.get_batch, repeat=1):7.2f}s"
+            f" | get_all {timed(db.get_all, repeat=1):7.2f}s"
+        )
+        for name, vectorized, loop in (
+            ("rolling 30d", analytics.rolling_spend, python_rolling_spend),
+            ("month deltas", analytics.month_over_month, python_month_over_month),
+            ("tag pctiles", analytics.tag_percentiles, python_tag_percentiles),
+            ("outliers", analytics.outliers, python_outliers),
+        ):
+            numpy_ms = timed(vectorized, repeat=3) * 1000
+            python_ms = timed(loop, expenses, repeat=1) * 1000
+            print(
+                f"  {name:<13} NumPy {numpy_ms:9.1f} ms | Python {python_ms:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare batched deletes, retags and updates with one call per expense.
+
+On a synthetic ledger, each batch size is timed four ways: remove_expense in
+a loop against remove_expenses, and retag of one expense at a time against
+one retag call. update_expense is timed per call. Every run works on fresh
+random ids, so rows are only removed once.
+
+Run from the project root: python -m benchmarks.bench_batch_writes [ROWS]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from entities.expense import Expense
+from repository.repository import Repository
+from benchmarks.ledger import LedgerSpec, generate
+
+BATCHES = (1, 5, 10, 50, 100, 1_000, 10_000)
+TAGS = ["Dining", "Travel"]
+
+
+def timed(call) -> float:
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str]) -> None:
+    rows = int(argv[1]) if len(argv) > 1 else 100_000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        db = Repository(path=str(Path(directory) / "ledger.db"))
+        generate(db, LedgerSpec(rows=rows))
+        ids = [row[0] for row in db.conn.execute("SELECT id FROM expenses")]
+        rng.shuffle(ids)
+        print(f"{rows:,} rows, milliseconds per batch")
+        print(
+            f"{'batch':>7}{'remove loop':>14}{'remove_expenses':>17}"
+            f"{'retag loop':>13}{'retag':>10}"
+        )
+        for size in BATCHES:
+            if len(ids) < 3 * size:
+                break
+            looped, batched, retagged = (
+                ids[:size], ids[size : 2 * size], ids[2 * size : 3 * size]
+            )
+            del ids[: 2 * size]
+
+            def remove_loop() -> None:
+                for key in looped:
+                    db.remove_expense(key)
+
+            def retag_loop() -> None:
+                for key in retagged:
+                    db.retag([key], TAGS)
+
+            times = [
+                timed(remove_loop),
+                timed(lambda: db.remove_expenses(batched)),
+                timed(retag_loop),
+                timed(lambda: db.retag(retagged, list(reversed(TAGS)))),
+            ]
+            print(
+                f"{size:>7,}"
+                + "".join(
+                    f"{seconds * 1000:>{width}.1f}"
+                    for seconds, width in zip(times, (14, 17, 13, 10))
+                )
+            )
+
+        updates = ids[:1_000]
+        seconds = timed(
+            lambda: [
+                db.update_expense(Expense(key, "Edited", 100, ["Social"], "2020-01-01"))
+                for key in updates
+            ]
+        )
+        print(f"update_expense: {seconds / len(updates) * 1_000_000:.0f} us per call")
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
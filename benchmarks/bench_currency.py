@@ -0,0 +1,122 @@
+"""Time storing and reporting expenses paid in several currencies.
+
+Reports, for a synthetic ledger where about a third of the expenses were
+paid in dollars or euros, with a daily rate table loaded from CSV:
+- add_expenses with every row in yen and with mixed currencies;
+- get_total in yen (rollups) and in dollars (grouped and converted);
+- by_month and by_tag in yen and in dollars;
+- a per-row conversion in Python of every expense, for comparison.
+
+Run from the project root: python -m benchmarks.bench_currency [ROWS]
+"""
+import csv
+import datetime
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from repository import reports
+from repository.currency import RateCache
+from repository.repository import Repository
+from benchmarks.ledger import LedgerSpec, expenses
+
+# Share of expenses paid in each foreign currency, and its rough yen rate.
+FOREIGN = {"USD": (0.3, 130.0), "EUR": (0.05, 140.0)}
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return time.perf_counter() - start, result
+
+
+def write_rates(path: Path, spec: LedgerSpec) -> int:
+    """Write a random walk of daily rates for each foreign currency."""
+
+    rng = random.Random(spec.seed)
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["date", "currency", "rate"])
+        for code, (_, rate) in FOREIGN.items():
+            for offset in range(spec.days):
+                rate *= 1 + rng.gauss(0, 0.004)
+                day = spec.start + datetime.timedelta(days=offset)
+                writer.writerow([day.isoformat(), code, f"{rate:.4f}"])
+                rows += 1
+    return rows
+
+
+def mixed(spec: LedgerSpec):
+    """Yield the ledger with some expenses re-expressed in foreign currencies."""
+
+    rng = random.Random(spec.seed + 1)
+    for expense in expenses(spec):
+        pick = rng.random()
+        for code, (share, rate) in FOREIGN.items():
+            if pick < share:
+                expense.original_amount = round(expense.cost / rate, 2)
+                expense.currency = code
+                expense.cost = None
+                break
+            pick -= share
+        yield expense
+
+
+def per_row(db: Repository, currency: str) -> float:
+    """Convert every expense on its own, as a loop in the caller would."""
+
+    rates = RateCache()
+    total = 0.0
+    with db.pool.reading() as conn:
+        cursor = conn.execute(
+            "SELECT date, IFNULL(original_amount, cost), IFNULL(currency, 'JPY') "
+            "FROM expenses"
+        )
+        for date, amount, paid_in in cursor:
+            rate = rates.rate(conn, paid_in, date) / rates.rate(conn, currency, date)
+            total += amount * rate
+    return total
+
+
+def main(argv: list[str]) -> None:
+    rows = int(argv[1]) if len(argv) > 1 else 1_000_000
+    spec = LedgerSpec(rows=rows)
+    with tempfile.TemporaryDirectory() as directory:
+        rates_path = Path(directory) / "rates.csv"
+        print(f"{write_rates(rates_path, spec):,} daily rates written")
+
+        plain = Repository(path=str(Path(directory) / "plain.db"), profile="fast")
+        seconds, _ = timed(lambda: plain.add_expenses(expenses(spec), create_tags=True))
+        print(f"add_expenses, all yen:        {seconds:6.1f}s")
+        plain.close()
+
+        db = Repository(path=str(Path(directory) / "mixed.db"), profile="fast")
+        db.load_exchange_rates(rates_path)
+        seconds, _ = timed(lambda: db.add_expenses(mixed(spec), create_tags=True))
+        print(f"add_expenses, mixed:          {seconds:6.1f}s")
+
+        for currency in (None, "USD"):
+            label = currency or "JPY"
+            seconds, total = timed(lambda: db.get_total(currency))
+            print(f"get_total {label}:  {seconds * 1000:8.1f} ms  ({total:,.0f})")
+        seconds, total = timed(lambda: per_row(db, "USD"))
+        print(f"per-row USD:    {seconds * 1000:8.1f} ms  ({total:,.0f})")
+
+        with db.pool.reading() as conn:
+            for report in (reports.by_month, reports.by_tag):
+                for currency in (None, "USD"):
+                    seconds, result = timed(
+                        lambda: report(conn, currency=currency, rates=db.rates)
+                    )
+                    print(
+                        f"{report.__name__} {currency or 'JPY'}: "
+                        f"{seconds * 1000:8.1f} ms, {len(result)} rows"
+                    )
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,109 @@
+"""Time fingerprinting, duplicate checks and duplicate scans on a large ledger.
+
+Reports, for a synthetic ledger:
+- fingerprint backfill throughput;
+- add_expense with and without a duplicate check;
+- re-importing part of the ledger with on_duplicate="skip", which must add
+  nothing;
+- the exact and near-duplicate scans, against a pairwise comparison
+  measured on a sample and extrapolated quadratically.
+
+Run from the project root: python -m benchmarks.bench_dedup [ROWS]
+"""
+import datetime
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+from entities.expense import Expense
+from repository import dedup
+from repository.repository import Repository
+from benchmarks.ledger import LedgerSpec, expenses, generate
+
+REIMPORT = 100_000
+PAIRWISE_SAMPLE = 3_000
+DAYS = 3
+CALLS = 200
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return time.perf_counter() - start, result
+
+
+def pairwise(rows: list[tuple]) -> int:
+    """Count same-cost pairs within DAYS days by comparing every pair."""
+
+    pairs = 0
+    for index, (_, day, cost) in enumerate(rows):
+        for _, other_day, other_cost in rows[index + 1 :]:
+            pairs += cost == other_cost and abs(day - other_day) <= DAYS
+    return pairs
+
+
+def main(argv: list[str]) -> None:
+    rows = int(argv[1]) if len(argv) > 1 else 1_000_000
+    spec = LedgerSpec(rows=rows)
+    with tempfile.TemporaryDirectory() as directory:
+        db = Repository(path=str(Path(directory) / "ledger.db"), profile="fast")
+        seconds, _ = timed(lambda: generate(db, spec))
+        print(f"{rows:,} rows generated with fingerprints in {seconds:.1f}s")
+
+        with db.conn:
+            db.conn.execute("UPDATE expenses SET fingerprint = NULL")
+        with db.pool.writing() as conn:
+            seconds, filled = timed(lambda: dedup.backfill(conn))
+        rate = filled / seconds
+        print(f"backfill: {filled:,} rows in {seconds:.1f}s ({rate:,.0f}/s)")
+
+        # New expenses each time, so the checked calls pay for a lookup too.
+        for policy in ("allow", "raise"):
+            seconds, _ = timed(
+                lambda: [
+                    db.add_expense(
+                        Expense(0, f"{policy} {n}", 123, ["Dining"], "2030-01-01"),
+                        policy,
+                    )
+                    for n in range(CALLS)
+                ]
+            )
+            print(f"add_expense {policy:<5}: {seconds / CALLS * 1e6:8.0f} us per call")
+
+        batch = list(islice(expenses(spec), REIMPORT))
+        seconds, added = timed(lambda: db.add_expenses(batch, on_duplicate="skip"))
+        print(
+            f"re-import {REIMPORT:,} rows with skip: {added} added in {seconds:.2f}s"
+        )
+
+        seconds, groups = timed(db.find_duplicates)
+        print(f"find_duplicates: {len(groups):,} groups in {seconds:.2f}s")
+        for match_name in (False, True):
+            seconds, groups = timed(
+                lambda: db.find_near_duplicates(DAYS, match_name=match_name)
+            )
+            print(
+                f"find_near_duplicates(match_name={match_name}): "
+                f"{len(groups):,} groups in {seconds:.2f}s"
+            )
+
+        sample = [
+            (id, datetime.date.fromisoformat(date).toordinal(), cost)
+            for id, date, cost in db.conn.execute(
+                "SELECT id, date, cost FROM expenses LIMIT :limit",
+                {"limit": PAIRWISE_SAMPLE},
+            )
+        ]
+        seconds, _ = timed(lambda: pairwise(sample))
+        estimate = seconds * (rows / PAIRWISE_SAMPLE) ** 2
+        print(
+            f"pairwise on {PAIRWISE_SAMPLE:,} rows: {seconds:.2f}s, "
+            f"about {estimate:,.0f}s at {rows:,} rows"
+        )
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,48 @@
+"""Compare bytes per expense for Expense objects and an ExpenseBatch.
+
+Run from the project root: python -m benchmarks.bench_expense_memory
+"""
+import time
+import tracemalloc
+
+from repository.repository import Repository
+from benchmarks.common import populate
+
+ROWS = 1_000_000
+
+
+def retained(function) -> tuple[object, int, float]:
+    """Return a result, the bytes it keeps alive and the seconds it took."""
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        return result, tracemalloc.get_traced_memory()[0], seconds
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    populate(db, ROWS)
+
+    expenses, expense_bytes, expense_seconds = retained(db.get_all)
+    count = len(expenses)
+    del expenses
+    batch, batch_bytes, batch_seconds = retained(db.get_batch)
+
+    print(f"{count} expenses")
+    print(
+        f"  list[Expense]  {expense_bytes / count:7.1f} bytes/expense "
+        f"({expense_bytes / 2**20:7.1f} MiB, loaded in {expense_seconds:.2f}s)"
+    )
+    print(
+        f"  ExpenseBatch   {batch_bytes / count:7.1f} bytes/expense "
+        f"({batch_bytes / 2**20:7.1f} MiB, loaded in {batch_seconds:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Time exporting a large ledger and loading the columnar export back.
+
+Reports, for a synthetic ledger:
+- CSV, JSON Lines and columnar export throughput and file size;
+- peak Python memory of each export, traced in a second run, next to
+  writing the CSV from get_all();
+- Analytics from the memory-mapped columnar file against get_batch.
+
+Run from the project root: python -m benchmarks.bench_export [ROWS]
+"""
+import csv
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from analytics.analytics import Analytics
+from repository import exporter
+from repository.repository import Repository
+from benchmarks.ledger import LedgerSpec, generate
+
+
+def timed(call):
+    start = time.perf_counter()
+    result = call()
+    return time.perf_counter() - start, result
+
+
+def traced(call) -> int:
+    """Return the peak bytes allocated by Python while 'call' runs."""
+
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def from_objects(db: Repository, path: Path) -> None:
+    """Write a CSV file the way a caller of get_all() would."""
+
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(("id", "date", "name", "cost", "tags"))
+        for expense in db.get_all():
+            writer.writerow(
+                (
+                    expense.key,
+                    expense.date,
+                    expense.name,
+                    expense.cost,
+                    ", ".join(expense.tags),
+                )
+            )
+
+
+def main(argv: list[str]) -> None:
+    rows = int(argv[1]) if len(argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        db = Repository(path=str(Path(directory) / "ledger.db"), profile="fast")
+        seconds, _ = timed(lambda: generate(db, LedgerSpec(rows=rows)))
+        print(f"{rows:,} rows generated in {seconds:.1f}s")
+
+        for suffix in (".csv", ".jsonl", ".columns"):
+            path = Path(directory) / f"ledger{suffix}"
+            stats = exporter.export_file(db, path)
+            peak = traced(lambda: exporter.export_file(db, path))
+            print(
+                f"{suffix:<9} {stats['seconds']:6.2f}s "
+                f"{stats['rows_per_second']:>10,.0f} rows/s "
+                f"{path.stat().st_size / 2**20:8.1f} MiB "
+                f"peak {peak / 2**20:6.1f} MiB"
+            )
+
+        path = Path(directory) / "objects.csv"
+        seconds, _ = timed(lambda: from_objects(db, path))
+        peak = traced(lambda: from_objects(db, path))
+        print(
+            f"get_all   {seconds:6.2f}s "
+            f"{rows / seconds:>10,.0f} rows/s "
+            f"{path.stat().st_size / 2**20:8.1f} MiB "
+            f"peak {peak / 2**20:6.1f} MiB"
+        )
+
+        columns = Path(directory) / "ledger.columns"
+        for label, load in (
+            ("from_file", lambda: Analytics.from_file(columns)),
+            ("from_repository", lambda: Analytics.from_repository(db)),
+        ):
+            seconds, analytics = timed(load)
+            month_seconds, _ = timed(analytics.month_over_month)
+            print(
+                f"Analytics.{label:<16} load {seconds * 1000:8.1f} ms, "
+                f"month_over_month {month_seconds * 1000:6.1f} ms"
+            )
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,44 @@
+"""Compare per-row tag hydration against the batched path used by Repository.
+
+Run from the project root: python -m benchmarks.bench_hydration
+"""
+from constants import Lookup
+from entities.expense import Expense
+from repository.repository import Repository
+from benchmarks.common import count_queries, populate, timed
+
+
+def per_row_get_all(db: Repository) -> list[Expense]:
+    """Reproduce the original get_all, which ran one tag query per expense."""
+
+    expenses = []
+    for id, date, name, cost, *_ in db.conn.execute("SELECT * FROM expenses"):
+        cursor = db.conn.execute(
+            "SELECT tag_id FROM expense_tags WHERE expense_id=:key", {"key": id}
+        )
+        tags = [db.lookup[Lookup.NAME_FROM_ID][row[0]] for row in cursor]
+        expenses.append(Expense(id, name, cost, tags, date))
+    return expenses
+
+
+def main() -> None:
+    for rows in (1_000, 10_000):
+        db = Repository(debug=True)
+        populate(db, rows)
+
+        with count_queries(db) as per_row_queries:
+            per_row_get_all(db)
+        with count_queries(db) as batched_queries:
+            db.get_all()
+
+        print(
+            f"{rows:>7} rows | "
+            f"per-row: {timed(per_row_get_all, db, repeat=3) * 1000:8.1f} ms "
+            f"{len(per_row_queries):>7} queries | "
+            f"batched: {timed(db.get_all, repeat=3) * 1000:8.1f} ms "
+            f"{len(batched_queries):>7} queries"
+        )
+
+
+if __name__ == "__main__":
+    main()
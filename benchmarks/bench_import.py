@@ -0,0 +1,56 @@
+"""Measure bulk import throughput from CSV and JSON Lines files.
+
+Run from the project root: python -m benchmarks.bench_import
+"""
+import csv
+import json
+import random
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from repository.importer import import_file
+from repository.repository import Repository
+
+ROWS = 1_000_000
+TAGS = ["Groceries", "Dining", "Social", "Household", "Travel"]
+
+
+def synthetic_rows(rows: int, seed: int = 0):
+    """Yield import rows with one or two tags each."""
+
+    rng = random.Random(seed)
+    first_day = date(2015, 1, 1)
+    for index in range(rows):
+        yield {
+            "name": f"Expense {index}",
+            "cost": rng.randrange(50, 20000),
+            "date": (first_day + timedelta(days=rng.randrange(3650))).isoformat(),
+            "tags": ", ".join(rng.sample(TAGS, rng.choice((1, 1, 1, 2)))),
+        }
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = Path(directory) / "expenses.csv"
+        with open(csv_path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, ["name", "cost", "date", "tags"])
+            writer.writeheader()
+            writer.writerows(synthetic_rows(ROWS))
+
+        jsonl_path = Path(directory) / "expenses.jsonl"
+        with open(jsonl_path, "w", encoding="utf-8") as file:
+            for row in synthetic_rows(ROWS):
+                file.write(json.dumps(row) + "\n")
+
+        for path in (csv_path, jsonl_path):
+            db = Repository(path=str(Path(directory) / f"{path.suffix[1:]}.db"))
+            stats = import_file(db, path)
+            print(
+                f"{path.suffix:>6}: {stats['rows']} rows in {stats['seconds']:.2f}s "
+                f"({stats['rows_per_second']:,.0f} rows/sec)"
+            )
+
+
+if __name__ == "__main__":
+    main()
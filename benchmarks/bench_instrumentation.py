@@ -0,0 +1,58 @@
+"""Measure what Instrumentation costs, attached and after detach().
+
+Each hot read is timed on a plain Repository, with Instrumentation attached
+and again after it was detached; the detached timings should match the
+plain ones. The collected report is printed at the end.
+
+Run from the project root: python -m benchmarks.bench_instrumentation [ROWS]
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from repository.instrumentation import Instrumentation
+from repository.repository import Repository
+from benchmarks.ledger import LedgerSpec, generate
+
+NUMBER = 2_000
+REPEAT = 5
+
+CALLS = {
+    "get_limit(10)": lambda db: db.get_limit(10),
+    "get_total()": lambda db: db.get_total(),
+    "get_month_totals()": lambda db: db.get_month_totals(),
+    "get_expense(1)": lambda db: db.get_expense(1),
+}
+
+
+def best(db: Repository, call) -> float:
+    """Return the best time per call in microseconds."""
+
+    timer = timeit.Timer(lambda: call(db))
+    return min(timer.repeat(repeat=REPEAT, number=NUMBER)) / NUMBER * 1_000_000
+
+
+def main(argv: list[str]) -> None:
+    rows = int(argv[1]) if len(argv) > 1 else 10_000
+    with tempfile.TemporaryDirectory() as directory:
+        db = Repository(path=str(Path(directory) / "ledger.db"))
+        generate(db, LedgerSpec(rows=rows))
+        print(f"{rows:,} rows, best of {REPEAT} x {NUMBER} calls, us per call")
+        print(f"{'call':<20}{'plain':>10}{'attached':>10}{'detached':>10}")
+        instrumentation = Instrumentation(db)
+        instrumentation.detach()
+        for name, call in CALLS.items():
+            plain = best(db, call)
+            instrumentation.attach()
+            attached = best(db, call)
+            instrumentation.detach()
+            detached = best(db, call)
+            print(f"{name:<20}{plain:>10.1f}{attached:>10.1f}{detached:>10.1f}")
+        print()
+        print(instrumentation.format_report())
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,42 @@
+"""Compare legacy 'YY-MM-%' LIKE month lookups with ISO date range scans.
+
+Run from the project root: python -m benchmarks.bench_month_lookup
+"""
+from repository.repository import Repository
+from benchmarks.common import populate, timed
+
+ROWS = 1_000_000
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    populate(db, ROWS)
+
+    # The pre-migration layout: two-digit years, no usable index for LIKE.
+    db.conn.executescript(
+        """
+        CREATE TABLE legacy_expenses AS
+            SELECT id, substr(date, 3) AS date, name, cost, category
+            FROM expenses;
+        CREATE INDEX legacy_expenses_date ON legacy_expenses (date);
+        """
+    )
+
+    def legacy_month() -> list:
+        query = "SELECT * FROM legacy_expenses WHERE date LIKE :month"
+        return db.conn.execute(query, {"month": "21-04%"}).fetchall()
+
+    def range_month() -> list:
+        query = "SELECT * FROM expenses WHERE date >= :start AND date < :end"
+        parameters = {"start": "2021-04-01", "end": "2021-05-01"}
+        return db.conn.execute(query, parameters).fetchall()
+
+    assert len(legacy_month()) == len(range_month())
+    print(f"{ROWS} rows, {len(range_month())} in month")
+    print(f"LIKE scan:         {timed(legacy_month) * 1000:8.2f} ms")
+    print(f"ISO range scan:    {timed(range_month) * 1000:8.2f} ms")
+    print(f"get_month (+tags): {timed(db.get_month, '04', '21') * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
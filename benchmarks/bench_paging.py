@@ -0,0 +1,43 @@
+"""Compare keyset pagination with OFFSET pagination deep into the ledger.
+
+Run from the project root: python -m benchmarks.bench_paging
+"""
+from repository.repository import Repository
+from benchmarks.common import populate, timed
+
+ROWS = 1_000_000
+PAGE = 100
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    populate(db, ROWS)
+
+    for order_by in ("id", "cost", "date"):
+        for depth in (0, 100_000, 900_000):
+            offset_query = (
+                f"SELECT * FROM expenses ORDER BY {order_by} DESC, id DESC "
+                "LIMIT :limit OFFSET :offset"
+            )
+            parameters = {"limit": PAGE, "offset": depth}
+            # The keyset position of the row just before the OFFSET page.
+            key_query = (
+                f"SELECT {order_by}, id FROM expenses "
+                f"ORDER BY {order_by} DESC, id DESC LIMIT 1 OFFSET :offset"
+            )
+            key = None
+            if depth:
+                key = db.conn.execute(key_query, {"offset": depth - 1}).fetchone()
+
+            offset_ms = timed(
+                lambda: db.conn.execute(offset_query, parameters).fetchall()
+            ) * 1000
+            keyset_ms = timed(db.get_page, order_by, after=key, limit=PAGE) * 1000
+            print(
+                f"{order_by:<5} row {depth:>7}: OFFSET {offset_ms:8.2f} ms | "
+                f"keyset get_page {keyset_ms:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare connection profiles for writes and for reads during writes.
+
+For each profile, and for the old default (rollback journal, full sync), this
+measures single add_expense commits per second, bulk add_expenses rows per
+second, and the latency of a get_limit query on a second connection while a
+writer is committing.
+
+Run from the project root: python -m benchmarks.bench_profiles
+"""
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from entities.expense import Expense
+from repository.connection import ConnectionProfile, connect
+from repository.repository import Repository
+from benchmarks.common import populate
+
+SINGLE_INSERTS = 1_000
+BULK_ROWS = 200_000
+BASELINE = "rollback journal"
+
+
+def open_repository(path: str, profile: str) -> Repository:
+    if profile == BASELINE:
+        db = Repository(path=path)
+        db.conn.execute("PRAGMA journal_mode = DELETE")
+        db.conn.execute("PRAGMA synchronous = FULL")
+        return db
+    return Repository(path=path, profile=profile)
+
+
+def measure(directory: str, profile: str) -> str:
+    path = str(Path(directory) / f"{profile.replace(' ', '_')}.db")
+    writer = open_repository(path, profile)
+    populate(writer, 10_000)
+
+    start = time.perf_counter()
+    for index in range(SINGLE_INSERTS):
+        writer.add_expense(Expense(0, f"Single {index}", 100, "Dining", "2021-01-01"))
+    inserts_per_second = SINGLE_INSERTS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    writer.add_expenses(
+        Expense(0, f"Bulk {index}", 100, "Dining", "2021-01-01")
+        for index in range(BULK_ROWS)
+    )
+    bulk_per_second = BULK_ROWS / (time.perf_counter() - start)
+
+    latencies: list[float] = []
+    writing = threading.Event()
+    writing.set()
+
+    def read() -> None:
+        if profile == BASELINE:
+            reader = sqlite3.connect(path, timeout=5.0)
+        else:
+            reader = connect(path, profile)
+        query = "SELECT * FROM expenses ORDER BY id DESC LIMIT 10"
+        while writing.is_set():
+            begin = time.perf_counter()
+            reader.execute(query).fetchall()
+            latencies.append(time.perf_counter() - begin)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    for index in range(SINGLE_INSERTS):
+        writer.add_expense(Expense(0, f"Racing {index}", 100, "Dining", "2021-01-01"))
+    writing.clear()
+    thread.join()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"{profile:<17} {inserts_per_second:9,.0f} commits/s | "
+        f"{bulk_per_second:9,.0f} bulk rows/s | concurrent read "
+        f"p50 {quantiles[49] * 1000:6.2f} ms p99 {quantiles[98] * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in [BASELINE, *(profile.value for profile in ConnectionProfile)]:
+            print(measure(directory, profile))
+
+
+if __name__ == "__main__":
+    main()
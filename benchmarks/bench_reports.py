@@ -0,0 +1,56 @@
+"""Compare SQL GROUP BY reports with summing get_all() results in Python.
+
+Run from the project root: python -m benchmarks.bench_reports
+"""
+from collections import defaultdict
+
+from repository import reports
+from repository.repository import Repository
+from benchmarks.common import populate, timed
+
+
+def python_by_tag(db: Repository) -> dict[str, list[int]]:
+    """Naive per-tag totals and counts over every hydrated Expense."""
+
+    totals: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for expense in db.get_all():
+        for tag in expense.tags:
+            totals[tag][0] += expense.cost
+            totals[tag][1] += 1
+    return totals
+
+
+def python_by_month(db: Repository) -> dict[str, list[int]]:
+    """Naive per-month totals and counts over every hydrated Expense."""
+
+    totals: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for expense in db.get_all():
+        totals[expense.date[:7]][0] += expense.cost
+        totals[expense.date[:7]][1] += 1
+    return totals
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    loaded = 0
+    for rows in (100_000, 1_000_000):
+        populate(db, rows - loaded, seed=rows)
+        loaded = rows
+
+        sql = {row.key: [row.total, row.count] for row in reports.by_tag(db.conn)}
+        assert sql == python_by_tag(db)
+
+        print(f"{rows} rows")
+        for name, sql_report, python_report in (
+            ("by_tag", reports.by_tag, python_by_tag),
+            ("by_month", reports.by_month, python_by_month),
+        ):
+            sql_ms = timed(sql_report, db.conn, repeat=3) * 1000
+            python_ms = timed(python_report, db, repeat=1) * 1000
+            print(
+                f"  {name:<9} SQL {sql_ms:9.1f} ms | Python loop {python_ms:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
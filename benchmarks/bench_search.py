@@ -0,0 +1,37 @@
+"""Compare FTS5 search with a LIKE '%term%' scan over expense names.
+
+Run from the project root: python -m benchmarks.bench_search
+"""
+from entities.expense import Expense
+from repository.repository import Repository
+from benchmarks.common import populate, timed
+
+ROWS = 1_000_000
+# Common prefixes stop a LIKE scan early once 20 rows match; rare and missing
+# terms force it through the whole table, which is where FTS matters.
+TERMS = ["cof", "toilet pa", "kanaz", "shinkansen kana", "okonomi", "zzyzx"]
+RARE = ["Shinkansen to Kanazawa", "Okonomiyaki Hiroshima", "Kanazawa gold leaf"]
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    populate(db, ROWS // 2, seed=1)
+    db.add_expenses(Expense(0, name, 5000, "Travel", "2020-05-05") for name in RARE)
+    populate(db, ROWS // 2, seed=2)
+
+    def like_scan(text: str) -> list:
+        query = (
+            "SELECT * FROM expenses WHERE name LIKE :term "
+            "ORDER BY id DESC LIMIT 20"
+        )
+        return db.conn.execute(query, {"term": f"%{text}%"}).fetchall()
+
+    print(f"{ROWS} rows, 20 results per query")
+    for term in TERMS:
+        search_ms = timed(db.search, term, repeat=10) * 1000
+        like_ms = timed(like_scan, term, repeat=3) * 1000
+        print(f"  {term!r:<18} search {search_ms:6.2f} ms | LIKE {like_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
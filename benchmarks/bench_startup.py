@@ -0,0 +1,99 @@
+"""Measure desktop startup: time to first frame, to tags and to the first page.
+
+Each measurement starts a fresh interpreter that builds the same window as
+app.main against a prepared database and records, relative to its own
+start (imports included), when the window is first mapped and drawn, when
+the tag checkboxes are filled in and when the expense list shows its first
+page. The parent also reports the whole process's wall time. Needs a
+display.
+
+Run from the project root: python -m benchmarks.bench_startup
+"""
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from repository.repository import Repository
+from benchmarks.common import populate
+
+# (expense rows, extra tags) per database.
+DATABASES = ((1_000, 0), (100_000, 200), (1_000_000, 2_000))
+MARKS = ("first frame", "tags", "first page")
+
+
+def child(path: str) -> None:
+    """Open the app window on 'path' and print when each milestone was hit."""
+
+    start = time.perf_counter()
+    # Imported here so their cost counts towards startup.
+    import tkinter as tk
+
+    from components.InputBox import InputBox
+    from components.ReadoutBox import ReadoutBox
+    from constants import ComponentNames
+    from repository.worker import RepositoryWorker
+
+    marks: dict[str, float] = {}
+
+    def mark(name: str) -> None:
+        marks.setdefault(name, time.perf_counter() - start)
+
+    root = tk.Tk()
+    db = RepositoryWorker(root, path=path)
+    input_box = InputBox(root, db)
+    input_box.pack(side="left")
+    readout = ReadoutBox(root, db)
+    readout.pack(side="right")
+    root.bind("<Map>", lambda event: root.after_idle(mark, "first frame"))
+
+    def poll() -> None:
+        if input_box.components[ComponentNames.TAGS].checkboxes:
+            mark("tags")
+        if readout.tree.get_children():
+            mark("first page")
+        if len(marks) == len(MARKS):
+            root.quit()
+        else:
+            root.after(1, poll)
+
+    poll()
+    root.mainloop()
+    db.close()
+    root.destroy()
+    for name in MARKS:
+        print(f"{name}={marks[name] * 1000:.1f}")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        for rows, extra_tags in DATABASES:
+            path = str(Path(directory) / f"{rows}.db")
+            db = Repository(path=path)
+            populate(db, rows)
+            for index in range(extra_tags):
+                db.add_tag(f"Tag {index}")
+            db.close()
+
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", path],
+                stdout=subprocess.PIPE,
+                text=True,
+                check=True,
+            ).stdout
+            wall = (time.perf_counter() - start) * 1000
+            marks = dict(line.split("=") for line in output.splitlines())
+            print(
+                f"{rows:>9,} rows {extra_tags + 5:5} tags | "
+                + " | ".join(f"{name} {float(marks[name]):7.1f} ms" for name in MARKS)
+                + f" | process {wall:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        child(sys.argv[1])
+    else:
+        main()
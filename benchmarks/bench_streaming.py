@@ -0,0 +1,43 @@
+"""Show that iter_all runs in flat memory while get_all grows with the ledger.
+
+Run from the project root: python -m benchmarks.bench_streaming
+"""
+import tracemalloc
+
+from repository.repository import Repository
+from benchmarks.common import populate
+
+
+def peak_bytes(function) -> int:
+    """Return the peak traced allocation while running 'function'."""
+
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def drain(iterator) -> None:
+    for _ in iterator:
+        pass
+
+
+def main() -> None:
+    db = Repository(debug=True)
+    loaded = 0
+    for rows in (10_000, 100_000, 1_000_000):
+        populate(db, rows - loaded, seed=rows)
+        loaded = rows
+
+        streamed = peak_bytes(lambda: drain(db.iter_all()))
+        line = f"{rows:>9} rows | iter_all peak {streamed / 2**20:7.2f} MiB"
+        if rows <= 100_000:
+            materialized = peak_bytes(db.get_all)
+            line += f" | get_all peak {materialized / 2**20:8.2f} MiB"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measure how long the Tk event loop stalls during a large Repository query.
+
+A heartbeat is scheduled every few milliseconds with root.after; the largest
+delay past its due time is the longest the window was unresponsive. The same
+get_all over a 1M-row ledger is run once on the Tk thread and once through
+RepositoryWorker. Needs a display.
+
+Run from the project root: python -m benchmarks.bench_ui_stall
+"""
+import tempfile
+import time
+import tkinter as tk
+from pathlib import Path
+
+from repository.repository import Repository
+from repository.worker import RepositoryWorker
+from benchmarks.common import populate
+
+ROWS = 1_000_000
+HEARTBEAT_MS = 5
+
+
+class StallMeter:
+    """Record the worst lateness of a periodic Tk callback."""
+
+    def __init__(self, root: tk.Tk) -> None:
+        self.root = root
+        self.worst = 0.0
+        self._due = time.perf_counter()
+        self._tick()
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        self.worst = max(self.worst, now - self._due)
+        self._due = now + HEARTBEAT_MS / 1000
+        self.root.after(HEARTBEAT_MS, self._tick)
+
+
+def measure(path: str, use_worker: bool) -> tuple[float, float]:
+    """Return (query seconds, worst event-loop stall seconds)."""
+
+    root = tk.Tk()
+    meter = StallMeter(root)
+    started = time.perf_counter()
+    elapsed = []
+
+    def finished(expenses: list) -> None:
+        elapsed.append(time.perf_counter() - started)
+        root.after(50, root.quit)
+
+    if use_worker:
+        worker = RepositoryWorker(root, path=path)
+        root.after(100, lambda: worker.submit("get_all", callback=finished))
+    else:
+        db = Repository(path=path)
+        root.after(100, lambda: finished(db.get_all()))
+
+    root.mainloop()
+    if use_worker:
+        worker.close()
+    root.destroy()
+    return elapsed[0], meter.worst
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "expenses.db")
+        db = Repository(path=path, setup=True)
+        populate(db, ROWS)
+        db.conn.close()
+
+        for label, use_worker in (("Tk thread", False), ("worker", True)):
+            seconds, stall = measure(path, use_worker)
+            print(
+                f"{label:<10} get_all {seconds:6.2f}s | "
+                f"worst event-loop stall {stall * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
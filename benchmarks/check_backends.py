@@ -0,0 +1,187 @@
+"""Run the same ExpenseStore scenario against every available backend.
+
+SQLite always runs, on a temporary file. A MySQL-compatible stand-in server
+is tested too when TEST_DB_HOST, TEST_DB_USER, TEST_DB_PASS and TEST_DB_DB
+are set; its expenses, tags and expense_tags tables are emptied first, so
+never point it at real data. Each backend also reports the cost of opening a
+connection per call, as lambda.py used to, against reusing the kept-open one,
+and checks that a write made on a second connection reaches the kept-open one.
+
+Run from the project root: python -m benchmarks.check_backends
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from entities.expense import Expense
+from repository.backends import Backend, MySQLBackend, SQLiteBackend
+from repository.repository import Repository
+from repository.store import ExpenseStore
+
+CALLS = 200
+
+
+def scenario(store: ExpenseStore) -> list[tuple[str, bool]]:
+    """Exercise every store method and return (check, passed) pairs."""
+
+    for tag in ("Groceries", "Dining", "Travel"):
+        store.add_tag(tag)
+    first = store.add_expense(Expense(0, "Coffee", 300, "Dining", "2021-04-02"))
+    second = store.add_expense(
+        Expense(0, "Onigiri", 150, "Groceries, Dining", "2021-04-18")
+    )
+    third = store.add_expense(Expense(0, "Flight", 42_000, [], "2021-05-01"))
+
+    checks = [
+        ("add_tag is idempotent", store.add_tag("Dining") == store.add_tag("Dining")),
+        (
+            "get_limit newest first",
+            [e.key for e in store.get_limit(2)] == [third, second],
+        ),
+        (
+            "get_month range and order",
+            [e.name for e in store.get_month("4", "2021")] == ["Coffee", "Onigiri"],
+        ),
+        (
+            "tags hydrated",
+            sorted(store.get_expense(second).tags) == ["Dining", "Groceries"],
+        ),
+        (
+            "get_tag",
+            {e.key for e in store.get_tag("Dining")} == {first, second},
+        ),
+        ("get_over", [e.key for e in store.get_over(1000)] == [third]),
+        ("order_by_price", store.order_by_price(1)[0].key == third),
+        ("get_total", store.get_total() == 42_450),
+        ("missing expense", store.get_expense(third + 100) is None),
+    ]
+
+    try:
+        store.add_expense(Expense(0, "Ghost", 1, "No such tag", "2021-04-03"))
+        unknown_tag_rejected = False
+    except KeyError:
+        unknown_tag_rejected = True
+    checks.append(("unknown tag raises KeyError", unknown_tag_rejected))
+    checks.append(("failed add rolled back", store.get_total() == 42_450))
+
+    store.remove_expense(second)
+    checks.append(("remove_expense", store.get_expense(second) is None))
+    checks.append(("tag links removed", store.get_tag("Groceries") == []))
+    return checks
+
+
+def sees_other_writes(store: ExpenseStore, other: Backend) -> bool:
+    """Write through a second connection and read it back through 'store'."""
+
+    before = store.get_total()
+    writer = ExpenseStore(other)
+    expense_id = writer.add_expense(Expense(0, "Elsewhere", 7, [], "2021-06-01"))
+    seen = store.get_total() == before + 7 and store.get_expense(expense_id)
+    writer.remove_expense(expense_id)
+    writer.close()
+    return bool(seen)
+
+
+def reads_by_name(path: str) -> bool:
+    """Read an expense back from a table laid out like the Lambda's old one."""
+
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE expenses (id integer primary key, name text, cost integer, "
+        "tags text, date text, created_at text, updated_at text, "
+        "original_amount real, currency text);"
+        "CREATE TABLE tags (id integer primary key, name text);"
+        "CREATE TABLE expense_tags (expense_id integer, tag_id integer);"
+    )
+    conn.close()
+    store = ExpenseStore(SQLiteBackend(path))
+    expense_id = store.add_expense(Expense(0, "Ramen", 900, [], "2021-04-05"))
+    expense = store.get_expense(expense_id)
+    store.close()
+    return (expense.name, expense.cost, expense.date) == ("Ramen", 900, "2021-04-05")
+
+
+def connect_cost(backend: Backend) -> tuple[float, float]:
+    """Return milliseconds per call when connecting each time and when reusing."""
+
+    store = ExpenseStore(backend)
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        store.get_limit(1)
+        backend.close()
+    fresh = (time.perf_counter() - start) / CALLS
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        store.get_limit(1)
+    reused = (time.perf_counter() - start) / CALLS
+    return fresh * 1000, reused * 1000
+
+
+def run(label: str, backend: Backend, other: Backend) -> bool:
+    """Check 'backend', using 'other', a second one on the same database."""
+
+    backend.create_schema(backend.connection())
+    store = ExpenseStore(backend)
+    passed = True
+    checks = scenario(store)
+    seen = sees_other_writes(store, other)
+    checks.append(("writes on another connection seen", seen))
+    for check, ok in checks:
+        print(f"{label:<7} {'ok' if ok else 'FAIL':<5}{check}")
+        passed = passed and ok
+    fresh, reused = connect_cost(backend)
+    print(
+        f"{label:<7} get_limit {fresh:.3f} ms connecting per call, "
+        f"{reused:.3f} ms reusing the connection"
+    )
+    store.close()
+    return passed
+
+
+def main() -> int:
+    passed = True
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "expenses.db")
+        passed = run("sqlite", SQLiteBackend(path), SQLiteBackend(path)) and passed
+
+        # Repository runs the same shared queries on the rows the store wrote.
+        db = Repository(path=path)
+        store = ExpenseStore(SQLiteBackend(path))
+        same = [
+            (e.key, e.name, e.cost, sorted(e.tags)) for e in db.get_limit(10)
+        ] == [(e.key, e.name, e.cost, sorted(e.tags)) for e in store.get_limit(10)]
+        print(f"{'sqlite':<7} {'ok' if same else 'FAIL':<5}Repository agrees")
+        passed = passed and same
+        db.close()
+        store.close()
+
+        ordered = reads_by_name(str(Path(directory) / "legacy.db"))
+        print(f"{'sqlite':<7} {'ok' if ordered else 'FAIL':<5}columns read by name")
+        passed = passed and ordered
+
+    if "TEST_DB_HOST" in os.environ:
+        options = {
+            "host": os.environ["TEST_DB_HOST"],
+            "user": os.environ["TEST_DB_USER"],
+            "password": os.environ["TEST_DB_PASS"],
+            "database": os.environ["TEST_DB_DB"],
+        }
+        backend = MySQLBackend(**options)
+        conn = backend.connection()
+        backend.create_schema(conn)
+        cursor = conn.cursor()
+        for table in ("expense_tags", "expenses", "tags"):
+            cursor.execute(f"DELETE FROM {table}")
+        conn.commit()
+        passed = run("mysql", backend, MySQLBackend(**options)) and passed
+    else:
+        print("mysql   skipped: TEST_DB_HOST is not set")
+
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Check that CachedRepository never serves stale results across writes.
+
+Random reads are answered by both a CachedRepository and the uncached
+Repository underneath it, interleaved with random inserts, updates, deletes
+and batched writes; any difference is reported. Also prints the resulting
+hit rate. A second phase shares one CachedRepository between threads that
+read and write at once, then checks that no call failed and that nothing
+cached outlived the writes.
+
+Run from the project root: python -m benchmarks.check_cache
+Exits with status 1 if a cached result was stale.
+"""
+import random
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+from constants import Lookup
+from entities.expense import Expense
+from repository.cached_repository import CachedRepository
+from repository.repository import Repository
+from benchmarks.common import populate
+
+STEPS = 5_000
+THREADS = 8
+THREAD_STEPS = 500
+
+
+def main(seed: int = 0) -> int:
+    rng = random.Random(seed)
+    db = Repository(debug=True)
+    populate(db, 2_000, seed=seed)
+    cached = CachedRepository(db, max_entries=64)
+    tags = list(db.lookup[Lookup.ID_FROM_NAME])
+
+    reads = [
+        lambda: ("get_total", ()),
+        lambda: ("get_all", ()),
+        lambda: ("get_month_totals", ()),
+        lambda: ("get_limit", (rng.choice((5, 10, 50)),)),
+        lambda: ("order_by_price", (rng.choice((5, 100)),)),
+        lambda: ("get_over", (rng.choice((1_000, 15_000, 19_900)), 100)),
+        lambda: ("get_tag", (rng.choice(tags), 10_000)),
+        lambda: ("get_month", (f"{rng.randrange(1, 13):02d}", "2020")),
+        lambda: ("get_year", (str(rng.choice((2019, 2020, 2021))),)),
+        lambda: ("get_month_tag_totals", (f"{rng.randrange(1, 13):02d}", "20")),
+    ]
+
+    stale = 0
+    for step in range(STEPS):
+        action = rng.random()
+        if action < 0.1:
+            day = date(2019, 1, 1) + timedelta(days=rng.randrange(1095))
+            cached.add_expense(
+                Expense(
+                    0,
+                    name=f"Random {step}",
+                    cost=str(rng.randrange(1, 20_000)),
+                    tags=", ".join(rng.sample(tags, rng.randrange(0, 3))),
+                    date=day,
+                )
+            )
+        elif action < 0.2:
+            ids = db.conn.execute("SELECT id FROM expenses").fetchall()
+            cached.remove_expense(rng.choice(ids)[0])
+        elif action < 0.25:
+            ids = [row[0] for row in db.conn.execute("SELECT id FROM expenses")]
+            day = date(2019, 1, 1) + timedelta(days=rng.randrange(1095))
+            cached.update_expense(
+                Expense(
+                    rng.choice(ids),
+                    name=f"Edited {step}",
+                    cost=rng.randrange(1, 20_000),
+                    tags=rng.sample(tags, rng.randrange(0, 3)),
+                    date=day,
+                )
+            )
+        elif action < 0.26:
+            ids = [row[0] for row in db.conn.execute("SELECT id FROM expenses")]
+            sample = rng.sample(ids, rng.randrange(1, 40))
+            if rng.random() < 0.5:
+                cached.remove_expenses(sample)
+            else:
+                cached.retag(sample, rng.sample(tags, rng.randrange(0, 3)))
+        else:
+            method, args = rng.choice(reads)()
+            expected = repr(getattr(db, method)(*args))
+            if repr(getattr(cached, method)(*args)) != expected:
+                stale += 1
+                print(f"stale {method}{args} at step {step}")
+
+    stats = cached.stats()
+    rate = stats["hits"] / (stats["hits"] + stats["misses"])
+    print(f"{STEPS} steps, {stale} stale results, hit rate {rate:.0%} {stats}")
+    return 1 if stale or threaded(seed) else 0
+
+
+def threaded(seed: int) -> int:
+    """Share one wrapper between threads and return failures plus stale reads."""
+
+    # A file with pooled readers, so reads really overlap with each other.
+    directory = tempfile.TemporaryDirectory()
+    db = Repository(path=str(Path(directory.name) / "expenses.db"))
+    populate(db, 2_000, seed=seed)
+    cached = CachedRepository(db, max_entries=8)
+    reads = [
+        ("get_total", ()),
+        ("get_limit", (10,)),
+        ("get_over", (15_000, 100)),
+        ("get_tag", ("Dining", 10_000)),
+        ("get_month", ("06", "2020")),
+        ("get_month_totals", ()),
+    ]
+    errors = []
+
+    def work(worker: int) -> None:
+        rng = random.Random(seed * THREADS + worker)
+        try:
+            for step in range(THREAD_STEPS):
+                if rng.random() < 0.2:
+                    expense_id = cached.add_expense(
+                        Expense(
+                            0,
+                            name=f"Thread {worker} {step}",
+                            cost=rng.randrange(1, 20_000),
+                            tags=["Dining"],
+                            date=date(2020, 6, rng.randrange(1, 31)),
+                        )
+                    )
+                    if rng.random() < 0.5:
+                        cached.remove_expense(expense_id)
+                else:
+                    method, args = rng.choice(reads)
+                    getattr(cached, method)(*args)
+        except Exception as error:
+            errors.append(error)
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(THREADS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stale = [
+        method
+        for method, args in reads
+        if repr(getattr(cached, method)(*args)) != repr(getattr(db, method)(*args))
+    ]
+    if not racing_read(db, CachedRepository(db)):
+        stale.append("get_total computed across a write")
+    db.close()
+    directory.cleanup()
+    print(
+        f"{THREADS} threads x {THREAD_STEPS} steps, {len(errors)} errors "
+        f"{[type(error).__name__ for error in errors[:3]]}, stale: {stale}"
+    )
+    return len(errors) + len(stale)
+
+
+def racing_read(db: Repository, cached: CachedRepository) -> bool:
+    """Hold a get_total computation open across a write; True if not cached."""
+
+    computing = threading.Event()
+    written = threading.Event()
+    get_total = db.get_total
+
+    def slow_total(*args):
+        result = get_total(*args)
+        computing.set()
+        written.wait()
+        return result
+
+    db.get_total = slow_total
+    reader = threading.Thread(target=cached.get_total)
+    reader.start()
+    computing.wait()
+    del db.get_total
+    cached.add_expense(Expense(0, "Racing", 1, [], "2020-06-01"))
+    written.set()
+    reader.join()
+    return cached.get_total() == db.get_total()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
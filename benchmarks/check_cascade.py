@@ -0,0 +1,136 @@
+"""Check that deletes, updates and retags never leave orphaned tag links.
+
+Random single and batched writes of every kind run against a ledger, with
+batches on both sides of SET_BASED_MIN so the trigger and the set-based
+paths are both exercised. Afterwards no link may point at a missing expense,
+PRAGMA foreign_key_check must be clean, the rollups must match a recompute
+and every search row must carry its expense's current tags. A database with
+orphaned links from before migration 7 is upgraded and checked the same way.
+
+Run from the project root: python -m benchmarks.check_cascade
+Exits with status 1 if any check fails.
+"""
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from constants import Lookup
+from entities.expense import Expense
+from repository import rollups
+from repository.migrations import MIGRATIONS
+from repository.repository import SET_BASED_MIN, Repository
+from benchmarks.common import populate
+
+STEPS = 1_000
+
+CHECKS = {
+    "orphaned links": (
+        "SELECT COUNT(*) FROM expense_tags "
+        "WHERE expense_id NOT IN (SELECT id FROM expenses)"
+    ),
+    "foreign key violations": "SELECT COUNT(*) FROM pragma_foreign_key_check",
+    "missing search rows": (
+        "SELECT COUNT(*) FROM expenses "
+        "WHERE id NOT IN (SELECT rowid FROM expense_search)"
+    ),
+    "stale search rows": (
+        "SELECT COUNT(*) FROM expense_search "
+        "WHERE rowid NOT IN (SELECT id FROM expenses)"
+    ),
+    "stale search tags": (
+        "SELECT COUNT(*) FROM expense_search "
+        "INNER JOIN expenses ON expenses.id = expense_search.rowid "
+        "WHERE expense_search.tags != IFNULL(("
+        "SELECT group_concat(tags.name, ' ') FROM expense_tags "
+        "INNER JOIN tags ON expense_tags.tag_id = tags.id "
+        "WHERE expense_tags.expense_id = expenses.id), '')"
+    ),
+}
+
+
+def problems(db: Repository) -> dict[str, int]:
+    """Count every kind of inconsistency, leaving out the ones not found."""
+
+    found = {
+        name: db.conn.execute(query).fetchone()[0] for name, query in CHECKS.items()
+    }
+    found["mismatched rollup rows"] = len(rollups.verify(db.conn))
+    return {name: count for name, count in found.items() if count}
+
+
+def random_writes(db: Repository, rng: random.Random) -> None:
+    tags = list(db.lookup[Lookup.ID_FROM_NAME])
+    ids = [row[0] for row in db.conn.execute("SELECT id FROM expenses")]
+
+    def sample() -> list[int]:
+        size = rng.choice((1, 3, SET_BASED_MIN - 1, SET_BASED_MIN, 200))
+        return rng.sample(ids, min(size, len(ids)))
+
+    for step in range(STEPS):
+        action = rng.random()
+        if action < 0.3 or len(ids) < 300:
+            day = date(2020, 1, 1) + timedelta(days=rng.randrange(730))
+            chosen = rng.sample(tags, rng.randrange(0, 3))
+            expense = Expense(0, f"Random {step}", rng.randrange(1, 5000), chosen, day)
+            ids.append(db.add_expense(expense))
+        elif action < 0.45:
+            db.remove_expense(ids.pop(rng.randrange(len(ids))))
+        elif action < 0.6:
+            removed = set(sample())
+            db.remove_expenses(removed)
+            ids = [key for key in ids if key not in removed]
+        elif action < 0.8:
+            db.retag(sample(), rng.sample(tags, rng.randrange(0, 3)))
+        else:
+            day = date(2019, 1, 1) + timedelta(days=rng.randrange(1000))
+            chosen = rng.sample(tags, rng.randrange(0, 3))
+            expense = Expense(
+                rng.choice(ids), f"Edited {step}", rng.randrange(1, 5000), chosen, day
+            )
+            db.update_expense(expense)
+
+
+def check_migration(directory: str) -> dict[str, int]:
+    """Upgrade a version 6 database holding orphaned links and check it."""
+
+    path = str(Path(directory) / "version6.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        f"BEGIN; {''.join(MIGRATIONS[:6])} PRAGMA user_version = 6; COMMIT;"
+    )
+    with conn:
+        conn.executemany("INSERT INTO tags (name) VALUES (?)", [("A",), ("B",)])
+        conn.executemany(
+            "INSERT INTO expenses (date, name, cost) VALUES (?, ?, ?)",
+            [(f"2021-04-0{n}", f"Expense {n}", n * 100) for n in range(1, 6)],
+        )
+        conn.executemany(
+            "INSERT INTO expense_tags VALUES (?, ?)",
+            [(1, 1), (2, 1), (2, 2), (3, 2), (5, 1), (99, 1), (98, 2)],
+        )
+    conn.close()
+
+    db = Repository(path=path)
+    db.remove_expenses([1, 2])
+    found = problems(db)
+    db.close()
+    return found
+
+
+def main(seed: int = 0) -> int:
+    db = Repository(debug=True)
+    populate(db, 2_000, seed=seed)
+    random_writes(db, random.Random(seed))
+    found = problems(db)
+    print(f"{STEPS} random writes: {found or 'consistent'}")
+    with tempfile.TemporaryDirectory() as directory:
+        migrated = check_migration(directory)
+    print(f"migrated orphaned links: {migrated or 'consistent'}")
+    return 1 if found or migrated else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
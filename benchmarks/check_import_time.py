@@ -0,0 +1,88 @@
+"""Enforce an import-time budget and keep GUI and heavy modules out of services.
+
+Each entry point is imported in a fresh interpreter under -X importtime. The
+time spent on its imports, minus the interpreter's own startup imports, must
+stay within its budget, and none of its forbidden modules may be loaded. The
+median of several runs is used to smooth out noise.
+
+Run from the project root: python -m benchmarks.check_import_time
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+# Entry point: (budget in milliseconds, modules it must not load).
+ENTRY_POINTS = {
+    "lambda": (40, ("tkinter", "numpy", "mysql", "sqlite3")),
+    "repository.store": (40, ("tkinter", "numpy", "mysql")),
+    # About 25 ms on a quiet machine, but up to 55 ms on a loaded one. It pulls
+    # in logging, hashlib (fingerprints) and the reports, all of which opening
+    # a Repository needs anyway; the forbidden modules catch real regressions.
+    "repository.repository": (80, ("tkinter", "numpy", "mysql")),
+    "define.types": (30, ("tkinter",)),
+    "components.base.Box": (100, ("repository.worker", "sqlite3")),
+}
+
+# lambda.py builds its store at import; these stand in for the real settings.
+ENVIRONMENT = {
+    "PERSONAL_DB_USER": "user",
+    "PERSONAL_DB_PASS": "password",
+    "PERSONAL_DB_HOST": "localhost",
+    "PERSONAL_DB_DB": "expenses",
+}
+
+
+def import_once(module: str) -> tuple[float, list[str]]:
+    """Return (total top-level import microseconds, loaded module names)."""
+
+    code = (
+        "import importlib, sys\n"
+        f"importlib.import_module({module!r})\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    environment = {**ENVIRONMENT, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=environment,
+        check=True,
+    )
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented and already counted by their parent.
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, result.stdout.split()
+
+
+def main() -> int:
+    baseline = statistics.median(import_once("sys")[0] for _ in range(RUNS))
+    passed = True
+    for module, (budget, forbidden) in ENTRY_POINTS.items():
+        runs = [import_once(module) for _ in range(RUNS)]
+        milliseconds = (statistics.median(total for total, _ in runs) - baseline) / 1000
+        loaded = set(runs[0][1])
+        leaked = [
+            name
+            for name in forbidden
+            if name in loaded or any(m.startswith(f"{name}.") for m in loaded)
+        ]
+        ok = milliseconds <= budget and not leaked
+        passed = passed and ok
+        print(
+            f"{'ok' if ok else 'FAIL':<5}{module:<24}{milliseconds:6.1f} ms "
+            f"(budget {budget} ms)"
+            + (f" loads {', '.join(leaked)}" if leaked else "")
+        )
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
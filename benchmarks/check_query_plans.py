@@ -0,0 +1,66 @@
+"""Check that Repository queries are served by indexes rather than table scans.
+
+Run from the project root: python -m benchmarks.check_query_plans
+Exits with status 1 if any query outside FULL_SCAN_ALLOWED scans a table.
+"""
+import sys
+
+from repository.repository import Repository
+from benchmarks.common import count_queries, populate
+
+# get_all and get_total read every row, so a table scan is the right plan;
+# get_limit walks the rowid b-tree backwards and stops after LIMIT rows.
+FULL_SCAN_ALLOWED = {"get_all", "get_total", "get_limit"}
+
+
+def table_scans(db: Repository, statement: str) -> list[str]:
+    """Return the EXPLAIN QUERY PLAN steps that scan a table without an index."""
+
+    plan = db.conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+    return [
+        detail
+        for _, _, _, detail in plan
+        if detail.startswith("SCAN") and "INDEX" not in detail
+    ]
+
+
+def main() -> int:
+    db = Repository(debug=True)
+    populate(db, 5_000)
+    db.conn.execute("ANALYZE")
+
+    calls = {
+        "get_all": lambda: db.get_all(),
+        "get_limit": lambda: db.get_limit(10),
+        "get_tag": lambda: db.get_tag("Dining"),
+        "get_month": lambda: db.get_month("04", "21"),
+        "get_over": lambda: db.get_over(19_000),
+        "order_by_price": lambda: db.order_by_price(),
+        "get_expense": lambda: db.get_expense(5),
+        "get_page": lambda: db.get_page("id", after=(2_000, 2_000)),
+        "get_page cost": lambda: db.get_page("cost", after=(5_000, 2_000)),
+        "get_page date": lambda: db.get_page(
+            "date", descending=False, before=("2020-01-01", 2_000)
+        ),
+        "get_total": lambda: db.get_total(),
+    }
+
+    failures = 0
+    for method, call in calls.items():
+        with count_queries(db) as statements:
+            call()
+        method_failures = 0
+        for statement in statements:
+            scans = table_scans(db, statement)
+            if scans and method not in FULL_SCAN_ALLOWED:
+                method_failures += 1
+                print(f"FAIL {method}: {' / '.join(scans)}\n     {statement}")
+        if not method_failures:
+            print(f"ok   {method}")
+        failures += method_failures
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
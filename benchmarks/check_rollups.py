@@ -0,0 +1,58 @@
+"""Check rollup tables against a full recompute after random writes.
+
+Run from the project root: python -m benchmarks.check_rollups
+Exits with status 1 if any rollup row drifts from the recomputed totals.
+"""
+import random
+import sys
+from datetime import date, timedelta
+
+from constants import Lookup
+from entities.expense import Expense
+from repository import rollups
+from repository.repository import Repository
+from benchmarks.common import populate
+
+STEPS = 2_000
+
+
+def main(seed: int = 0) -> int:
+    rng = random.Random(seed)
+    db = Repository(debug=True)
+    populate(db, 1_000, seed=seed)
+    tags = list(db.lookup[Lookup.ID_FROM_NAME])
+    ids = [row[0] for row in db.conn.execute("SELECT id FROM expenses")]
+
+    for step in range(STEPS):
+        action = rng.random()
+        if action < 0.45 or not ids:
+            day = date(2020, 1, 1) + timedelta(days=rng.randrange(730))
+            expense = Expense(
+                0,
+                name=f"Random {step}",
+                cost=rng.randrange(1, 5000),
+                tags=", ".join(rng.sample(tags, rng.randrange(0, 3))),
+                date=day,
+            )
+            ids.append(db.add_expense(expense))
+        elif action < 0.9:
+            db.remove_expense(ids.pop(rng.randrange(len(ids))))
+        else:
+            batch = [
+                Expense(0, f"Bulk {step}-{n}", rng.randrange(1, 5000), "", "2021-06-01")
+                for n in range(rng.randrange(1, 20))
+            ]
+            db.add_expenses(batch)
+            ids = [row[0] for row in db.conn.execute("SELECT id FROM expenses")]
+
+    mismatches = rollups.verify(db.conn)
+    for mismatch in mismatches[:20]:
+        print(mismatch)
+    print(f"{STEPS} random writes, {len(mismatches)} mismatched rollup rows")
+    total = db.conn.execute("SELECT TOTAL(cost) FROM expenses").fetchone()[0]
+    print(f"get_total {db.get_total()} vs recomputed {total}")
+    return 1 if mismatches or db.get_total() != total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
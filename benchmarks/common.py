@@ -0,0 +1,91 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterator
+
+from constants import Lookup
+from repository import dedup
+from repository.repository import Repository
+
+TRANSACTION_CONTROL = {"BEGIN", "COMMIT", "ROLLBACK"}
+DEFAULT_TAGS = ["Groceries", "Dining", "Social", "Household", "Travel"]
+ITEMS = [
+    "Coffee", "Salad", "Bento", "Sparkling water", "Beer", "Ramen", "Sushi",
+    "Train ticket", "Taxi", "Detergent", "Toilet paper", "Shampoo", "Rice",
+    "Bread", "Eggs", "Milk", "Chicken", "Udon", "Curry", "Pizza", "Movie",
+    "Book", "Haircut", "Phone bill", "Electricity", "Gas bill", "Rent",
+    "Flight", "Hotel", "Gift", "Flowers", "Wine", "Snacks", "Ice cream",
+]
+PLACES = [
+    "7-11", "Lawson", "FamilyMart", "Aeon", "Amazon", "Don Quijote", "Station",
+    "Airport", "Izakaya", "Cafe", "Market", "Online", "Drugstore", "Daiso",
+]
+
+
+def populate(db: Repository, rows: int, seed: int = 0) -> None:
+    """Fill a repository with 'rows' synthetic expenses and tag links."""
+
+    rng = random.Random(seed)
+    if not db.lookup[Lookup.NAME_FROM_ID]:
+        with db.conn:
+            for tag in DEFAULT_TAGS:
+                db.add_tag(tag)
+    tag_ids = list(db.lookup[Lookup.NAME_FROM_ID].keys())
+    first_day = date(2015, 1, 1)
+    query = "SELECT COALESCE(MAX(id), 0) FROM expenses"
+    start_id = db.conn.execute(query).fetchone()[0]
+
+    expenses = []
+    expense_tags = []
+    for expense_id in range(start_id + 1, start_id + rows + 1):
+        day = first_day + timedelta(days=rng.randrange(3650))
+        expenses.append(
+            (
+                expense_id,
+                day.isoformat(),
+                f"{rng.choice(ITEMS)} {rng.choice(PLACES)}",
+                rng.randrange(50, 20000),
+                "",
+            )
+        )
+        for tag_id in rng.sample(tag_ids, rng.choice((1, 1, 1, 2))):
+            expense_tags.append((expense_id, tag_id))
+
+    with db.conn:
+        db.conn.executemany("INSERT INTO expense_tags VALUES (?, ?)", expense_tags)
+        db.conn.executemany(
+            "INSERT INTO expenses (id, date, name, cost, category) "
+            "VALUES (?, ?, ?, ?, ?)",
+            expenses,
+        )
+        dedup.backfill(db.conn)
+
+
+@contextmanager
+def count_queries(db: Repository) -> Iterator[list[str]]:
+    """Collect every SQL statement the repository runs inside the block."""
+
+    statements: list[str] = []
+
+    def record(statement: str) -> None:
+        # Read snapshots open and close a transaction around every call.
+        if statement not in TRANSACTION_CONTROL:
+            statements.append(statement)
+
+    db.pool.set_trace_callback(record)
+    try:
+        yield statements
+    finally:
+        db.pool.set_trace_callback(None)
+
+
+def timed(function, *args, repeat: int = 5, **kwargs) -> float:
+    """Return the best wall time in seconds over 'repeat' calls."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,92 @@
+"""Generate realistic synthetic ledgers into a SQLite database.
+
+Costs follow a log-normal distribution (many small purchases, a long tail of
+large ones), tag popularity follows a Zipf-like curve controlled by
+'tag_skew', and 'multi_tag_ratio' of the expenses get two or three tags.
+Rows go through Repository.add_expenses, so rollups and search are filled in
+exactly as for a real import. The same spec and seed always produce the
+same ledger.
+
+Usage from the project root:
+    python -m benchmarks.ledger DB_PATH [ROWS] [TAGS] [DAYS] [MULTI_TAG_RATIO]
+"""
+import datetime
+import random
+import sys
+import time
+from itertools import accumulate
+from typing import Iterator, NamedTuple
+
+from entities.expense import Expense
+from repository.repository import Repository
+from benchmarks.common import DEFAULT_TAGS, ITEMS, PLACES
+
+
+class LedgerSpec(NamedTuple):
+    """Shape of a synthetic ledger."""
+
+    rows: int = 100_000
+    tags: int = 20
+    # 0 makes every tag equally likely; larger values favour the first tags.
+    tag_skew: float = 1.0
+    start: datetime.date = datetime.date(2015, 1, 1)
+    days: int = 3650
+    multi_tag_ratio: float = 0.25
+    seed: int = 0
+
+
+def tag_names(count: int) -> list[str]:
+    """Return 'count' tag names, starting with the app's default tags."""
+
+    extra = [f"Tag {index}" for index in range(count - len(DEFAULT_TAGS))]
+    return (DEFAULT_TAGS + extra)[:count]
+
+
+def expenses(spec: LedgerSpec) -> Iterator[Expense]:
+    """Lazily yield the expenses of a ledger."""
+
+    rng = random.Random(spec.seed)
+    tags = tag_names(spec.tags)
+    cumulative = list(
+        accumulate(1 / rank**spec.tag_skew for rank in range(1, len(tags) + 1))
+    )
+    for _ in range(spec.rows):
+        day = spec.start + datetime.timedelta(days=rng.randrange(spec.days))
+        count = rng.choice((2, 3)) if rng.random() < spec.multi_tag_ratio else 1
+        chosen: list[str] = []
+        while len(chosen) < min(count, len(tags)):
+            tag = rng.choices(tags, cum_weights=cumulative)[0]
+            if tag not in chosen:
+                chosen.append(tag)
+        yield Expense(
+            0,
+            name=f"{rng.choice(ITEMS)} {rng.choice(PLACES)}",
+            cost=max(1, round(rng.lognormvariate(6.5, 1.0))),
+            tags=chosen,
+            date=day,
+        )
+
+
+def generate(db: Repository, spec: LedgerSpec) -> int:
+    """Append a synthetic ledger to 'db' and return how many rows were added."""
+
+    return db.add_expenses(expenses(spec), create_tags=True)
+
+
+def main(argv: list[str]) -> None:
+    """Write a ledger shaped by the command line to the named database."""
+
+    fields = (int, int, int, float)
+    names = ("rows", "tags", "days", "multi_tag_ratio")
+    options = {
+        name: kind(value) for name, kind, value in zip(names, fields, argv[2:])
+    }
+    db = Repository(path=argv[1])
+    start = time.perf_counter()
+    rows = generate(db, LedgerSpec(**options))
+    print(f"Wrote {rows:,} expenses in {time.perf_counter() - start:.1f}s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,102 @@
+"""Load-test AsyncRepository with hundreds of concurrent coroutines.
+
+Each coroutine plays one API client issuing a few requests: recent expenses,
+a month, the month totals or an add_expense. Per-request latency percentiles
+are reported together with the event loop's worst lag, measured by a
+heartbeat task. The same load is also run calling Repository directly from
+the coroutines, which blocks the loop for every query.
+
+Run from the project root: python -m benchmarks.load_async
+"""
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from entities.expense import Expense
+from repository.async_repository import AsyncRepository
+from repository.repository import Repository
+from benchmarks.common import populate
+
+ROWS = 100_000
+CLIENTS = (10, 100, 500)
+REQUESTS_PER_CLIENT = 10
+WRITE_SHARE = 0.1
+HEARTBEAT = 0.005
+
+
+async def request(repo, rng: random.Random) -> None:
+    """Issue one random request and await it."""
+
+    choice = rng.random()
+    if choice < WRITE_SHARE:
+        cost = rng.randrange(1, 5000)
+        result = repo.add_expense(Expense(0, "Load", cost, "Dining", "2021-06-01"))
+    elif choice < 0.5:
+        result = repo.get_limit(20)
+    elif choice < 0.9:
+        result = repo.get_month(str(rng.randrange(1, 13)), "2019")
+    else:
+        result = repo.get_month_totals()
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def load(repo, clients: int) -> tuple[list[float], float, float]:
+    """Return (request latencies, wall seconds, worst event-loop lag)."""
+
+    latencies: list[float] = []
+    worst_lag = 0.0
+    running = True
+
+    async def heartbeat() -> None:
+        nonlocal worst_lag
+        while running:
+            due = time.perf_counter() + HEARTBEAT
+            await asyncio.sleep(HEARTBEAT)
+            worst_lag = max(worst_lag, time.perf_counter() - due)
+
+    async def client(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(REQUESTS_PER_CLIENT):
+            start = time.perf_counter()
+            # Queue behind the other clients like a new request would, so time
+            # spent waiting for a blocked loop counts towards the latency.
+            await asyncio.sleep(0)
+            await request(repo, rng)
+            latencies.append(time.perf_counter() - start)
+
+    monitor = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(client(seed) for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor
+    return latencies, elapsed, worst_lag
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "expenses.db")
+        db = Repository(path=path, profile="fast")
+        populate(db, ROWS)
+        repo = AsyncRepository(db)
+
+        for label, target in (("blocking", db), ("async", repo)):
+            for clients in CLIENTS:
+                latencies, elapsed, lag = await load(target, clients)
+                quantiles = statistics.quantiles(latencies, n=100)
+                print(
+                    f"{label:<8} {clients:4} clients | "
+                    f"{len(latencies) / elapsed:7,.0f} req/s | "
+                    f"p50 {quantiles[49] * 1000:7.1f} ms "
+                    f"p99 {quantiles[98] * 1000:7.1f} ms | "
+                    f"worst loop lag {lag * 1000:6.1f} ms"
+                )
+        await repo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""Hammer one shared Repository with mixed reads and writes from many threads.
+
+Each thread picks a random call in a loop for a few seconds: recent expenses,
+a month, the total, a search, a tag page or add_expense. Afterwards the row
+count must equal the seeded rows plus every successful add, and the rollups
+must still match a full recompute. Finally, as many threads as readers
+read at once while the tag lookup is unloaded, which must not deadlock.
+
+Run from the project root: python -m benchmarks.stress_threads
+"""
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from entities.expense import Expense
+from repository import rollups
+from repository.repository import Repository
+from benchmarks.common import populate
+
+ROWS = 100_000
+THREADS = (1, 4, 16)
+SECONDS = 5.0
+WRITE_SHARE = 0.2
+
+READS = {
+    "get_limit": lambda db, rng: db.get_limit(20),
+    "get_month": lambda db, rng: db.get_month(str(rng.randrange(1, 13)), "2019"),
+    "get_total": lambda db, rng: db.get_total(),
+    "search": lambda db, rng: db.search(rng.choice(("cof", "ramen", "taxi"))),
+    "get_tag": lambda db, rng: db.get_tag("Dining", 50),
+}
+
+
+def run(db: Repository, threads: int) -> tuple[Counter, Counter, int]:
+    """Return (calls per operation, errors per type, rows added)."""
+
+    calls: Counter = Counter()
+    errors: Counter = Counter()
+    added = []
+    deadline = time.perf_counter() + SECONDS
+
+    def work(seed: int) -> None:
+        rng = random.Random(seed)
+        local_calls: Counter = Counter()
+        local_errors: Counter = Counter()
+        local_added = 0
+        while time.perf_counter() < deadline:
+            if rng.random() < WRITE_SHARE:
+                operation = "add_expense"
+                cost = rng.randrange(1, 5000)
+                expense = Expense(0, "Stress", cost, "Dining", "2021-06-01")
+            else:
+                operation = rng.choice(list(READS))
+            try:
+                if operation == "add_expense":
+                    db.add_expense(expense)
+                    local_added += 1
+                else:
+                    READS[operation](db, rng)
+            except Exception as error:
+                local_errors[type(error).__name__] += 1
+            local_calls[operation] += 1
+        calls.update(local_calls)
+        errors.update(local_errors)
+        added.append(local_added)
+
+    workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return calls, errors, sum(added)
+
+
+def cold_lookup(db: Repository, rounds: int = 50, timeout: float = 5.0) -> int:
+    """Return how many rounds hung with every reader loading the tag lookup."""
+
+    hung = 0
+    for _ in range(rounds):
+        db._lookup = None
+        barrier = threading.Barrier(db.pool.readers)
+
+        def work() -> None:
+            barrier.wait()
+            db.get_limit(5)
+
+        workers = [
+            threading.Thread(target=work, daemon=True)
+            for _ in range(barrier.parties)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout)
+        if any(worker.is_alive() for worker in workers):
+            hung += 1
+            break
+    return hung
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "expenses.db")
+        db = Repository(path=path)
+        populate(db, ROWS)
+        expected_rows = ROWS
+
+        for threads in THREADS:
+            calls, errors, added = run(db, threads)
+            expected_rows += added
+            print(
+                f"{threads:3} threads | {sum(calls.values()) / SECONDS:9,.0f} calls/s "
+                f"| {calls['add_expense'] / SECONDS:7,.0f} writes/s "
+                f"| errors: {dict(errors) or 0}"
+            )
+
+        rows = db.conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+        mismatches = rollups.verify(db.conn)
+        print(
+            f"rows {rows:,} (expected {expected_rows:,}), "
+            f"{len(mismatches)} mismatched rollup rows"
+        )
+        db.close()
+
+        db = Repository(path=path, readers=2)
+        print(f"cold tag lookup: {cold_lookup(db)} hung rounds")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
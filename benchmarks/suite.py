@@ -0,0 +1,205 @@
+"""Time every public Repository method on synthetic ledgers of several sizes.
+
+For each ledger size a database is generated with benchmarks.ledger, then
+each method is run once under count_queries, once under tracemalloc for its
+peak Python allocation, and repeatedly for its best and median wall time.
+Fast reads are looped inside each timing sample so that samples are long
+enough to measure; writes are timed one call per sample, and each
+add_expense row is removed again by remove_expense.
+
+Results are printed and can be written to JSON; passing an earlier JSON file
+with --compare reports methods that got slower than REGRESSION times their
+old best time and exits with status 1 if any did.
+
+Run from the project root:
+    python -m benchmarks.suite [--sizes 1000,100000] [--output results.json]
+                               [--compare baseline.json]
+"""
+import argparse
+import datetime
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from entities.expense import Expense
+from repository.repository import Repository
+from benchmarks.common import count_queries
+from benchmarks.ledger import LedgerSpec, generate
+
+SIZES = (1_000, 100_000, 1_000_000)
+REPEAT = 5
+WRITE_REPEAT = 20
+# Calls slower than this many seconds are timed once instead of REPEAT times.
+TIME_BUDGET = 1.0
+# Reads faster than this are called several times per timing sample.
+MIN_SAMPLE = 0.02
+# Sub-millisecond timings vary by a few tens of percent between runs.
+REGRESSION = 1.5
+
+EXPENSE = Expense(0, "Benchmark", 500, ["Dining"], "2020-06-15")
+REPORT_SINCE = datetime.date(2024, 1, 1)
+WRITES = ("add_expense", "remove_expense")
+
+
+def cases() -> dict[str, Callable[[Repository], Any]]:
+    """Return the calls to time, keyed by the method they exercise."""
+
+    added: list[int] = []
+    # create_report counts back from today; reach the ledger's last year.
+    report_days = (datetime.date.today() - REPORT_SINCE).days
+
+    def remove(db: Repository) -> None:
+        # Removes the rows add_expense created, so the ledger stays the same.
+        if added:
+            db.remove_expense(added.pop())
+
+    return {
+        "get_all": lambda db: db.get_all(),
+        "get_limit": lambda db: db.get_limit(100),
+        "get_tag": lambda db: db.get_tag("Dining", 100),
+        "get_month": lambda db: db.get_month("6", "2020"),
+        "get_over": lambda db: db.get_over(5000, 100),
+        "order_by_price": lambda db: db.order_by_price(100),
+        "get_total": lambda db: db.get_total(),
+        "get_page": lambda db: db.get_page("date", after=("2020-06-15", 0)),
+        "get_month_totals": lambda db: db.get_month_totals(),
+        "search": lambda db: db.search("coffee"),
+        "create_report": lambda db: db.create_report(report_days),
+        "add_expense": lambda db: added.append(db.add_expense(EXPENSE)),
+        "remove_expense": remove,
+    }
+
+
+def measure(db: Repository, call: Callable[[Repository], Any], write: bool) -> dict:
+    """Run one case and return its query count, peak memory and timings."""
+
+    with count_queries(db) as statements:
+        start = time.perf_counter()
+        call(db)
+        first = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        call(db)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    if write:
+        number, repeat = 1, WRITE_REPEAT
+    else:
+        number = max(1, min(1000, int(MIN_SAMPLE / max(first, 1e-6))))
+        repeat = REPEAT if first * number * REPEAT <= TIME_BUDGET else 1
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            call(db)
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        "queries": len(statements),
+        "peak_kib": round(peak / 1024, 1),
+        "best_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "calls": number * repeat,
+    }
+
+
+def environment() -> dict:
+    """Describe where the results were recorded."""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "recorded": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def run(sizes: list[int]) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            db = Repository(path=str(Path(directory) / f"{rows}.db"))
+            start = time.perf_counter()
+            generate(db, LedgerSpec(rows=rows))
+            print(f"{rows:,} rows generated in {time.perf_counter() - start:.1f}s")
+
+            for method, call in cases().items():
+                timings = measure(db, call, method in WRITES)
+                result = {"rows": rows, "method": method, **timings}
+                results.append(result)
+                print(
+                    f"  {method:<17} best {result['best_ms']:10.3f} ms "
+                    f"median {result['median_ms']:10.3f} ms | "
+                    f"{result['queries']:4} queries | "
+                    f"peak {result['peak_kib']:12,.1f} KiB"
+                )
+            db.close()
+    return results
+
+
+def compare(results: list[dict], baseline_path: str) -> bool:
+    """Print slowdowns against a baseline file; return True if none regressed."""
+
+    baseline = json.loads(Path(baseline_path).read_text())
+    old = {(row["rows"], row["method"]): row for row in baseline["results"]}
+    passed = True
+    for result in results:
+        previous = old.get((result["rows"], result["method"]))
+        if previous is None or not previous["best_ms"]:
+            continue
+        ratio = result["best_ms"] / previous["best_ms"]
+        regressed = ratio > REGRESSION
+        passed = passed and not regressed
+        if regressed or result["queries"] != previous["queries"]:
+            print(
+                f"{'REGRESSED' if regressed else 'changed':<10}"
+                f"{result['method']:<17} at {result['rows']:>9,} rows: "
+                f"{ratio:5.2f}x time, queries "
+                f"{previous['queries']} -> {result['queries']}"
+            )
+    return passed
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in SIZES),
+        help="comma-separated ledger sizes",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results to check for regressions")
+    options = parser.parse_args(argv)
+
+    results = run([int(size) for size in options.sizes.split(",")])
+    if options.output:
+        report = {"environment": environment(), "results": results}
+        Path(options.output).write_text(json.dumps(report, indent=2))
+    if options.compare:
+        return 0 if compare(results, options.compare) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -12,6 +12,14 @@ class CheckboxGroup(Component):
         self.targets = targets
         self.checkboxes = self.create_checkboxes()
 
+    def set_targets(self, targets: List[str]) -> None:
+        """Replace the checkboxes, e.g. once tags have loaded in the background."""
+
+        for checkbox in self.checkboxes.values():
+            checkbox["button"].destroy()
+        self.targets = targets
+        self.checkboxes = self.create_checkboxes()
+
     def create_checkboxes(self):
         checkboxes: Dict[str, TagInfo] = {}
 
@@ -5,10 +5,9 @@ from entities.expense import Expense
 from components import InputField, AppButton, CheckboxGroup, RadioButtonGroup
 from components.base import Component, Box
 from constants import (
-    DOLLAR_TO_YEN,
+    CURRENCY_CODES,
     ComponentNames,
     Currencies,
-    Lookup,
 )
 from define.types import FieldInfo
 
@@ -22,6 +21,7 @@ class InputBox(Box):
         self.components = self.create_components()
         self.render_components()
         self.reset_cursor()
+        self.load_tags()
 
     def create_components(self):
         components: Dict[ComponentNames, Component] = {}
@@ -38,13 +38,21 @@ class InputBox(Box):
         components[ComponentNames.CURRENCY] = RadioButtonGroup(
             self, Currencies, Currencies.YEN, "Currency: "
         )
-        tags = self.db.lookup[Lookup.ID_FROM_NAME].keys()
-        components[ComponentNames.TAGS] = CheckboxGroup(self, tags)
+        # Tags are filled in by load_tags once the worker has read them, so the
+        # window does not wait for the database to open.
+        components[ComponentNames.TAGS] = CheckboxGroup(self, [])
 
         components[ComponentNames.CREATE] = AppButton(self, self.create_expense)
 
         return components
 
+    def load_tags(self) -> None:
+        """Fetch tag names on the worker and show them when they arrive."""
+
+        self.db.submit(
+            "get_tag_names", callback=self.components[ComponentNames.TAGS].set_targets
+        )
+
     def create_expense(self):
         name = self.components[ComponentNames.NAME].get()
         cost = self.components[ComponentNames.COST].get()
@@ -56,11 +64,25 @@ class InputBox(Box):
             date = datetime.date.today()
 
         if currency == Currencies.DOLLARS.value:
-            cost = str(round(float(cost) / DOLLAR_TO_YEN))
-
-        expense = Expense(0, date=date, name=name, cost=cost, tags=tags)
-
-        self.db.add_expense(expense)
+            # Stored with the dollar amount; the repository converts it to yen
+            # at the rate for the expense's date.
+            expense = Expense(
+                0,
+                date=date,
+                name=name,
+                cost=None,
+                tags=tags,
+                original_amount=float(cost),
+                currency=CURRENCY_CODES[Currencies.DOLLARS],
+            )
+        else:
+            expense = Expense(0, date=date, name=name, cost=cost, tags=tags)
+
+        self.db.submit(
+            "add_expense",
+            expense,
+            callback=lambda _: self.event_generate("<<ExpenseAdded>>"),
+        )
         self.clear_fields()
         self.reset_cursor()
 
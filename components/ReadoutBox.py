@@ -1,9 +1,166 @@
 import tkinter as tk
+from collections import deque
+from tkinter import ttk
+from typing import Deque, List, Optional
+
 from components.base.Box import Box
+from entities.expense import Expense
 
 
 class ReadoutBox(Box):
-    def __init__(self, parent, db, **kwargs):
+    """Scrollable list of expenses that only keeps a few pages in memory.
+
+    Pages are fetched from the repository worker with keyset pagination as the
+    view approaches either edge of the loaded window, and pages beyond
+    'max_pages' are dropped from the opposite edge, so browsing any number of
+    expenses holds at most page_size * max_pages rows.
+    """
+
+    COLUMNS = {
+        "date": ("Date", 90),
+        "name": ("Name", 200),
+        "cost": ("Cost", 80),
+        "tags": ("Tags", 160),
+    }
+    SORTABLE = ("date", "cost")
+    # Fraction of the scroll range from an edge at which the next page loads.
+    EDGE = 0.1
+
+    def __init__(
+        self, parent, db, page_size: int = 100, max_pages: int = 3, **kwargs
+    ) -> None:
         super().__init__(parent, db, **kwargs)
-        self.pack(side="right")
-        tk.Button().pack()
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.order_by = "id"
+        self.descending = True
+        self.pages: Deque[List[Expense]] = deque()
+        self.more_before = False
+        self.more_after = True
+        self.loading = False
+        # Bumped on every reload so pages requested for an old order are ignored.
+        self.generation = 0
+
+        self.tree = self.create_tree()
+        self.scrollbar = ttk.Scrollbar(
+            self, orient="vertical", command=self.tree.yview
+        )
+        self.tree.configure(yscrollcommand=self.on_view_changed)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.bind_all("<<ExpenseAdded>>", lambda event: self.reload(), add="+")
+        self.reload()
+
+    def create_tree(self) -> ttk.Treeview:
+        tree = ttk.Treeview(
+            self, columns=list(self.COLUMNS), show="headings", height=20
+        )
+        for column, (heading, width) in self.COLUMNS.items():
+            command = ""
+            if column in self.SORTABLE:
+                command = lambda column=column: self.sort_by(column)
+            tree.heading(column, text=heading, command=command)
+            tree.column(column, width=width, anchor="e" if column == "cost" else "w")
+        return tree
+
+    def sort_by(self, column: str) -> None:
+        """Sort by a column, flipping the direction when it is already used."""
+
+        if self.order_by == column:
+            self.descending = not self.descending
+        else:
+            self.order_by = column
+            self.descending = True
+        self.reload()
+
+    def reload(self) -> None:
+        """Discard the loaded window and fetch the first page again."""
+
+        self.generation += 1
+        self.pages.clear()
+        self.tree.delete(*self.tree.get_children())
+        self.more_before = False
+        self.more_after = True
+        self.loading = False
+        self.request_page(after=None)
+
+    def on_view_changed(self, first: str, last: str) -> None:
+        """Update the scrollbar and load a page when nearing an edge."""
+
+        self.scrollbar.set(first, last)
+        if self.loading or not self.pages:
+            return
+        if float(last) >= 1 - self.EDGE and self.more_after:
+            self.request_page(after=self.key(self.pages[-1][-1]))
+        elif float(first) <= self.EDGE and self.more_before:
+            self.request_page(before=self.key(self.pages[0][0]))
+
+    def key(self, expense: Expense) -> tuple:
+        """Return the (sort value, id) keyset position of an expense."""
+
+        if self.order_by == "id":
+            return (expense.key, expense.key)
+        return (getattr(expense, self.order_by), expense.key)
+
+    def request_page(
+        self, after: Optional[tuple] = None, before: Optional[tuple] = None
+    ) -> None:
+        self.loading = True
+        generation = self.generation
+        self.db.submit(
+            "get_page",
+            order_by=self.order_by,
+            descending=self.descending,
+            after=after,
+            before=before,
+            limit=self.page_size,
+            callback=lambda page: self.show_page(page, generation, before is None),
+        )
+
+    def show_page(self, page: List[Expense], generation: int, forward: bool) -> None:
+        """Add a fetched page to one edge of the window and trim the other."""
+
+        if generation != self.generation:
+            return
+        self.loading = False
+
+        if forward:
+            self.more_after = len(page) == self.page_size
+        else:
+            self.more_before = len(page) == self.page_size
+        if not page:
+            return
+
+        if forward:
+            anchor = self.pages[-1][-1] if self.pages else None
+            self.pages.append(page)
+            for expense in page:
+                self.insert(expense, tk.END)
+            if len(self.pages) > self.max_pages:
+                self.remove(self.pages.popleft())
+                self.more_before = True
+        else:
+            anchor = self.pages[0][0]
+            self.pages.appendleft(page)
+            for index, expense in enumerate(page):
+                self.insert(expense, index)
+            if len(self.pages) > self.max_pages:
+                self.remove(self.pages.pop())
+                self.more_after = True
+
+        # Keep the row the user was looking at in view while rows shift.
+        if anchor is not None:
+            self.tree.see(str(anchor.key))
+
+    def insert(self, expense: Expense, index) -> None:
+        self.tree.insert(
+            "",
+            index,
+            iid=str(expense.key),
+            values=(expense.date, expense.name, expense.cost, ", ".join(expense.tags)),
+        )
+
+    def remove(self, page: List[Expense]) -> None:
+        self.tree.delete(*(str(expense.key) for expense in page))
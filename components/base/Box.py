@@ -1,9 +1,11 @@
 import tkinter as tk
+from typing import TYPE_CHECKING
 
-from repository.repository import Repository
+if TYPE_CHECKING:
+    from repository.worker import RepositoryWorker
 
 
 class Box(tk.Frame):
-    def __init__(self, root, db: Repository, **kwargs) -> None:
+    def __init__(self, root, db: "RepositoryWorker", **kwargs) -> None:
         super().__init__(root, **kwargs)
         self.db = db
@@ -20,4 +20,14 @@ class Currencies(Enum):
     DOLLARS = "Dollars"
 
 
+# Costs are stored in this currency; other currencies keep their original
+# amount alongside.
+BASE_CURRENCY = "JPY"
+
+CURRENCY_CODES = {Currencies.YEN: "JPY", Currencies.DOLLARS: "USD"}
+
+# Dollars per yen, used only when the exchange_rates table has no USD rate.
 DOLLAR_TO_YEN = 0.0077
+
+# Yen per unit of each currency when the exchange_rates table has none.
+FALLBACK_RATES = {"USD": 1 / DOLLAR_TO_YEN}
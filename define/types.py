@@ -1,10 +1,12 @@
-from typing_extensions import TypedDict
-import tkinter as tk
+from typing import TYPE_CHECKING, TypedDict
+
+if TYPE_CHECKING:
+    import tkinter as tk
 
 
 class TagInfo(TypedDict):
     value: int
-    button: tk.Checkbutton
+    button: "tk.Checkbutton"
 
 
 class FieldInfo(TypedDict):
@@ -1,18 +1,35 @@
 import datetime
+from typing import Optional
 
 class Expense:
     """An Expense object to store values from a database record."""
 
+    __slots__ = ("key", "date", "name", "cost", "tags", "original_amount", "currency")
+
     def __init__(
-        self, primary_key, name: str, cost: int, tags: str, date: datetime.datetime
+        self,
+        primary_key,
+        name: str,
+        cost: int,
+        tags: str,
+        date: datetime.datetime,
+        original_amount: Optional[float] = None,
+        currency: Optional[str] = None,
     ) -> None:
-        """Set attributes to Expense object."""
+        """Set attributes to Expense object.
+
+        'cost' is in yen. An expense paid in another currency also carries
+        the amount paid and its currency code; it may be given with cost None,
+        to be converted when it is stored.
+        """
 
         self.key = primary_key
         self.date = date
         self.name = name
         self.cost = cost
         self.tags = tags
+        self.original_amount = original_amount
+        self.currency = currency
 
     def __repr__(self) -> str:
         """Return string formatted to be same as initialized expense."""
@@ -0,0 +1,64 @@
+import datetime
+from array import array
+from typing import Iterable
+
+
+class ExpenseBatch:
+    """Columnar storage for many expenses in contiguous typed arrays.
+
+    Row i has id ids[i], cost costs[i] and date days[i], stored as a proleptic
+    Gregorian ordinal (datetime.date.toordinal). Its tag ids are
+    tag_ids[tag_offsets[i]:tag_offsets[i + 1]]. Names are left out; look rows
+    up through the Repository when they are needed for display.
+    """
+
+    __slots__ = ("ids", "costs", "days", "tag_offsets", "tag_ids")
+
+    def __init__(self) -> None:
+        """Create an empty batch."""
+
+        self.ids = array("q")
+        self.costs = array("d")
+        self.days = array("l")
+        self.tag_offsets = array("q", [0])
+        self.tag_ids = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self) -> str:
+        return f"ExpenseBatch({len(self)} expenses, {self.nbytes} bytes)"
+
+    def append(self, id: int, cost: float, day: int, tag_ids: Iterable[int]) -> None:
+        """Add one expense to the end of the batch."""
+
+        self.ids.append(id)
+        self.costs.append(cost)
+        self.days.append(day)
+        self.tag_ids.extend(tag_ids)
+        self.tag_offsets.append(len(self.tag_ids))
+
+    def tags_of(self, index: int) -> array:
+        """Return the tag ids of the expense at 'index'."""
+
+        return self.tag_ids[self.tag_offsets[index] : self.tag_offsets[index + 1]]
+
+    def date_of(self, index: int) -> datetime.date:
+        """Return the date of the expense at 'index'."""
+
+        return datetime.date.fromordinal(self.days[index])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+
+        return sum(
+            column.itemsize * len(column)
+            for column in (
+                self.ids,
+                self.costs,
+                self.days,
+                self.tag_offsets,
+                self.tag_ids,
+            )
+        )
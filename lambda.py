@@ -1,23 +1,48 @@
 import json
-import mysql.connector
-import os
+
+from repository.backends import MySQLBackend
+from repository.store import ExpenseStore
+
+# The handler expects the tables MySQLBackend.SCHEMA creates. Reads select
+# expenses.id, date, name, cost, original_amount and currency by name, so a
+# table from before the store, laid out as id, name, cost, tags, date,
+# created_at, updated_at, needs original_amount DOUBLE and currency VARCHAR(3)
+# added first; until then reads fail instead of mixing up columns.
+#
+# Created once per container; warm invocations reuse its open connection
+# instead of connecting and closing on every event.
+store = ExpenseStore(MySQLBackend.from_environment())
+
+ACTIONS = {
+    "get_limit": store.get_limit,
+    "get_month": store.get_month,
+    "get_total": store.get_total,
+}
+
+
+def serialize(result):
+    """Turn Expense objects into JSON-compatible dictionaries."""
+
+    if isinstance(result, list):
+        return [serialize(item) for item in result]
+    if hasattr(result, "key"):
+        return {
+            "id": result.key,
+            "date": result.date,
+            "name": result.name,
+            "cost": result.cost,
+            "tags": result.tags,
+        }
+    return result
 
 
 def lambda_handler(event, context):
-    user = os.environ["PERSONAL_DB_USER"]
-    password = os.environ["PERSONAL_DB_PASS"]
-    host = os.environ["PERSONAL_DB_HOST"]
-    database = os.environ["PERSONAL_DB_DB"]
-    print(user)
-    print(password)
-    print(host)
-    print(database)
-    cnx = mysql.connector.connect(
-        user=user,
-        password=password,
-        host=host,
-        database=database,
-    )
-    cnx.close()
-
-    return {"statusCode": 200, "body": json.dumps("Success")}
+    action = event.get("action")
+    if action is None:
+        store.backend.connection()
+        return {"statusCode": 200, "body": json.dumps("Success")}
+    if action not in ACTIONS:
+        return {"statusCode": 400, "body": json.dumps(f"Unknown action {action}")}
+
+    result = ACTIONS[action](**event.get("parameters", {}))
+    return {"statusCode": 200, "body": json.dumps(serialize(result))}
@@ -0,0 +1,66 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from repository.repository import Repository
+
+
+class AsyncRepository:
+    """Awaitable facade over a Repository for asyncio services.
+
+    Every Repository method is available as a coroutine, e.g.
+    'await repo.get_month("04", "2021")'. Calls run on a thread pool sized to
+    the connection pool, one thread per reader plus one for the writer, so
+    reads proceed in parallel while the event loop keeps serving other
+    requests. The lazy iter_* methods are not offered; use their get_*
+    counterparts. Properties may query the database on first use, so they
+    are not offered either; await get_lookup() for the tag lookup.
+    """
+
+    def __init__(self, db: Repository, max_workers: Optional[int] = None) -> None:
+        """Wrap a Repository and start its thread pool."""
+
+        self.db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or db.pool.readers + 1,
+            thread_name_prefix="repository",
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        if isinstance(getattr(type(self.db), name, None), property):
+            raise AttributeError(
+                f"{name} may query the database; use await get_{name}() instead"
+            )
+        attribute = getattr(self.db, name)
+        if not callable(attribute):
+            return attribute
+        if name.startswith("iter_"):
+            raise AttributeError(f"{name} is not available on AsyncRepository")
+
+        @functools.wraps(attribute)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(attribute, *args, **kwargs)
+
+        return call
+
+    async def get_lookup(self) -> dict:
+        """Return the tag lookup tables, loading them on the thread pool."""
+
+        return await self.run(lambda: self.db.lookup)
+
+    async def run(self, function, *args: Any, **kwargs: Any) -> Any:
+        """Run any blocking function of the repository on the thread pool."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+    async def close(self) -> None:
+        """Wait for running calls, then close the thread pool and Repository."""
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._executor.shutdown
+        )
+        self.db.close()
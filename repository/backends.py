@@ -0,0 +1,140 @@
+"""Database servers the portable ExpenseStore can run on.
+
+A backend opens DB-API connections, keeps one open for reuse, rewrites the
+shared ':name' placeholders to its driver's style and creates the core tables.
+Drivers and the SQLite tuning modules are imported on first use, so a service
+only loads the one it connects with.
+"""
+import os
+import re
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from repository.connection import ConnectionProfile
+
+PLACEHOLDER = re.compile(r"(?<!:):([A-Za-z_][A-Za-z0-9_]*)")
+
+
+class Backend:
+    """Connection factory and SQL dialect of one database server."""
+
+    name = ""
+
+    def __init__(self) -> None:
+        self._connection: Optional[Any] = None
+
+    def connect(self) -> Any:
+        """Open a new DB-API connection."""
+
+        raise NotImplementedError
+
+    def create_schema(self, conn: Any) -> None:
+        """Create the expenses, tags and expense_tags tables if missing."""
+
+        raise NotImplementedError
+
+    def prepare(self, query: str) -> str:
+        """Rewrite ':name' placeholders to the driver's parameter style."""
+
+        return query
+
+    def connection(self) -> Any:
+        """Return the kept-open connection, connecting on first use."""
+
+        if self._connection is None:
+            self._connection = self.connect()
+        return self._connection
+
+    def close(self) -> None:
+        """Close the kept-open connection; the next use reconnects."""
+
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+
+
+class SQLiteBackend(Backend):
+    """Local database file, using the same schema and tuning as Repository."""
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str = "expenses.db",
+        profile: Union["ConnectionProfile", str] = "durable",
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.profile = profile
+
+    def connect(self) -> "sqlite3.Connection":
+        from repository.connection import connect
+
+        return connect(self.path, self.profile)
+
+    def create_schema(self, conn: "sqlite3.Connection") -> None:
+        from repository.migrations import migrate
+
+        migrate(conn)
+
+
+class MySQLBackend(Backend):
+    """MySQL-compatible server reached with mysql-connector-python."""
+
+    name = "mysql"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS expenses ("
+        "id INTEGER PRIMARY KEY AUTO_INCREMENT, date VARCHAR(10), "
+        "name VARCHAR(255), cost INTEGER, category VARCHAR(255) DEFAULT '', "
+        "original_amount DOUBLE, currency VARCHAR(3), "
+        "INDEX expenses_date (date), INDEX expenses_cost (cost))",
+        "CREATE TABLE IF NOT EXISTS tags ("
+        "id INTEGER PRIMARY KEY AUTO_INCREMENT, name VARCHAR(255) NOT NULL, "
+        "UNIQUE INDEX tags_name (name))",
+        "CREATE TABLE IF NOT EXISTS expense_tags ("
+        "expense_id INTEGER NOT NULL, tag_id INTEGER NOT NULL, "
+        "UNIQUE INDEX expense_tags_expense_tag (expense_id, tag_id), "
+        "INDEX expense_tags_tag_id (tag_id))",
+    )
+
+    def __init__(self, **connect_options: Any) -> None:
+        super().__init__()
+        self.connect_options = connect_options
+
+    @classmethod
+    def from_environment(cls) -> "MySQLBackend":
+        """Read the PERSONAL_DB_* settings used by the Lambda deployment."""
+
+        return cls(
+            user=os.environ["PERSONAL_DB_USER"],
+            password=os.environ["PERSONAL_DB_PASS"],
+            host=os.environ["PERSONAL_DB_HOST"],
+            database=os.environ["PERSONAL_DB_DB"],
+        )
+
+    def connect(self) -> Any:
+        import mysql.connector
+
+        return mysql.connector.connect(**self.connect_options)
+
+    def connection(self) -> Any:
+        """Return the kept-open connection, reconnecting if the server dropped it.
+
+        Warm Lambda invocations reuse the connection from earlier ones; the
+        ping replaces a full connect and handshake with one round trip.
+        """
+
+        conn = super().connection()
+        conn.ping(reconnect=True, attempts=2)
+        return conn
+
+    def create_schema(self, conn: Any) -> None:
+        cursor = conn.cursor()
+        for statement in self.SCHEMA:
+            cursor.execute(statement)
+        conn.commit()
+
+    def prepare(self, query: str) -> str:
+        return PLACEHOLDER.sub(r"%(\1)s", query.replace("%", "%%"))
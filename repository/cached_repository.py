@@ -0,0 +1,249 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Optional, Union
+
+from entities.expense import Expense
+from repository.dates import DateLike, month_bounds, normalize_date, normalize_year
+from repository.repository import Repository
+
+# Decides whether a cached result could change when the given expense is added
+# or removed. The expense always has a normalized date and a list of tag names.
+Affected = Callable[[Expense], bool]
+
+
+def _always(expense: Expense) -> bool:
+    return True
+
+
+class CachedRepository:
+    """Repository wrapper that caches read results until a write affects them.
+
+    Results are kept in a bounded LRU keyed by method and arguments. Each entry
+    remembers which expenses could change it (a date range, a tag, a cost
+    threshold), so add_expense, remove_expense and update_expense only evict
+    the entries they actually touch; batched writes clear the whole cache.
+    Writes made around this wrapper, directly on the wrapped Repository or by
+    another process, are not seen; call clear() after them. Methods that are
+    not cached are passed straight through.
+
+    The wrapper is safe to share between threads. A lock guards the cache,
+    and results are computed outside it. A result is only stored if no
+    invalidation happened while it was computed, so a read racing a write
+    cannot cache what the write just changed.
+    """
+
+    def __init__(self, db: Repository, max_entries: int = 256) -> None:
+        """Wrap a Repository with an empty cache."""
+
+        self.db = db
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[Any, Affected]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, to spot results computed across one.
+        self._generation = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.db, name)
+
+    def stats(self) -> dict[str, int]:
+        """Return hit, miss and size counters."""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def _cached(self, key: tuple, compute: Callable[[], Any], affected: Affected):
+        """Return a cached result, computing and storing it on a miss."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[0])
+            self.misses += 1
+            generation = self._generation
+
+        result = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (result, affected)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return self._copy(result)
+
+    @staticmethod
+    def _copy(result: Any) -> Any:
+        """Hand out list copies so callers cannot reorder the cached list."""
+
+        return list(result) if isinstance(result, list) else result
+
+    def _invalidate(self, expense: Expense) -> None:
+        """Evict every entry whose result could include or count 'expense'."""
+
+        with self._lock:
+            stale = [
+                key
+                for key, (_, affected) in self._entries.items()
+                if affected(expense)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+
+    def _in_range(self, start: str, end: str) -> Affected:
+        return lambda expense: start <= expense.date < end
+
+    # Reads
+
+    def get_total(self, currency: Optional[str] = None) -> float:
+        return self._cached(
+            ("get_total", currency), lambda: self.db.get_total(currency), _always
+        )
+
+    def get_all(self) -> list[Expense]:
+        return self._cached(("get_all",), self.db.get_all, _always)
+
+    def get_month_totals(self) -> list[tuple[str, int, int]]:
+        return self._cached(("get_month_totals",), self.db.get_month_totals, _always)
+
+    def get_limit(self, limit: int = 10) -> list[Expense]:
+        result = []
+
+        def compute() -> list[Expense]:
+            result.extend(self.db.get_limit(limit))
+            return result
+
+        def affected(expense: Expense) -> bool:
+            # New expenses always have the highest id; removals matter only
+            # inside the window.
+            return len(result) < limit or expense.key >= result[-1].key
+
+        return self._cached(("get_limit", limit), compute, affected)
+
+    def order_by_price(self, limit: int = 100) -> list[Expense]:
+        result = []
+
+        def compute() -> list[Expense]:
+            result.extend(self.db.order_by_price(limit))
+            return result
+
+        def affected(expense: Expense) -> bool:
+            return len(result) < limit or expense.cost >= result[-1].cost
+
+        return self._cached(("order_by_price", limit), compute, affected)
+
+    def get_over(self, upper: int, limit: int = 100) -> list[Expense]:
+        return self._cached(
+            ("get_over", upper, limit),
+            lambda: self.db.get_over(upper, limit),
+            lambda expense: expense.cost > upper,
+        )
+
+    def get_tag(self, tag: str, limit: int = 100) -> list[Expense]:
+        return self._cached(
+            ("get_tag", tag, limit),
+            lambda: self.db.get_tag(tag, limit),
+            lambda expense: tag in expense.tags,
+        )
+
+    def get_range(self, start: DateLike, end: DateLike) -> list[Expense]:
+        start, end = normalize_date(start), normalize_date(end)
+        return self._cached(
+            ("get_range", start, end),
+            lambda: self.db.get_range(start, end),
+            self._in_range(start, end),
+        )
+
+    def get_month(self, month: str, year: str) -> list[Expense]:
+        start, end = month_bounds(normalize_year(year), int(month))
+        return self.get_range(start, end)
+
+    def get_year(self, year: str) -> list[Expense]:
+        year_number = normalize_year(year)
+        start = f"{year_number:04d}-01-01"
+        end = f"{year_number + 1:04d}-01-01"
+        return self.get_range(start, end)
+
+    def get_month_tag_totals(
+        self, month: str, year: str
+    ) -> list[tuple[str, int, int]]:
+        start, end = month_bounds(normalize_year(year), int(month))
+        return self._cached(
+            ("get_month_tag_totals", start),
+            lambda: self.db.get_month_tag_totals(month, year),
+            self._in_range(start, end),
+        )
+
+    # Writes
+
+    def add_expense(self, expense: Expense, **kwargs: Any) -> int:
+        """Insert through the Repository and evict the entries it affects."""
+
+        expense_id = self.db.add_expense(expense, **kwargs)
+        # Read the row back so invalidation sees the stored date, cost and tags
+        # rather than whatever types the caller passed in.
+        self._invalidate(self.db.get_expense(expense_id))
+        return expense_id
+
+    def add_expenses(self, expenses: Iterable[Expense], **kwargs: Any) -> int:
+        """Bulk insert through the Repository and drop the whole cache."""
+
+        try:
+            return self.db.add_expenses(expenses, **kwargs)
+        finally:
+            self.clear()
+
+    def remove_expense(self, expense: Union[Expense, int]) -> None:
+        """Delete through the Repository and evict the entries it affects."""
+
+        removed = self.db.get_expense(expense)
+        self.db.remove_expense(expense)
+        if removed is not None:
+            self._invalidate(removed)
+
+    def remove_expenses(self, expenses: Iterable[Union[Expense, int]]) -> int:
+        """Batch delete through the Repository and drop the whole cache."""
+
+        try:
+            return self.db.remove_expenses(expenses)
+        finally:
+            self.clear()
+
+    def update_expense(self, expense: Expense) -> bool:
+        """Update through the Repository and evict entries for both versions."""
+
+        previous = self.db.get_expense(expense)
+        updated = self.db.update_expense(expense)
+        if previous is not None:
+            self._invalidate(previous)
+            self._invalidate(self.db.get_expense(expense))
+        return updated
+
+    def load_exchange_rates(self, path: Any) -> int:
+        """Load rates through the Repository and drop the whole cache."""
+
+        try:
+            return self.db.load_exchange_rates(path)
+        finally:
+            self.clear()
+
+    def retag(self, expenses: Iterable[Union[Expense, int]], tags: Any) -> int:
+        """Batch retag through the Repository and drop the whole cache."""
+
+        try:
+            return self.db.retag(expenses, tags)
+        finally:
+            self.clear()
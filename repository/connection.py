@@ -0,0 +1,187 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from enum import Enum
+from typing import Callable, Iterator, Optional, Union
+
+
+class ConnectionProfile(Enum):
+    DURABLE = "durable"
+    FAST = "fast"
+    BULK = "bulk"
+
+
+# How long a connection waits for another one's lock before failing. It is set
+# first so that switching the journal mode can wait too.
+BUSY_TIMEOUT_MS = 5_000
+
+# WAL lets readers keep reading while a write is in progress and turns each
+# commit into an append to the log instead of a rollback-journal rewrite.
+# synchronous=FULL still fsyncs every commit; NORMAL only fsyncs at
+# checkpoints, so a power loss can drop the last commits but never corrupts
+# the file; OFF leaves syncing to the OS and is only meant for rebuildable
+# bulk loads. Negative cache_size values are in KiB.
+PROFILE_PRAGMAS: dict[ConnectionProfile, dict[str, Union[str, int]]] = {
+    ConnectionProfile.DURABLE: {
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8_000,
+        "temp_store": "MEMORY",
+    },
+    ConnectionProfile.FAST: {
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 2**20,
+        "temp_store": "MEMORY",
+    },
+    ConnectionProfile.BULK: {
+        "busy_timeout": BUSY_TIMEOUT_MS,
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256_000,
+        "mmap_size": 1024 * 2**20,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Prepared statements kept per connection; the sqlite3 default is 128.
+STATEMENT_CACHE_SIZE = 512
+
+DEFAULT_READERS = 4
+
+
+def connect(
+    path: str,
+    profile: Union[ConnectionProfile, str] = ConnectionProfile.DURABLE,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """Open a connection to 'path' tuned with the given profile's pragmas."""
+
+    profile = ConnectionProfile(profile)
+    conn = sqlite3.connect(
+        path,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=check_same_thread,
+    )
+    for pragma, value in PROFILE_PRAGMAS[profile].items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    # Off by default in SQLite; deleting an expense cascades to its tag links.
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+class ConnectionPool:
+    """One writer and up to 'readers' reader connections to a database.
+
+    SQLite runs one write transaction at a time, so writes are serialized on a
+    lock around the writer connection. In WAL mode readers see the last
+    committed state without waiting for the writer, so reads check out a
+    reader of their own. An in-memory database cannot be shared between
+    connections; it gets no readers and reads take the writer's lock instead.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        profile: Union[ConnectionProfile, str] = ConnectionProfile.DURABLE,
+        readers: int = DEFAULT_READERS,
+    ) -> None:
+        """Open the writer; readers are opened the first time they are needed."""
+
+        self.path = path
+        self.profile = ConnectionProfile(profile)
+        self.readers = 0 if path == ":memory:" else readers
+        self.writer = connect(path, self.profile, check_same_thread=False)
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._opened: list[sqlite3.Connection] = []
+        self._open_lock = threading.Lock()
+        self._trace: Optional[Callable[[str], None]] = None
+        self._progress: tuple[Optional[Callable[[], int]], int] = (None, 0)
+
+    @contextmanager
+    def reading(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection holding one read snapshot for the block.
+
+        Blocks until a reader is free when all of them are checked out.
+        """
+
+        if not self.readers:
+            with self._write_lock:
+                yield self.writer
+            return
+
+        conn = self._checkout()
+        try:
+            # One read transaction keeps every query in the block consistent.
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def writing(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer for a transaction committed when the block succeeds.
+
+        A writing block nested in another one on the same thread joins the
+        outer transaction.
+        """
+
+        with self._write_lock:
+            self._write_depth += 1
+            try:
+                if self._write_depth > 1:
+                    yield self.writer
+                else:
+                    with self.writer:
+                        yield self.writer
+            finally:
+                self._write_depth -= 1
+
+    def set_trace_callback(self, callback: Optional[Callable[[str], None]]) -> None:
+        """Call 'callback' with every statement run on any pooled connection."""
+
+        with self._open_lock:
+            self._trace = callback
+            for conn in [self.writer, *self._opened]:
+                conn.set_trace_callback(callback)
+
+    def set_progress_handler(
+        self, handler: Optional[Callable[[], int]], instructions: int
+    ) -> None:
+        """Call 'handler' every 'instructions' VM steps on any pooled connection.
+
+        A truthy return value aborts the running statement, as in sqlite3.
+        """
+
+        with self._open_lock:
+            self._progress = (handler, instructions)
+            for conn in [self.writer, *self._opened]:
+                conn.set_progress_handler(handler, instructions)
+
+    def close(self) -> None:
+        """Close the writer and every reader opened so far."""
+
+        with self._write_lock, self._open_lock:
+            for conn in [self.writer, *self._opened]:
+                conn.close()
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            if len(self._opened) < self.readers:
+                conn = connect(self.path, self.profile, check_same_thread=False)
+                conn.set_trace_callback(self._trace)
+                conn.set_progress_handler(*self._progress)
+                self._opened.append(conn)
+                return conn
+        return self._idle.get()
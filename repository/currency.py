@@ -0,0 +1,127 @@
+"""Exchange rates and conversion between currencies.
+
+Rates are kept in the exchange_rates table as yen per unit of a currency on
+a date, and are loaded from CSV files with a date,currency,rate header;
+nothing is fetched over the network. The rate for a day is the latest one
+recorded on or before it, or the earliest one for days before the table
+starts. Currencies without any rates fall back to constants.FALLBACK_RATES.
+
+Usage from the project root: python -m repository.currency RATES_CSV [DB_PATH]
+"""
+import bisect
+import sqlite3
+import sys
+from typing import TYPE_CHECKING, Iterator, Union
+
+from constants import BASE_CURRENCY, FALLBACK_RATES
+from repository.dates import normalize_date
+from repository.migrations import migrate
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def read_csv(path: Union[str, "Path"]) -> Iterator[dict]:
+    """Stream rate rows from a CSV file with a date,currency,rate header."""
+
+    # Imported here so opening a Repository does not pay for the csv module.
+    import csv
+
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            yield {
+                "date": normalize_date(row["date"]),
+                "currency": row["currency"].strip().upper(),
+                "rate": float(row["rate"]),
+            }
+
+
+def load_csv(conn: sqlite3.Connection, path: Union[str, "Path"]) -> int:
+    """Insert or replace the rates in a CSV file and return how many were read."""
+
+    rows = list(read_csv(path))
+    conn.executemany(
+        "INSERT INTO exchange_rates (currency, date, rate) "
+        "VALUES (:currency, :date, :rate) "
+        "ON CONFLICT (currency, date) DO UPDATE SET rate = excluded.rate",
+        rows,
+    )
+    return len(rows)
+
+
+class RateCache:
+    """Exchange rates read once per currency and kept in memory.
+
+    Each currency's rates are loaded as sorted lists on first use, and the
+    factor between two currencies on a day is memoized, so converting rows
+    that were already aggregated per currency and day costs a dictionary
+    lookup per group. Call clear() after the table changes.
+    """
+
+    def __init__(self) -> None:
+        self._tables: dict[str, tuple[list[str], list[float]]] = {}
+        self._factors: dict[tuple[str, str, str], float] = {}
+
+    def clear(self) -> None:
+        """Forget every loaded rate and factor."""
+
+        self._tables = {}
+        self._factors = {}
+
+    def rate(self, conn: sqlite3.Connection, currency: str, date: str) -> float:
+        """Return yen per unit of 'currency' on the ISO 'date'.
+
+        Raises KeyError for a currency with no rates and no fallback.
+        """
+
+        if currency == BASE_CURRENCY:
+            return 1.0
+        dates, rates = self._table(conn, currency)
+        if not dates:
+            if currency not in FALLBACK_RATES:
+                raise KeyError(f"No exchange rate for {currency}")
+            return FALLBACK_RATES[currency]
+        return rates[max(bisect.bisect_right(dates, date) - 1, 0)]
+
+    def factor(
+        self, conn: sqlite3.Connection, source: str, target: str, date: str
+    ) -> float:
+        """Return what one unit of 'source' is worth in 'target' on 'date'."""
+
+        key = (source, target, date)
+        factor = self._factors.get(key)
+        if factor is None:
+            if source == target:
+                factor = 1.0
+            else:
+                factor = self.rate(conn, source, date) / self.rate(conn, target, date)
+            self._factors[key] = factor
+        return factor
+
+    def _table(
+        self, conn: sqlite3.Connection, currency: str
+    ) -> tuple[list[str], list[float]]:
+        table = self._tables.get(currency)
+        if table is None:
+            rows = conn.execute(
+                "SELECT date, rate FROM exchange_rates WHERE currency = :currency "
+                "ORDER BY date",
+                {"currency": currency},
+            ).fetchall()
+            table = ([date for date, _ in rows], [rate for _, rate in rows])
+            self._tables[currency] = table
+        return table
+
+
+def main(argv: list[str]) -> None:
+    """Load the rates file named on the command line into the database."""
+
+    conn = sqlite3.connect(argv[2] if len(argv) > 2 else "expenses.db")
+    migrate(conn)
+    with conn:
+        count = load_csv(conn, argv[1])
+    print(f"Loaded {count} exchange rates")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
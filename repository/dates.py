@@ -0,0 +1,43 @@
+import datetime
+from typing import Union
+
+DateLike = Union[datetime.date, str]
+
+
+def normalize_date(value: DateLike) -> str:
+    """Convert a date, 'YYYY-MM-DD' or legacy 'YY-MM-DD' string to ISO format.
+
+    Two-digit years are read as 20YY, matching how the ledger was recorded;
+    legacy months and days may be unpadded, as in '21-4-21'.
+    """
+
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+
+    text = value.strip()
+    if len(text.partition("-")[0]) == 2:
+        return datetime.datetime.strptime(text, "%y-%m-%d").date().isoformat()
+    return datetime.date.fromisoformat(text).isoformat()
+
+
+def normalize_year(year: str) -> int:
+    """Convert a two- or four-digit year, or '' for this year, to an integer."""
+
+    if year == "":
+        return datetime.date.today().year
+    if len(year) == 2:
+        return 2000 + int(year)
+    return int(year)
+
+
+def month_bounds(year: int, month: int) -> tuple[str, str]:
+    """Return the first day of a month and of the following month."""
+
+    start = datetime.date(year, month, 1)
+    if month == 12:
+        end = datetime.date(year + 1, 1, 1)
+    else:
+        end = datetime.date(year, month + 1, 1)
+    return start.isoformat(), end.isoformat()
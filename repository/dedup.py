@@ -0,0 +1,161 @@
+"""Fingerprints and duplicate scans for expenses.
+
+A fingerprint is a 64-bit hash of an expense's normalized date, name and
+cost, stored in the indexed expenses.fingerprint column. Exact duplicates
+are rows sharing a fingerprint, which the index finds without comparing
+rows pairwise. Near duplicates, such as the same charge posted a day apart
+by two statements, are found by one pass over the expenses sorted by cost
+and date.
+"""
+import datetime
+import hashlib
+import sqlite3
+import unicodedata
+from enum import Enum
+from typing import Iterator, Optional
+
+from repository.dates import DateLike, normalize_date
+
+BACKFILL_BATCH_SIZE = 10_000
+
+SCAN_CHUNK_SIZE = 10_000
+
+
+class OnDuplicate(Enum):
+    """What add_expense and add_expenses do with a duplicate of a stored row."""
+
+    # Insert it like any other expense.
+    ALLOW = "allow"
+    # Insert it and log a warning.
+    FLAG = "flag"
+    # Leave it out; add_expense returns the id of the stored row.
+    SKIP = "skip"
+    # Raise DuplicateExpenseError and write nothing.
+    RAISE = "raise"
+
+
+class DuplicateExpenseError(ValueError):
+    """An expense matched the fingerprint of an expense already stored."""
+
+    def __init__(self, existing_id: int) -> None:
+        super().__init__(f"Duplicate of expense {existing_id}")
+        self.existing_id = existing_id
+
+
+def normalize_name(name: str) -> str:
+    """Fold width, case and whitespace so equivalent names compare equal."""
+
+    return " ".join(unicodedata.normalize("NFKC", str(name)).casefold().split())
+
+
+def normalize_cost(cost) -> str:
+    """Render costs stored as text, integers or floats the same way."""
+
+    try:
+        value = float(cost)
+    except (TypeError, ValueError):
+        return str(cost).strip()
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def fingerprint(
+    date: DateLike, name: str, cost, currency: Optional[str] = None
+) -> int:
+    """Return the signed 64-bit fingerprint of an expense's date, name and cost.
+
+    'cost' is the amount paid in 'currency' when one is given, else yen.
+    """
+
+    try:
+        day = normalize_date(date)
+    except (AttributeError, ValueError):
+        day = str(date).strip()
+    amount = normalize_cost(cost)
+    if currency is not None:
+        amount = f"{amount} {currency}"
+    text = f"{day}\x1f{normalize_name(name)}\x1f{amount}"
+    digest = hashlib.blake2b(text.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def backfill(conn: sqlite3.Connection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Fingerprint every expense that has none yet and return how many there were.
+
+    Rows written by older versions or other tools have no fingerprint; the
+    index on the column makes finding them cheap when there are none.
+    """
+
+    filled = 0
+    query = (
+        "SELECT id, date, name, IFNULL(original_amount, cost), currency "
+        "FROM expenses WHERE fingerprint IS NULL LIMIT :limit"
+    )
+    while rows := conn.execute(query, {"limit": batch_size}).fetchall():
+        conn.executemany(
+            "UPDATE expenses SET fingerprint = ? WHERE id = ?",
+            [
+                (fingerprint(date, name, cost, currency), id)
+                for id, date, name, cost, currency in rows
+            ],
+        )
+        filled += len(rows)
+    return filled
+
+
+def duplicate_groups(conn: sqlite3.Connection) -> list[list[int]]:
+    """Return the ids of every set of expenses sharing a fingerprint."""
+
+    groups: dict[int, list[int]] = {}
+    for key, id in conn.execute(
+        "SELECT fingerprint, id FROM expenses WHERE fingerprint IN ("
+        "SELECT fingerprint FROM expenses WHERE fingerprint IS NOT NULL "
+        "GROUP BY fingerprint HAVING COUNT(*) > 1"
+        ") ORDER BY fingerprint, id"
+    ):
+        groups.setdefault(key, []).append(id)
+    return list(groups.values())
+
+
+def near_duplicate_groups(
+    conn: sqlite3.Connection, days: int = 3, match_name: bool = False
+) -> list[list[int]]:
+    """Return the ids of runs of same-cost expenses at most 'days' days apart.
+
+    Rows are read sorted by cost and date, so each one only has to be
+    compared with the previous row of the same cost (and name, with
+    'match_name'): a run continues while the gap to that row is within
+    'days'. Sorting dominates, making the scan O(n log n) overall.
+    """
+
+    groups = []
+    # Per name (or for the whole cost with match_name off): last day and run.
+    runs: dict[Optional[str], tuple[int, list[int]]] = {}
+    current_cost = None
+    for id, date, name, cost in _sorted_by_cost(conn):
+        if cost != current_cost:
+            groups.extend(run for _, run in runs.values() if len(run) > 1)
+            runs.clear()
+            current_cost = cost
+        try:
+            day = datetime.date.fromisoformat(date).toordinal()
+        except (TypeError, ValueError):
+            continue
+        key = normalize_name(name) if match_name else None
+        previous = runs.get(key)
+        if previous is not None and day - previous[0] <= days:
+            previous[1].append(id)
+            runs[key] = (day, previous[1])
+        else:
+            if previous is not None and len(previous[1]) > 1:
+                groups.append(previous[1])
+            runs[key] = (day, [id])
+    groups.extend(run for _, run in runs.values() if len(run) > 1)
+    return groups
+
+
+def _sorted_by_cost(conn: sqlite3.Connection) -> Iterator[tuple]:
+    cursor = conn.execute(
+        "SELECT id, date, name, cost FROM expenses ORDER BY cost, date, id"
+    )
+    while rows := cursor.fetchmany(SCAN_CHUNK_SIZE):
+        yield from rows
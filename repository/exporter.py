@@ -0,0 +1,309 @@
+"""Streaming export of the ledger to CSV, JSON Lines or a columnar file.
+
+Rows go straight from a cursor to the file a chunk at a time, so memory use
+does not grow with the ledger and no Expense objects are built. CSV and
+JSON Lines files carry id, date, name, cost, original_amount, currency and
+tags; CSV tags are a ", "-separated string and JSON Lines tags a list.
+importer.import_file reads both back, decimal costs and foreign amounts
+included. Dates are written as stored, so a legacy row whose date is not a
+valid date, such as 2021-06-31, is exported but rejected on import until it
+is corrected.
+
+The columnar format holds each column as one contiguous little-endian array,
+so analytics.load_columns can memory-map it back without parsing:
+
+    magic (8 bytes) | header length (uint64) | JSON header | padding | columns
+
+The header records the row count, the tag and currency dictionaries, and the
+type code (as in the array module), offset and length of every column. Each
+column starts on an 8-byte boundary. Days are date ordinals, names are UTF-8
+bytes split by name_offsets, tag ids index the tag dictionary and are split
+per expense by tag_offsets, and currency ids index the currency dictionary,
+whose first entry is the base currency. original_amounts is NaN for
+expenses paid in yen.
+
+Usage from the project root: python -m repository.exporter FILE [DB_PATH]
+"""
+import csv
+import json
+import math
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from contextlib import ExitStack
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator, TypedDict, Union
+
+from constants import BASE_CURRENCY
+from repository.repository import Repository
+
+EXPORT_CHUNK_SIZE = 10_000
+
+MAGIC = b"EXPCOL\x00\x01"
+ALIGNMENT = 8
+
+FIELDS = ("id", "date", "name", "cost", "original_amount", "currency", "tags")
+
+# Tag names joined with a unit separator, which cannot appear in a typed name.
+TAG_SEPARATOR = "\x1f"
+ROWS_QUERY = (
+    "SELECT id, date, name, cost, original_amount, currency, ("
+    "SELECT group_concat(tags.name, :separator) FROM expense_tags "
+    "INNER JOIN tags ON tags.id = expense_tags.tag_id "
+    "WHERE expense_tags.expense_id = expenses.id"
+    ") FROM expenses ORDER BY id"
+)
+
+# julianday('0001-01-01') is 1721425.5, and that day is ordinal 1.
+COLUMNS_QUERY = (
+    "SELECT id, IFNULL(CAST(julianday(date) - 1721424.5 AS INTEGER), 0), "
+    "IFNULL(cost, 0), original_amount, currency, IFNULL(CAST(name AS TEXT), ''), ("
+    "SELECT COUNT(*) FROM expense_tags WHERE expense_tags.expense_id = expenses.id"
+    ") FROM expenses ORDER BY id"
+)
+LINKS_QUERY = (
+    "SELECT expense_tags.tag_id FROM expense_tags "
+    "INNER JOIN expenses ON expenses.id = expense_tags.expense_id "
+    "ORDER BY expense_tags.expense_id, expense_tags.tag_id"
+)
+
+# Column name and array type code, in file order.
+COLUMNS = (
+    ("ids", "q"),
+    ("days", "i"),
+    ("costs", "d"),
+    ("original_amounts", "d"),
+    ("currency_ids", "h"),
+    ("name_offsets", "q"),
+    ("names", "B"),
+    ("tag_offsets", "q"),
+    ("tag_ids", "i"),
+)
+
+
+class ExportStats(TypedDict):
+    rows: int
+    seconds: float
+    rows_per_second: float
+
+
+def iter_chunks(
+    conn: sqlite3.Connection,
+    query: str,
+    parameters: dict,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[list[tuple]]:
+    """Yield the rows of a query 'chunk_size' at a time from its own cursor."""
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, parameters)
+        while rows := cursor.fetchmany(chunk_size):
+            yield rows
+    finally:
+        cursor.close()
+
+
+def write_csv(
+    conn: sqlite3.Connection,
+    path: Union[str, Path],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """Write every expense to a CSV file and return how many there were."""
+
+    count = 0
+    parameters = {"separator": ", "}
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for rows in iter_chunks(conn, ROWS_QUERY, parameters, chunk_size):
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def write_jsonl(
+    conn: sqlite3.Connection,
+    path: Union[str, Path],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """Write every expense to a JSON Lines file and return how many there were."""
+
+    count = 0
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    parameters = {"separator": TAG_SEPARATOR}
+    with open(path, "w", encoding="utf-8") as file:
+        for rows in iter_chunks(conn, ROWS_QUERY, parameters, chunk_size):
+            lines = [
+                encode(
+                    {
+                        "id": id,
+                        "date": date,
+                        "name": name,
+                        "cost": cost,
+                        "original_amount": original_amount,
+                        "currency": currency,
+                        "tags": tags.split(TAG_SEPARATOR) if tags else [],
+                    }
+                )
+                for id, date, name, cost, original_amount, currency, tags in rows
+            ]
+            lines.append("")
+            file.write("\n".join(lines))
+            count += len(rows)
+    return count
+
+
+def write_columns(
+    conn: sqlite3.Connection,
+    path: Union[str, Path],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> int:
+    """Write every expense to a columnar file and return how many there were.
+
+    Column lengths are only known at the end, so each column is first
+    appended to its own temporary file chunk by chunk and the pieces are
+    copied behind the header once the cursors are exhausted.
+    """
+
+    tags = dict(conn.execute("SELECT id, name FROM tags ORDER BY id"))
+    currencies = {BASE_CURRENCY: 0}
+    lengths = dict.fromkeys([name for name, _ in COLUMNS], 0)
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        spills = {
+            name: stack.enter_context(open(Path(directory) / name, "wb"))
+            for name, _ in COLUMNS
+        }
+
+        def spill(name: str, values: array) -> None:
+            values.tofile(spills[name])
+            lengths[name] += len(values)
+
+        name_end = tag_end = 0
+        spill("name_offsets", array("q", [name_end]))
+        spill("tag_offsets", array("q", [tag_end]))
+        for rows in iter_chunks(conn, COLUMNS_QUERY, {}, chunk_size):
+            ids, days, costs, amounts, codes, names, tag_counts = zip(*rows)
+            spill("ids", array("q", ids))
+            spill("days", array("i", days))
+            spill("costs", array("d", costs))
+            amounts = [math.nan if amount is None else amount for amount in amounts]
+            spill("original_amounts", array("d", amounts))
+            codes = [
+                currencies.setdefault(code or BASE_CURRENCY, len(currencies))
+                for code in codes
+            ]
+            spill("currency_ids", array("h", codes))
+            encoded = [name.encode() for name in names]
+            offsets = array("q", accumulate(map(len, encoded), initial=name_end))
+            spill("name_offsets", offsets[1:])
+            spill("names", array("B", b"".join(encoded)))
+            name_end = offsets[-1]
+            offsets = array("q", accumulate(tag_counts, initial=tag_end))
+            spill("tag_offsets", offsets[1:])
+            tag_end = offsets[-1]
+        # The reading block's transaction keeps the links in step with the rows.
+        for rows in iter_chunks(conn, LINKS_QUERY, {}, chunk_size):
+            spill("tag_ids", array("i", [tag_id for tag_id, in rows]))
+        stack.close()
+
+        header = {
+            "rows": lengths["ids"],
+            "tags": {str(id): name for id, name in tags.items()},
+            "currencies": list(currencies),
+            "columns": {},
+        }
+        # The header's own length moves the column offsets, so lay them out
+        # with a placeholder length until the encoded header stops growing.
+        start = 0
+        while True:
+            offset = _aligned(start)
+            for name, typecode in COLUMNS:
+                size = array(typecode).itemsize
+                header["columns"][name] = {
+                    "type": typecode,
+                    "offset": offset,
+                    "length": lengths[name],
+                }
+                offset = _aligned(offset + size * lengths[name])
+            encoded = json.dumps(header).encode()
+            end = len(MAGIC) + 8 + len(encoded)
+            if end <= start:
+                break
+            start = end
+
+        with open(path, "wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<Q", len(encoded)))
+            file.write(encoded)
+            for name, _ in COLUMNS:
+                file.write(b"\0" * (header["columns"][name]["offset"] - file.tell()))
+                with open(Path(directory) / name, "rb") as spilled:
+                    shutil.copyfileobj(spilled, file)
+    return header["rows"]
+
+
+def read_header(path: Union[str, Path]) -> dict:
+    """Return the JSON header of a columnar file."""
+
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar expenses file")
+        (length,) = struct.unpack("<Q", file.read(8))
+        return json.loads(file.read(length))
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+WRITERS = {
+    ".csv": write_csv,
+    ".jsonl": write_jsonl,
+    ".ndjson": write_jsonl,
+    ".columns": write_columns,
+}
+
+
+def export_file(
+    db: Repository, path: Union[str, Path], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> ExportStats:
+    """Export every expense to a CSV, JSON Lines or .columns file.
+
+    The export reads from one snapshot of the database, so writes made while
+    it runs are not included.
+    """
+
+    suffix = Path(path).suffix.lower()
+    if suffix not in WRITERS:
+        raise ValueError(f"Unsupported export format: {suffix}")
+
+    start = time.perf_counter()
+    with db.pool.reading() as conn:
+        rows = WRITERS[suffix](conn, path, chunk_size)
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+    }
+
+
+def main(argv: list[str]) -> None:
+    """Export to the file named on the command line and print throughput."""
+
+    db = Repository(path=argv[2]) if len(argv) > 2 else Repository()
+    stats = export_file(db, argv[1])
+    print(
+        f"Exported {stats['rows']} expenses in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:,.0f} rows/sec)"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
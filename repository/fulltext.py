@@ -0,0 +1,46 @@
+import re
+import sqlite3
+
+TAG_NAMES = (
+    "SELECT group_concat(tags.name, ' ') FROM expense_tags "
+    "INNER JOIN tags ON expense_tags.tag_id = tags.id "
+    "WHERE expense_tags.expense_id = expenses.id"
+)
+
+
+def match_expression(text: str) -> str:
+    """Turn typed text into an FTS5 query where every word is a prefix."""
+
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+def index_range(conn: sqlite3.Connection, first_id: int, last_id: int) -> None:
+    """Add search rows for expenses with ids in [first_id, last_id] in one pass.
+
+    Used by bulk inserts, which load rows with the per-row triggers suspended.
+    """
+
+    conn.execute(
+        "INSERT INTO expense_search (rowid, name, tags) "
+        f"SELECT id, name, IFNULL(({TAG_NAMES}), '') FROM expenses "
+        "WHERE id BETWEEN :first AND :last",
+        {"first": first_id, "last": last_id},
+    )
+
+
+def remove_selected(conn: sqlite3.Connection, table: str) -> None:
+    """Drop the search rows of the expenses whose ids are in 'table'."""
+
+    conn.execute(f"DELETE FROM expense_search WHERE rowid IN (SELECT id FROM {table})")
+
+
+def reindex_tags(conn: sqlite3.Connection, table: str) -> None:
+    """Refresh the tag text of the expenses whose ids are in 'table'."""
+
+    conn.execute(
+        "UPDATE expense_search SET tags = IFNULL(("
+        "SELECT group_concat(tags.name, ' ') FROM expense_tags "
+        "INNER JOIN tags ON expense_tags.tag_id = tags.id "
+        "WHERE expense_tags.expense_id = expense_search.rowid"
+        f"), '') WHERE rowid IN (SELECT id FROM {table})"
+    )
@@ -0,0 +1,119 @@
+"""Bulk import of expenses from CSV or JSON Lines files.
+
+Both formats carry the fields name, cost, date and tags, and optionally
+original_amount and currency for expenses paid in another currency, as the
+exporter writes them. Costs may be integers or decimals. In CSV files tags are
+a ", "-separated string, the same format the input form produces; in JSON Lines
+they may be a string or a list of names.
+
+Usage from the project root: python -m repository.importer FILE [DB_PATH]
+"""
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional, TypedDict, Union
+
+from entities.expense import Expense
+from repository.dedup import OnDuplicate
+from repository.repository import DEFAULT_BATCH_SIZE, Repository
+
+
+class ImportStats(TypedDict):
+    rows: int
+    seconds: float
+    rows_per_second: float
+
+
+def parse_number(value: Any) -> Optional[Union[int, float]]:
+    """Read a cost or amount as an int when whole, else a float; "" is None."""
+
+    if value is None or value == "":
+        return None
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def to_expense(row: dict) -> Expense:
+    """Build an Expense from one parsed CSV or JSON Lines row."""
+
+    return Expense(
+        0,
+        name=row["name"],
+        cost=parse_number(row.get("cost")),
+        tags=row.get("tags") or "",
+        date=row["date"],
+        original_amount=parse_number(row.get("original_amount")),
+        currency=row.get("currency") or None,
+    )
+
+
+def read_csv(path: Union[str, Path]) -> Iterator[Expense]:
+    """Stream expenses from a CSV file with a name,cost,date,tags header."""
+
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            yield to_expense(row)
+
+
+def read_jsonl(path: Union[str, Path]) -> Iterator[Expense]:
+    """Stream expenses from a JSON Lines file with one object per line."""
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            yield to_expense(json.loads(line))
+
+
+READERS = {
+    ".csv": read_csv,
+    ".jsonl": read_jsonl,
+    ".ndjson": read_jsonl,
+}
+
+
+def import_file(
+    db: Repository,
+    path: Union[str, Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_duplicate: Union[OnDuplicate, str] = OnDuplicate.ALLOW,
+) -> ImportStats:
+    """Import every expense in a CSV or JSON Lines file in one transaction.
+
+    Tags that do not exist yet are created, so statements can be imported
+    before their categories have been set up in the tracker. Pass
+    on_duplicate="skip" to re-import an overlapping statement.
+    """
+
+    suffix = Path(path).suffix.lower()
+    if suffix not in READERS:
+        raise ValueError(f"Unsupported import format: {suffix}")
+
+    start = time.perf_counter()
+    expenses = READERS[suffix](path)
+    rows = db.add_expenses(
+        expenses, batch_size=batch_size, create_tags=True, on_duplicate=on_duplicate
+    )
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+    }
+
+
+def main(argv: list[str]) -> None:
+    """Import the file named on the command line and print throughput."""
+
+    db = Repository(path=argv[2]) if len(argv) > 2 else Repository()
+    stats = import_file(db, argv[1])
+    print(
+        f"Imported {stats['rows']} expenses in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:,.0f} rows/sec)"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,300 @@
+"""Opt-in profiling of a Repository: calls, SQL, rows and latency histograms.
+
+Nothing here runs unless Instrumentation is attached to a Repository, so an
+uninstrumented Repository pays no cost. Attaching wraps every public method
+on that one instance and installs trace and progress callbacks on its
+connection pool; detach() removes all of them again.
+
+    instrumentation = Instrumentation(db)
+    db.get_month("04", "2021")
+    print(instrumentation.format_report())
+"""
+import bisect
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+from entities.expense import Expense
+from entities.expense_batch import ExpenseBatch
+from repository.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets in seconds: 1 us doubling up to ~67 s.
+BUCKETS = [2**power / 1_000_000 for power in range(27)]
+
+# Progress callbacks fire every this many SQLite VM instructions.
+PROGRESS_INSTRUCTIONS = 1_000
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PARAMETER_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Replace literal values so repeated statements group together."""
+
+    statement = LITERALS.sub("?", " ".join(statement.split()))
+    return PARAMETER_LISTS.sub("?, ...", statement)
+
+
+class Histogram:
+    """Counts of latencies in power-of-two buckets from 1 us up."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket holding the given fraction."""
+
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return BUCKETS[index] if index < len(BUCKETS) else self.maximum
+        return 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.maximum * 1000,
+        }
+
+
+class MethodStats:
+    """Totals for one Repository method."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.statements = 0
+        self.instructions = 0
+        self.latency = Histogram()
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "statements": self.statements,
+            "vm_instructions": self.instructions,
+            **self.latency.to_dict(),
+        }
+
+
+class Instrumentation:
+    """Collects per-method and per-statement statistics for one Repository.
+
+    Calls made by one Repository method to another are counted for both.
+    Statements and VM instructions are attributed to the innermost method
+    running on the same thread. Rows are the length of list and batch
+    results, one for a single Expense, or the number of items an iter_*
+    generator yielded. Calls slower than 'slow_call_seconds' are logged as
+    warnings.
+    """
+
+    def __init__(
+        self, db: Repository, slow_call_seconds: Optional[float] = None
+    ) -> None:
+        """Start collecting from 'db' right away."""
+
+        self.db = db
+        self.slow_call_seconds = slow_call_seconds
+        self.methods: dict[str, MethodStats] = {}
+        self.statements: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wrapped: list[str] = []
+        self._dump_stop: Optional[threading.Event] = None
+        self.attach()
+
+    def attach(self) -> None:
+        """Wrap the public methods and install the pool callbacks."""
+
+        for name, _ in inspect.getmembers(Repository, inspect.isfunction):
+            if name.startswith("_") or name in self._wrapped:
+                continue
+            setattr(self.db, name, self._wrap(name, getattr(self.db, name)))
+            self._wrapped.append(name)
+        self.db.pool.set_trace_callback(self._on_statement)
+        self.db.pool.set_progress_handler(self._on_progress, PROGRESS_INSTRUCTIONS)
+
+    def detach(self) -> None:
+        """Restore the plain methods and remove the callbacks."""
+
+        self.stop_dump()
+        for name in self._wrapped:
+            delattr(self.db, name)
+        self._wrapped.clear()
+        self.db.pool.set_trace_callback(None)
+        self.db.pool.set_progress_handler(None, 0)
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+
+        with self._lock:
+            self.methods.clear()
+            self.statements.clear()
+
+    def snapshot(self) -> dict:
+        """Return the statistics recorded so far as plain dictionaries."""
+
+        with self._lock:
+            return {
+                "methods": {
+                    name: stats.to_dict() for name, stats in self.methods.items()
+                },
+                "statements": dict(self.statements),
+            }
+
+    def format_report(self, statements: int = 10) -> str:
+        """Render the snapshot as a table, with the most frequent statements."""
+
+        report = self.snapshot()
+        lines = [
+            f"{'method':<22}{'calls':>8}{'errors':>7}{'rows':>10}{'sql':>8}"
+            f"{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        ]
+        methods = sorted(
+            report["methods"].items(),
+            key=lambda item: item[1]["mean_ms"] * item[1]["calls"],
+            reverse=True,
+        )
+        for name, stats in methods:
+            lines.append(
+                f"{name:<22}{stats['calls']:>8}{stats['errors']:>7}"
+                f"{stats['rows']:>10}{stats['statements']:>8}"
+                f"{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+                f"{stats['max_ms']:>10.3f}"
+            )
+        frequent = sorted(report["statements"].items(), key=lambda item: -item[1])
+        for statement, count in frequent[:statements]:
+            lines.append(f"{count:>8}  {statement[:100]}")
+        return "\n".join(lines)
+
+    def dump_every(self, seconds: float, level: int = logging.INFO) -> None:
+        """Log format_report() every 'seconds' from a background thread."""
+
+        self.stop_dump()
+        stop = threading.Event()
+
+        def dump() -> None:
+            while not stop.wait(seconds):
+                logger.log(level, "Repository profile\n%s", self.format_report())
+
+        threading.Thread(target=dump, name="profile-dump", daemon=True).start()
+        self._dump_stop = stop
+
+    def stop_dump(self) -> None:
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+
+    def _stats(self, name: str) -> MethodStats:
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = MethodStats()
+        return stats
+
+    def _stack(self) -> list[str]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            stack = self._stack()
+            stack.append(name)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                self._record(name, time.perf_counter() - start, None, error=True)
+                raise
+            finally:
+                stack.pop()
+            if inspect.isgenerator(result):
+                return self._iterate(name, result, time.perf_counter() - start)
+            self._record(name, time.perf_counter() - start, result)
+            return result
+
+        return call
+
+    def _iterate(self, name: str, generator: Iterator, elapsed: float) -> Iterator:
+        """Time an iter_* generator across its whole iteration."""
+
+        rows = 0
+        error = False
+        stack = self._stack()
+        try:
+            while True:
+                stack.append(name)
+                start = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                    stack.pop()
+                rows += 1
+                yield item
+        except BaseException:
+            error = True
+            raise
+        finally:
+            generator.close()
+            self._record(name, elapsed, rows, error=error)
+
+    def _record(self, name: str, seconds: float, result: Any, error: bool = False):
+        if isinstance(result, (list, ExpenseBatch)):
+            rows = len(result)
+        elif isinstance(result, Expense):
+            rows = 1
+        elif name.startswith("iter_") and isinstance(result, int):
+            rows = result
+        else:
+            rows = 0
+        with self._lock:
+            stats = self._stats(name)
+            stats.calls += 1
+            stats.errors += error
+            stats.rows += rows
+            stats.latency.record(seconds)
+        if self.slow_call_seconds is not None and seconds > self.slow_call_seconds:
+            logger.warning("Slow Repository.%s: %.1f ms", name, seconds * 1000)
+
+    def _on_statement(self, statement: str) -> None:
+        key = normalize_statement(statement)
+        stack = self._stack()
+        with self._lock:
+            self.statements[key] = self.statements.get(key, 0) + 1
+            if stack:
+                self._stats(stack[-1]).statements += 1
+
+    def _on_progress(self) -> int:
+        stack = self._stack()
+        if stack:
+            with self._lock:
+                self._stats(stack[-1]).instructions += PROGRESS_INSTRUCTIONS
+        return 0
@@ -0,0 +1,387 @@
+import sqlite3
+
+# Each entry upgrades the schema by one version; the index of a script plus one
+# is the PRAGMA user_version it leaves behind. Append new scripts, never edit
+# ones that have shipped.
+MIGRATIONS: list[str] = [
+    # 1: original schema, created only when missing so old files are adopted.
+    """
+    CREATE TABLE IF NOT EXISTS expenses (
+        id integer primary key,
+        date text,
+        name text,
+        cost integer,
+        category text
+    );
+    CREATE TABLE IF NOT EXISTS expense_tags (
+        expense_id integer,
+        tag_id integer
+    );
+    CREATE TABLE IF NOT EXISTS tags (
+        id integer,
+        name text
+    );
+    """,
+    # 2: give tags a primary key and unique names, and index every lookup path.
+    """
+    CREATE TABLE tags_new (
+        id integer primary key,
+        name text
+    );
+    INSERT INTO tags_new (id, name)
+        SELECT MIN(id), name FROM tags GROUP BY name;
+    UPDATE expense_tags SET tag_id = (
+        SELECT tags_new.id FROM tags_new
+        INNER JOIN tags ON tags.name = tags_new.name
+        WHERE tags.id = expense_tags.tag_id
+    )
+    WHERE tag_id NOT IN (SELECT id FROM tags_new);
+    DROP TABLE tags;
+    ALTER TABLE tags_new RENAME TO tags;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS tags_name ON tags (name);
+    CREATE INDEX IF NOT EXISTS expense_tags_expense_id
+        ON expense_tags (expense_id);
+    CREATE INDEX IF NOT EXISTS expense_tags_tag_id ON expense_tags (tag_id);
+    CREATE INDEX IF NOT EXISTS expenses_date ON expenses (date);
+    CREATE INDEX IF NOT EXISTS expenses_cost ON expenses (cost);
+    """,
+    # 3: rewrite legacy "YY-MM-DD" dates as ISO "20YY-MM-DD" so that text order
+    # is date order and month/year lookups become index range scans.
+    """
+    UPDATE expenses SET date = '20' || date
+    WHERE date GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9]';
+    """,
+    # 4: month and month x tag rollups, kept current by triggers so every write
+    # path (single, bulk, delete, update) maintains them. Tag rollups for a
+    # deleted expense are settled BEFORE the delete, while its links still
+    # exist; a link deleted after its expense is gone has nothing to settle.
+    """
+    CREATE TABLE rollup_months (
+        month text primary key,
+        total integer not null,
+        count integer not null
+    );
+    CREATE TABLE rollup_month_tags (
+        month text,
+        tag_id integer,
+        total integer not null,
+        count integer not null,
+        primary key (month, tag_id)
+    );
+    INSERT INTO rollup_months (month, total, count)
+        SELECT IFNULL(substr(date, 1, 7), ''), TOTAL(cost), COUNT(*)
+        FROM expenses GROUP BY 1;
+    INSERT INTO rollup_month_tags (month, tag_id, total, count)
+        SELECT IFNULL(substr(expenses.date, 1, 7), ''), expense_tags.tag_id,
+            TOTAL(expenses.cost), COUNT(*)
+        FROM expenses
+        INNER JOIN expense_tags ON expenses.id = expense_tags.expense_id
+        GROUP BY 1, 2;
+
+    CREATE TRIGGER rollup_expense_insert AFTER INSERT ON expenses BEGIN
+        INSERT INTO rollup_months (month, total, count)
+            VALUES (IFNULL(substr(NEW.date, 1, 7), ''), IFNULL(NEW.cost, 0), 1)
+            ON CONFLICT (month) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        INSERT INTO rollup_month_tags (month, tag_id, total, count)
+            SELECT IFNULL(substr(NEW.date, 1, 7), ''), tag_id,
+                IFNULL(NEW.cost, 0), 1
+            FROM expense_tags WHERE expense_id = NEW.id
+            ON CONFLICT (month, tag_id) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+    END;
+
+    CREATE TRIGGER rollup_expense_delete BEFORE DELETE ON expenses BEGIN
+        UPDATE rollup_months
+            SET total = total - IFNULL(OLD.cost, 0), count = count - 1
+            WHERE month = IFNULL(substr(OLD.date, 1, 7), '');
+        UPDATE rollup_month_tags
+            SET total = total - IFNULL(OLD.cost, 0) * (
+                    SELECT COUNT(*) FROM expense_tags
+                    WHERE expense_id = OLD.id
+                        AND tag_id = rollup_month_tags.tag_id
+                ),
+                count = count - (
+                    SELECT COUNT(*) FROM expense_tags
+                    WHERE expense_id = OLD.id
+                        AND tag_id = rollup_month_tags.tag_id
+                )
+            WHERE month = IFNULL(substr(OLD.date, 1, 7), '')
+                AND tag_id IN (
+                    SELECT tag_id FROM expense_tags WHERE expense_id = OLD.id
+                );
+        DELETE FROM rollup_months WHERE count = 0
+            AND month = IFNULL(substr(OLD.date, 1, 7), '');
+        DELETE FROM rollup_month_tags WHERE count = 0
+            AND month = IFNULL(substr(OLD.date, 1, 7), '');
+    END;
+
+    CREATE TRIGGER rollup_expense_update AFTER UPDATE OF date, cost ON expenses
+    BEGIN
+        UPDATE rollup_months
+            SET total = total - IFNULL(OLD.cost, 0), count = count - 1
+            WHERE month = IFNULL(substr(OLD.date, 1, 7), '');
+        INSERT INTO rollup_months (month, total, count)
+            VALUES (IFNULL(substr(NEW.date, 1, 7), ''), IFNULL(NEW.cost, 0), 1)
+            ON CONFLICT (month) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        UPDATE rollup_month_tags
+            SET total = total - IFNULL(OLD.cost, 0) * (
+                    SELECT COUNT(*) FROM expense_tags
+                    WHERE expense_id = OLD.id
+                        AND tag_id = rollup_month_tags.tag_id
+                ),
+                count = count - (
+                    SELECT COUNT(*) FROM expense_tags
+                    WHERE expense_id = OLD.id
+                        AND tag_id = rollup_month_tags.tag_id
+                )
+            WHERE month = IFNULL(substr(OLD.date, 1, 7), '')
+                AND tag_id IN (
+                    SELECT tag_id FROM expense_tags WHERE expense_id = OLD.id
+                );
+        INSERT INTO rollup_month_tags (month, tag_id, total, count)
+            SELECT IFNULL(substr(NEW.date, 1, 7), ''), tag_id,
+                IFNULL(NEW.cost, 0), 1
+            FROM expense_tags WHERE expense_id = NEW.id
+            ON CONFLICT (month, tag_id) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+        DELETE FROM rollup_months WHERE count = 0
+            AND month = IFNULL(substr(OLD.date, 1, 7), '');
+        DELETE FROM rollup_month_tags WHERE count = 0
+            AND month = IFNULL(substr(OLD.date, 1, 7), '');
+    END;
+
+    CREATE TRIGGER rollup_tag_insert AFTER INSERT ON expense_tags BEGIN
+        INSERT INTO rollup_month_tags (month, tag_id, total, count)
+            SELECT IFNULL(substr(date, 1, 7), ''), NEW.tag_id, IFNULL(cost, 0), 1
+            FROM expenses WHERE id = NEW.expense_id
+            ON CONFLICT (month, tag_id) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+    END;
+
+    CREATE TRIGGER rollup_tag_delete AFTER DELETE ON expense_tags BEGIN
+        UPDATE rollup_month_tags
+            SET total = total - (
+                    SELECT IFNULL(cost, 0) FROM expenses WHERE id = OLD.expense_id
+                ),
+                count = count - 1
+            WHERE tag_id = OLD.tag_id AND month = (
+                SELECT IFNULL(substr(date, 1, 7), '') FROM expenses
+                WHERE id = OLD.expense_id
+            );
+        DELETE FROM rollup_month_tags WHERE count = 0 AND tag_id = OLD.tag_id;
+    END;
+    """,
+    # 5: full-text index over expense names and tag names. Prefix indexes for
+    # 1-3 characters keep search-as-you-type queries off full term scans.
+    """
+    CREATE VIRTUAL TABLE expense_search USING fts5(
+        name, tags, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'
+    );
+    INSERT INTO expense_search (rowid, name, tags)
+        SELECT expenses.id, expenses.name, IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = expenses.id
+            ), '')
+        FROM expenses;
+
+    CREATE TRIGGER search_expense_insert AFTER INSERT ON expenses BEGIN
+        INSERT INTO expense_search (rowid, name, tags)
+            VALUES (NEW.id, NEW.name, IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = NEW.id
+            ), ''));
+    END;
+
+    CREATE TRIGGER search_expense_delete AFTER DELETE ON expenses BEGIN
+        DELETE FROM expense_search WHERE rowid = OLD.id;
+    END;
+
+    CREATE TRIGGER search_expense_update AFTER UPDATE OF name ON expenses BEGIN
+        UPDATE expense_search SET name = NEW.name WHERE rowid = NEW.id;
+    END;
+
+    CREATE TRIGGER search_tag_insert AFTER INSERT ON expense_tags BEGIN
+        UPDATE expense_search SET tags = IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = NEW.expense_id
+            ), '')
+            WHERE rowid = NEW.expense_id;
+    END;
+
+    CREATE TRIGGER search_tag_delete AFTER DELETE ON expense_tags BEGIN
+        UPDATE expense_search SET tags = IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = OLD.expense_id
+            ), '')
+            WHERE rowid = OLD.expense_id;
+    END;
+
+    CREATE TRIGGER search_tag_rename AFTER UPDATE OF name ON tags BEGIN
+        UPDATE expense_search SET tags = IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = expense_search.rowid
+            ), '')
+            WHERE rowid IN (
+                SELECT expense_id FROM expense_tags WHERE tag_id = NEW.id
+            );
+    END;
+    """,
+    # 6: index links by (expense_id, tag_id). The rollup delete trigger counts
+    # links of one expense and tag; with only single-column indexes SQLite
+    # could plan that on tag_id and walk every link of the tag per delete.
+    # The composite index also serves every expense_id lookup.
+    """
+    CREATE INDEX IF NOT EXISTS expense_tags_expense_tag
+        ON expense_tags (expense_id, tag_id);
+    DROP INDEX IF EXISTS expense_tags_expense_id;
+    """,
+    # 7: make expense_tags.expense_id a foreign key that cascades deletes, so
+    # removing expenses drops their links in the same statement. The table is
+    # rebuilt without a rename, which would make SQLite re-check triggers on
+    # expenses that name expense_tags; its own triggers go with the old table
+    # and are recreated once the links are copied. Links to missing expenses
+    # count towards no rollup and are not copied. The check is deferred to
+    # commit so links may still be written before their expense.
+    """
+    CREATE TEMP TABLE expense_tags_copy AS
+        SELECT expense_id, tag_id FROM expense_tags
+        WHERE expense_id IN (SELECT id FROM expenses);
+    DROP TABLE expense_tags;
+    CREATE TABLE expense_tags (
+        expense_id integer REFERENCES expenses (id)
+            ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        tag_id integer
+    );
+    INSERT INTO expense_tags (expense_id, tag_id)
+        SELECT expense_id, tag_id FROM expense_tags_copy;
+    DROP TABLE expense_tags_copy;
+    CREATE INDEX expense_tags_expense_tag ON expense_tags (expense_id, tag_id);
+    CREATE INDEX expense_tags_tag_id ON expense_tags (tag_id);
+
+    CREATE TRIGGER rollup_tag_insert AFTER INSERT ON expense_tags BEGIN
+        INSERT INTO rollup_month_tags (month, tag_id, total, count)
+            SELECT IFNULL(substr(date, 1, 7), ''), NEW.tag_id, IFNULL(cost, 0), 1
+            FROM expenses WHERE id = NEW.expense_id
+            ON CONFLICT (month, tag_id) DO UPDATE
+            SET total = total + excluded.total, count = count + 1;
+    END;
+
+    CREATE TRIGGER rollup_tag_delete AFTER DELETE ON expense_tags BEGIN
+        UPDATE rollup_month_tags
+            SET total = total - (
+                    SELECT IFNULL(cost, 0) FROM expenses WHERE id = OLD.expense_id
+                ),
+                count = count - 1
+            WHERE tag_id = OLD.tag_id AND month = (
+                SELECT IFNULL(substr(date, 1, 7), '') FROM expenses
+                WHERE id = OLD.expense_id
+            );
+        DELETE FROM rollup_month_tags WHERE count = 0 AND tag_id = OLD.tag_id;
+    END;
+
+    CREATE TRIGGER search_tag_insert AFTER INSERT ON expense_tags BEGIN
+        UPDATE expense_search SET tags = IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = NEW.expense_id
+            ), '')
+            WHERE rowid = NEW.expense_id;
+    END;
+
+    CREATE TRIGGER search_tag_delete AFTER DELETE ON expense_tags BEGIN
+        UPDATE expense_search SET tags = IFNULL((
+                SELECT group_concat(tags.name, ' ') FROM expense_tags
+                INNER JOIN tags ON expense_tags.tag_id = tags.id
+                WHERE expense_tags.expense_id = OLD.expense_id
+            ), '')
+            WHERE rowid = OLD.expense_id;
+    END;
+    """,
+    # 8: fingerprint of date, name and cost for finding duplicate expenses.
+    # It is computed in Python, so existing rows are filled in by
+    # dedup.backfill when the Repository opens the file.
+    """
+    ALTER TABLE expenses ADD COLUMN fingerprint integer;
+    CREATE INDEX expenses_fingerprint ON expenses (fingerprint);
+    """,
+    # 9: expenses paid in another currency keep the amount paid and its code
+    # next to the cost in yen; both are NULL for yen. exchange_rates holds yen
+    # per unit of each currency by date. Converted reports group by day and
+    # currency, which expenses_date_paid covers without reading the table.
+    """
+    ALTER TABLE expenses ADD COLUMN original_amount real;
+    ALTER TABLE expenses ADD COLUMN currency text;
+    CREATE INDEX expenses_date_paid
+        ON expenses (date, currency, original_amount, cost);
+    CREATE TABLE exchange_rates (
+        currency text,
+        date text,
+        rate real not null,
+        primary key (currency, date)
+    ) WITHOUT ROWID;
+    """,
+    # 10: rewrite the legacy dates migration 3 missed, whose month or day is
+    # unpadded as in "21-4-21", as ISO dates. The rollup update trigger moves
+    # them into their months; fingerprints already normalize dates.
+    """
+    UPDATE expenses SET date = printf(
+        '20%s-%02d-%02d',
+        substr(date, 1, 2),
+        CAST(substr(date, 4, instr(substr(date, 4), '-') - 1) AS INTEGER),
+        CAST(substr(substr(date, 4), instr(substr(date, 4), '-') + 1) AS INTEGER)
+    )
+    WHERE date GLOB '[0-9][0-9]-[0-9]-[0-9]'
+        OR date GLOB '[0-9][0-9]-[0-9]-[0-9][0-9]'
+        OR date GLOB '[0-9][0-9]-[0-9][0-9]-[0-9]'
+        OR date GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9]';
+    """,
+    # 11: drop the links migration 2 made identical when it merged tags of the
+    # same name, keeping the first of each. The link delete triggers take
+    # them back out of the month x tag rollups and the search index.
+    """
+    DELETE FROM expense_tags WHERE rowid NOT IN (
+        SELECT MIN(rowid) FROM expense_tags GROUP BY expense_id, tag_id
+    );
+    """,
+    # 12: make (expense_id, tag_id) unique, so a link can only be written once.
+    """
+    DROP INDEX expense_tags_expense_tag;
+    CREATE UNIQUE INDEX expense_tags_expense_tag
+        ON expense_tags (expense_id, tag_id);
+    """,
+]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database file."""
+
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply every pending migration in order and return the final version.
+
+    Each migration runs in its own transaction together with the version bump,
+    so an interrupted upgrade leaves the file at the last completed version and
+    calling this again simply resumes from there.
+    """
+
+    version = get_version(conn)
+    for target, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.executescript(
+                f"BEGIN;\n{script}\nPRAGMA user_version = {target};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    return get_version(conn)
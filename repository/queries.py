@@ -0,0 +1,80 @@
+"""SQL shared by every storage backend.
+
+Queries use ':name' placeholders and only syntax that SQLite and MySQL agree
+on; a backend's prepare() rewrites the placeholders to its driver's style.
+Dates are compared as ISO "YYYY-MM-DD" strings, which both servers order
+correctly. Expense rows are selected by name as EXPENSE_COLUMNS, so neither
+the order in which a table gained its columns nor columns added later change
+what a row unpacks to.
+"""
+
+# Columns of an expense row, in the order readers unpack them.
+EXPENSE_COLUMNS = ", ".join(
+    f"expenses.{column}"
+    for column in ("id", "date", "name", "cost", "original_amount", "currency")
+)
+
+GET_LIMIT = f"SELECT {EXPENSE_COLUMNS} FROM expenses ORDER BY id DESC LIMIT :limit"
+
+ORDER_BY_PRICE = (
+    f"SELECT {EXPENSE_COLUMNS} FROM expenses ORDER BY cost DESC LIMIT :limit"
+)
+
+GET_OVER = f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE cost > :upper LIMIT :limit"
+
+GET_TAG = (
+    f"SELECT {EXPENSE_COLUMNS} FROM expenses "
+    "INNER JOIN expense_tags "
+    "ON expenses.id = expense_tags.expense_id "
+    "INNER JOIN tags "
+    "ON expense_tags.tag_id = tags.id "
+    "WHERE tags.name = :tag "
+    "LIMIT :limit"
+)
+
+GET_RANGE = (
+    f"SELECT {EXPENSE_COLUMNS} FROM expenses "
+    "WHERE date >= :start AND date < :end ORDER BY date"
+)
+
+GET_EXPENSE = f"SELECT {EXPENSE_COLUMNS} FROM expenses WHERE id = :id"
+
+GET_TOTAL = "SELECT COALESCE(SUM(cost), 0) FROM expenses"
+
+INSERT_EXPENSE = "INSERT INTO expenses(name, cost, date) VALUES (:name, :cost, :date)"
+
+INSERT_EXPENSE_TAG = (
+    "INSERT INTO expense_tags(expense_id, tag_id) VALUES (:expense_id, :tag_id)"
+)
+
+INSERT_TAG = "INSERT INTO tags(name) VALUES (:name)"
+
+DELETE_EXPENSE = "DELETE FROM expenses WHERE id = :key"
+
+DELETE_EXPENSE_TAGS = "DELETE FROM expense_tags WHERE expense_id = :key"
+
+
+def in_list(name: str, count: int) -> tuple[str, list[str]]:
+    """Return "(:name0, :name1, ...)" for an IN clause and its parameter names."""
+
+    names = [f"{name}{index}" for index in range(count)]
+    return f"({', '.join(':' + name for name in names)})", names
+
+
+def tag_names_for(count: int) -> tuple[str, list[str]]:
+    """Return a query for (expense id, tag name) of 'count' expense ids."""
+
+    ids, names = in_list("id", count)
+    query = (
+        "SELECT expense_tags.expense_id, tags.name FROM expense_tags "
+        "INNER JOIN tags ON expense_tags.tag_id = tags.id "
+        f"WHERE expense_tags.expense_id IN {ids}"
+    )
+    return query, names
+
+
+def tag_ids_for(count: int) -> tuple[str, list[str]]:
+    """Return a query for (name, id) of 'count' tag names."""
+
+    tags, names = in_list("tag", count)
+    return f"SELECT name, id FROM tags WHERE name IN {tags}", names
@@ -0,0 +1,174 @@
+import sqlite3
+from typing import NamedTuple, Optional
+
+from constants import BASE_CURRENCY
+from repository.currency import RateCache
+from repository.dates import DateLike, normalize_date
+
+# What each expense cost in the currency it was paid in, and that currency.
+AMOUNT = "IFNULL(expenses.original_amount, expenses.cost)"
+PAID_IN = f"IFNULL(expenses.currency, '{BASE_CURRENCY}')"
+
+
+class ReportRow(NamedTuple):
+    """Aggregate figures for one group of expenses."""
+
+    key: str
+    total: int
+    count: int
+    average: float
+
+
+def _date_filter(
+    start: Optional[DateLike], end: Optional[DateLike]
+) -> tuple[str, dict]:
+    """Build a WHERE clause for an optional half-open [start, end) date range."""
+
+    conditions = []
+    parameters = {}
+    if start is not None:
+        conditions.append("expenses.date >= :start")
+        parameters["start"] = normalize_date(start)
+    if end is not None:
+        conditions.append("expenses.date < :end")
+        parameters["end"] = normalize_date(end)
+
+    where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+    return where, parameters
+
+
+def _run(conn: sqlite3.Connection, query: str, parameters: dict) -> list[ReportRow]:
+    return [ReportRow(*row) for row in conn.execute(query, parameters)]
+
+
+def _converted(
+    conn: sqlite3.Connection,
+    query: str,
+    parameters: dict,
+    currency: str,
+    rates: Optional[RateCache],
+) -> list[ReportRow]:
+    """Total (key, paid in, date, amount, count) groups in 'currency'.
+
+    The query aggregates per currency paid in and day, so each group is
+    converted with one cached factor instead of converting every expense.
+    """
+
+    rates = rates or RateCache()
+    totals: dict[str, list] = {}
+    for key, paid_in, date, amount, count in conn.execute(query, parameters):
+        entry = totals.setdefault(key, [0.0, 0])
+        entry[0] += amount * rates.factor(conn, paid_in, currency, date)
+        entry[1] += count
+    return [
+        ReportRow(key, total, count, total / count)
+        for key, (total, count) in totals.items()
+    ]
+
+
+def _in_base(currency: Optional[str]) -> bool:
+    return currency is None or currency == BASE_CURRENCY
+
+
+def by_tag(
+    conn: sqlite3.Connection,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    currency: Optional[str] = None,
+    rates: Optional[RateCache] = None,
+) -> list[ReportRow]:
+    """Sum, count and average expenses per tag, largest total first.
+
+    An expense with several tags counts towards each of them, and untagged
+    expenses are left out. Totals are in yen unless 'currency' names another
+    currency, converted at each day's rate from what was actually paid.
+    """
+
+    where, parameters = _date_filter(start, end)
+    if not _in_base(currency):
+        query = (
+            f"SELECT tags.name, {PAID_IN}, expenses.date, SUM({AMOUNT}), COUNT(*) "
+            "FROM expenses "
+            "INNER JOIN expense_tags ON expenses.id = expense_tags.expense_id "
+            "INNER JOIN tags ON expense_tags.tag_id = tags.id "
+            f"{where}"
+            "GROUP BY tags.id, expenses.date, expenses.currency"
+        )
+        rows = _converted(conn, query, parameters, currency, rates)
+        return sorted(rows, key=lambda row: row.total, reverse=True)
+    query = (
+        "SELECT tags.name, SUM(expenses.cost), COUNT(*), AVG(expenses.cost) "
+        "FROM expenses "
+        "INNER JOIN expense_tags ON expenses.id = expense_tags.expense_id "
+        "INNER JOIN tags ON expense_tags.tag_id = tags.id "
+        f"{where}"
+        "GROUP BY tags.id ORDER BY SUM(expenses.cost) DESC"
+    )
+    return _run(conn, query, parameters)
+
+
+def by_month(
+    conn: sqlite3.Connection,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    currency: Optional[str] = None,
+    rates: Optional[RateCache] = None,
+) -> list[ReportRow]:
+    """Sum, count and average expenses per "YYYY-MM" month, oldest first.
+
+    Totals are in yen unless 'currency' names another currency, as in by_tag.
+    """
+
+    where, parameters = _date_filter(start, end)
+    if not _in_base(currency):
+        query = (
+            f"SELECT substr(date, 1, 7), {PAID_IN}, date, SUM({AMOUNT}), COUNT(*) "
+            f"FROM expenses {where}"
+            "GROUP BY date, currency"
+        )
+        rows = _converted(conn, query, parameters, currency, rates)
+        return sorted(rows, key=lambda row: row.key)
+    query = (
+        "SELECT substr(date, 1, 7) AS month, SUM(cost), COUNT(*), AVG(cost) "
+        f"FROM expenses {where}"
+        "GROUP BY month ORDER BY month"
+    )
+    return _run(conn, query, parameters)
+
+
+def by_category(
+    conn: sqlite3.Connection,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+) -> list[ReportRow]:
+    """Sum, count and average expenses per legacy category, largest total first."""
+
+    where, parameters = _date_filter(start, end)
+    query = (
+        "SELECT COALESCE(category, ''), SUM(cost), COUNT(*), AVG(cost) "
+        f"FROM expenses {where}"
+        "GROUP BY category ORDER BY SUM(cost) DESC"
+    )
+    return _run(conn, query, parameters)
+
+
+def total(
+    conn: sqlite3.Connection,
+    start: Optional[DateLike] = None,
+    end: Optional[DateLike] = None,
+    currency: Optional[str] = None,
+    rates: Optional[RateCache] = None,
+) -> float:
+    """Sum every expense in the optional date range, in yen or 'currency'."""
+
+    where, parameters = _date_filter(start, end)
+    if not _in_base(currency):
+        query = (
+            f"SELECT '', {PAID_IN}, date, SUM({AMOUNT}), COUNT(*) "
+            f"FROM expenses {where}"
+            "GROUP BY date, currency"
+        )
+        rows = _converted(conn, query, parameters, currency, rates)
+        return rows[0].total if rows else 0.0
+    query = f"SELECT COALESCE(SUM(cost), 0) FROM expenses {where}"
+    return conn.execute(query, parameters).fetchone()[0]
@@ -1,73 +1,105 @@
+import datetime
+import logging
 import sqlite3
-from datetime import date
+import threading
+from contextlib import contextmanager, nullcontext
+from itertools import compress, islice
+from typing import ContextManager, Iterable, Iterator, Optional, Union
 
 from entities.expense import Expense
-from constants import Lookup
+from entities.expense_batch import ExpenseBatch
+from constants import BASE_CURRENCY, Lookup
+from repository.dates import DateLike, month_bounds, normalize_date, normalize_year
+from repository import currency, dedup, fulltext, queries, reports, rollups
+from repository.connection import DEFAULT_READERS, ConnectionPool, ConnectionProfile
+from repository.dedup import DuplicateExpenseError, OnDuplicate
+from repository.migrations import migrate
 
+logger = logging.getLogger(__name__)
 
-class Repository:
-    """Database object for reading from and writing to database file."""
+# SQLite builds before 3.32 reject statements with more than 999 parameters.
+MAX_QUERY_PARAMETERS = 999
+
+DEFAULT_BATCH_SIZE = 10_000
+
+DEFAULT_CHUNK_SIZE = 1_000
+
+# Columns get_page may sort by; each is indexed so pages are index seeks.
+PAGE_ORDER_COLUMNS = {"id": "id", "cost": "cost", "date": "date"}
+
+# Temp table of expense ids that batched deletes and retags work on.
+SELECTED = "selected_expenses"
+
+# Below this many rows, batched writes keep the per-row triggers; dropping and
+# recreating them costs more than the trigger work it saves.
+SET_BASED_MIN = 16
+
+# Columns written for every expense, in the order _columns returns them.
+COLUMNS = "date, name, cost, original_amount, currency, fingerprint"
+PARAMETERS = ", ".join(f":{column}" for column in COLUMNS.split(", "))
 
-    def __init__(self, debug: bool = False, setup: bool = False) -> None:
-        """Establish database connection and create cursor."""
+# An expense or its key.
+ExpenseKey = Union[Expense, int]
+
+
+def _key(expense: ExpenseKey) -> int:
+    return getattr(expense, "key", expense)
+
+
+class Repository:
+    """Database object for reading from and writing to database file.
+
+    Safe to share between threads: every call runs on its own cursor, reads
+    check out a reader connection from the pool and writes are serialized
+    through its single writer.
+    """
+
+    def __init__(
+        self,
+        debug: bool = False,
+        setup: bool = False,
+        path: str = "expenses.db",
+        profile: Union[ConnectionProfile, str] = ConnectionProfile.DURABLE,
+        readers: int = DEFAULT_READERS,
+    ) -> None:
+        """Open the connection pool and bring the schema up to date."""
         self.debug = debug
         if debug is True:
-            self.conn = sqlite3.connect(":memory:")
+            self.pool = ConnectionPool(":memory:", profile, readers)
         else:
-            self.conn = sqlite3.connect("expenses.db")
-
-        self.c = self.conn.cursor()
+            self.pool = ConnectionPool(path, profile, readers)
+        # The writer connection, for single-threaded maintenance and scripts.
+        self.conn = self.pool.writer
 
         if setup is True or debug is True:
             self.setup()
+        else:
+            migrate(self.conn)
+        with self.pool.writing() as conn:
+            dedup.backfill(conn)
 
-        name_from_id, id_from_name = self._create_lookup_tables()
-        self.lookup = {
-            Lookup.ID_FROM_NAME: id_from_name,
-            Lookup.NAME_FROM_ID: name_from_id,
-        }
+        # Loaded on first use so opening the database stays cheap.
+        self._lookup: Optional[dict[Lookup, dict]] = None
+        self._lookup_lock = threading.Lock()
+        self.rates = currency.RateCache()
 
     def setup(self) -> None:
         """Handle first-time setup or debugging mode setup."""
 
-        with self.conn:
-            self.c.execute(
-                """
-                    CREATE TABLE expenses (
-                    id integer primary key,
-                    date text,
-                    name text,
-                    cost integer,
-                    category text
-                    )"""
-            )
-            self.c.execute(
-                """
-                    CREATE TABLE expense_tags (
-                    expense_id integer,
-                    tag_id integer
-                    )"""
-            )
-            self.c.execute(
-                """
-                    CREATE TABLE tags (
-                    id integer,
-                    name text
-                    )"""
-            )
-
+        migrate(self.conn)
+        with self.pool.writing() as conn:
             if self.debug is True:
-                self.c.execute(
+                conn.execute(
                     """
-                    INSERT INTO expenses VALUES
-                    (1, "20-03-18", "Coca-Cola", 160, ""),
-                    (2, "20-03-19", "Amazon Prime", 1500, ""),
-                    (3, "21-03-19", "Dinner", 3200, ""),
-                    (4, "21-04-18", "Sprite", 160, ""),
-                    (5, "21-04-18", "Hotto Motto Bento", 660, "")
+                    INSERT INTO tags VALUES
+                    (1, "Groceries"),
+                    (2, "Dining"),
+                    (3, "Social"),
+                    (4, "Household"),
+                    (5, "Travel")
                     """
                 )
-                self.c.execute(
+                conn.execute(
                     """
                     INSERT INTO expense_tags VALUES
                     (1, 1),
@@ -78,182 +110,786 @@ class Repository:
                     (5, 3)
                     """
                 )
-                self.c.execute(
+                conn.execute(
                     """
-                    INSERT INTO tags VALUES
-                    (1, "Groceries"),
-                    (2, "Dining"),
-                    (3, "Social"),
-                    (4, "Household"),
-                    (5, "Travel")
+                    INSERT INTO expenses (id, date, name, cost, category) VALUES
+                    (1, "2020-03-18", "Coca-Cola", 160, ""),
+                    (2, "2020-03-19", "Amazon Prime", 1500, ""),
+                    (3, "2021-03-19", "Dinner", 3200, ""),
+                    (4, "2021-04-18", "Sprite", 160, ""),
+                    (5, "2021-04-18", "Hotto Motto Bento", 660, "")
                     """
                 )
 
-    def remove_expense(self, expense: Expense) -> None:
-        """Remove an expense from the database."""
+    def close(self) -> None:
+        """Close every pooled connection."""
+
+        self.pool.close()
 
-        expenses_query = "DELETE FROM expenses WHERE id=:key"
-        tags_query = "DELETE FROM expense_tags WHERE expense_id=:key"
-        with self.conn:
+    def remove_expense(self, expense: ExpenseKey) -> None:
+        """Remove an expense from the database; its tag links cascade."""
+
+        with self.pool.writing() as conn:
             try:
-                parameters = {"key": expense.key}
-                self.c.execute(expenses_query, parameters)
-                self.c.execute(tags_query, parameters)
-            except AttributeError:
-                parameters = {"key": expense}
-                self.c.execute(expenses_query, parameters)
-                self.c.execute(tags_query, parameters)
-            except:
-                self.conn.rollback()
-                print("DB delete error")
+                conn.execute(queries.DELETE_EXPENSE, {"key": _key(expense)})
+            except sqlite3.Error:
+                conn.rollback()
+                logger.exception("Could not delete expense %r", expense)
+
+    def remove_expenses(self, expenses: Iterable[ExpenseKey]) -> int:
+        """Remove many expenses in one transaction and return how many existed."""
+
+        with self.pool.writing() as conn:
+            count = self._select(conn, expenses)
+            with self._set_based(conn, count):
+                if count >= SET_BASED_MIN:
+                    rollups.add_selected(conn, SELECTED, sign=-1)
+                    fulltext.remove_selected(conn, SELECTED)
+                conn.execute(
+                    f"DELETE FROM expenses WHERE id IN (SELECT id FROM {SELECTED})"
+                )
+        return count
+
+    def update_expense(self, expense: Expense) -> bool:
+        """Overwrite the stored expense with the same key, tags included.
+
+        Returns False, changing nothing, if no expense has that key. Unknown
+        tag names raise KeyError.
+        """
+
+        tag_ids = self._tag_ids(expense.tags)
+        query = (
+            "UPDATE expenses SET name = :name, cost = :cost, date = :date, "
+            "original_amount = :original_amount, currency = :currency, "
+            "fingerprint = :fingerprint WHERE id = :key"
+        )
+        with self.pool.writing() as conn:
+            parameters = {"key": expense.key, **self._columns(conn, expense)}
+            if not conn.execute(query, parameters).rowcount:
+                return False
+            current = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT tag_id FROM expense_tags WHERE expense_id = :key",
+                    parameters,
+                )
+            ]
+            if sorted(current) != sorted(tag_ids):
+                conn.execute(queries.DELETE_EXPENSE_TAGS, parameters)
+                conn.executemany(
+                    queries.INSERT_EXPENSE_TAG,
+                    [
+                        {"expense_id": expense.key, "tag_id": tag_id}
+                        for tag_id in tag_ids
+                    ],
+                )
+        return True
+
+    def retag(
+        self, expenses: Iterable[ExpenseKey], tags: Union[str, list[str]]
+    ) -> int:
+        """Replace the tags of many expenses and return how many existed.
+
+        Runs in one transaction. Unknown tag names raise KeyError.
+        """
+
+        tag_ids = self._tag_ids(tags)
+        with self.pool.writing() as conn:
+            count = self._select(conn, expenses)
+            with self._set_based(conn, count):
+                if count >= SET_BASED_MIN:
+                    rollups.add_selected(conn, SELECTED, sign=-1, months=False)
+                conn.execute(
+                    "DELETE FROM expense_tags "
+                    f"WHERE expense_id IN (SELECT id FROM {SELECTED})"
+                )
+                conn.executemany(
+                    "INSERT INTO expense_tags (expense_id, tag_id) "
+                    f"SELECT id, ? FROM {SELECTED}",
+                    [(tag_id,) for tag_id in tag_ids],
+                )
+                if count >= SET_BASED_MIN:
+                    rollups.add_selected(conn, SELECTED, months=False)
+                    fulltext.reindex_tags(conn, SELECTED)
+        return count
+
+    def _select(self, conn: sqlite3.Connection, expenses: Iterable[ExpenseKey]) -> int:
+        """Fill the SELECTED temp table with the keys that exist; return the count."""
+
+        conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {SELECTED} (id integer primary key)"
+        )
+        conn.execute(f"DELETE FROM {SELECTED}")
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {SELECTED} (id) VALUES (?)",
+            ((_key(expense),) for expense in expenses),
+        )
+        conn.execute(
+            f"DELETE FROM {SELECTED} WHERE id NOT IN (SELECT id FROM expenses)"
+        )
+        return conn.execute(f"SELECT COUNT(*) FROM {SELECTED}").fetchone()[0]
+
+    def _set_based(self, conn: sqlite3.Connection, count: int) -> ContextManager:
+        """Suspend the per-row triggers if 'count' rows are worth set-based upkeep."""
+
+        if count >= SET_BASED_MIN:
+            return self._triggers_suspended(conn)
+        return nullcontext()
 
     def order_by_price(self, limit: int = 100) -> list[Expense]:
         """Query database for a list of expenses ordered by cost."""
 
-        query = "SELECT * FROM expenses ORDER BY cost DESC LIMIT :limit"
-        self.c.execute(query, {"limit": limit})
-        return [self.convert_to_object(expense) for expense in self.c.fetchall()]
+        return self._query(queries.ORDER_BY_PRICE, {"limit": limit})
 
     def get_tag(self, tag: str, limit: int = 100) -> list[Expense]:
         """Query database for a list of expenses with given tags."""
 
-        query = (
-            "SELECT id, name, cost, tags, date, created_at, updated_at, tags.name FROM expenses "
-            "INNER JOIN expense_tags "
-            "ON expenses.id = expense_tags.expense_id "
-            "INNER JOIN tags "
-            "ON expense_tags.tag_id = tags.id "
-            "WHERE tags.name = :tag "
-            "LIMIT :limit"
-        )
-        parameters = {"tag": tag, "limit": limit}
-        self.c.execute(query, parameters)
-
-        return [self.convert_to_object(expense) for expense in self.c.fetchall()]
+        return self._query(queries.GET_TAG, {"tag": tag, "limit": limit})
 
     def get_all(self) -> list[Expense]:
         """Query database for a list of all expenses."""
 
-        query = "SELECT * FROM expenses"
-        self.c.execute(query)
+        return list(self.iter_all())
 
-        return [self.convert_to_object(expense) for expense in self.c.fetchall()]
+    def iter_all(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Expense]:
+        """Lazily yield every expense, reading 'chunk_size' rows at a time."""
+
+        query = f"SELECT {queries.EXPENSE_COLUMNS} FROM expenses ORDER BY id"
+        return self._iterate(query, {}, chunk_size)
 
     def get_limit(self, limit: int = 10) -> list[Expense]:
         """Query for a list of expenses up to 'limit'."""
 
-        query = "SELECT * FROM expenses ORDER BY id DESC LIMIT :limit"
-        self.c.execute(query, {"limit": limit})
-
-        return [self.convert_to_object(expense) for expense in self.c.fetchall()]
+        return self._query(queries.GET_LIMIT, {"limit": limit})
+
+    def get_page(
+        self,
+        order_by: str = "id",
+        descending: bool = True,
+        after: Optional[tuple] = None,
+        before: Optional[tuple] = None,
+        limit: int = 100,
+    ) -> list[Expense]:
+        """Query one page of expenses using keyset pagination.
+
+        'after' and 'before' are the (sort value, id) key of the last or first
+        row of an adjacent page. The page is located by seeking the index on
+        the sort column to that key, so deep pages cost the same as the first
+        one instead of growing with an OFFSET.
+        """
+
+        column = PAGE_ORDER_COLUMNS[order_by]
+        # Paging backwards walks the index in the opposite direction and
+        # reverses the rows afterwards.
+        backwards = before is not None
+        ascending = descending is backwards
+        direction = "ASC" if ascending else "DESC"
+        key = before if backwards else after
+
+        where = ""
+        parameters: dict = {"limit": limit}
+        if key is not None:
+            comparison = ">" if ascending else "<"
+            if column == "id":
+                where = f"WHERE id {comparison} :id "
+            else:
+                where = f"WHERE ({column}, id) {comparison} (:value, :id) "
+            parameters.update({"value": key[0], "id": key[1]})
+
+        order = "id" if column == "id" else f"{column} {direction}, id"
+        query = (
+            f"SELECT {queries.EXPENSE_COLUMNS} FROM expenses {where}"
+            f"ORDER BY {order} {direction} LIMIT :limit"
+        )
+        with self.pool.reading() as conn:
+            records = conn.execute(query, parameters).fetchall()
+            if backwards:
+                records.reverse()
+            return self._to_objects(conn, records)
 
     def get_month(self, month: str, year: str) -> list[Expense]:
         """Query database for expenses on a given month."""
-        query = "SELECT * FROM expenses WHERE date LIKE :month"
-        if year == "":
-            year = str(date.today())[2:4]
-        parameters = {"month": year + "-" + month + "%"}
-        self.c.execute(query, parameters)
 
-        return [self.convert_to_object(expense) for expense in self.c.fetchall()]
+        start, end = month_bounds(normalize_year(year), int(month))
+        return self.get_range(start, end)
 
-    def get_expense(self, expense: Expense) -> Expense:
-        """Query database for a specific expense."""
+    def get_year(self, year: str) -> list[Expense]:
+        """Query database for expenses in a given year."""
 
-        query = "SELECT * FROM expenses WHERE id = :id"
-        try:
-            self.c.execute(query, {"id": expense.key})
+        year_number = normalize_year(year)
+        start = f"{year_number:04d}-01-01"
+        end = f"{year_number + 1:04d}-01-01"
+        return self.get_range(start, end)
 
-        except AttributeError:
-            self.c.execute(query, {"id": expense})
+    def get_range(self, start: DateLike, end: DateLike) -> list[Expense]:
+        """Query database for expenses from 'start' up to but excluding 'end'."""
+
+        return list(self.iter_range(start, end))
+
+    def iter_month(
+        self, month: str, year: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[Expense]:
+        """Lazily yield the expenses of a given month."""
+
+        start, end = month_bounds(normalize_year(year), int(month))
+        return self.iter_range(start, end, chunk_size)
+
+    def iter_range(
+        self, start: DateLike, end: DateLike, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[Expense]:
+        """Lazily yield expenses from 'start' up to but excluding 'end'."""
+
+        parameters = {"start": normalize_date(start), "end": normalize_date(end)}
+        return self._iterate(queries.GET_RANGE, parameters, chunk_size)
+
+    def _iterate(
+        self, query: str, parameters: dict, chunk_size: int
+    ) -> Iterator[Expense]:
+        """Run a query on its own cursor and yield expenses chunk by chunk.
+
+        A dedicated cursor keeps several iterations, or an iteration and calls
+        to other methods, from clobbering each other's result sets. The reader
+        stays checked out until the iteration finishes or is closed.
+        """
+
+        with self.pool.reading() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, parameters)
+                while records := cursor.fetchmany(chunk_size):
+                    yield from self._to_objects(conn, records)
+            finally:
+                cursor.close()
+
+    def get_batch(
+        self, start: Optional[DateLike] = None, end: Optional[DateLike] = None
+    ) -> ExpenseBatch:
+        """Load expenses, optionally from 'start' up to 'end', as columns.
+
+        Rows and tag links are read as two id-ordered streams and merged, so no
+        Expense objects or per-row tag queries are involved.
+        """
+
+        where = ""
+        join = ""
+        parameters = {}
+        if start is not None or end is not None:
+            where = "WHERE expenses.date >= :start AND expenses.date < :end "
+            join = "INNER JOIN expenses ON expenses.id = expense_tags.expense_id "
+            parameters = {
+                "start": normalize_date(start) if start is not None else "",
+                "end": normalize_date(end) if end is not None else "~",
+            }
+
+        batch = ExpenseBatch()
+        with self.pool.reading() as conn:
+            # julianday('0001-01-01') is 1721425.5, and that day is ordinal 1.
+            rows = conn.execute(
+                "SELECT id, IFNULL(cost, 0), "
+                "IFNULL(CAST(julianday(date) - 1721424.5 AS INTEGER), 0) "
+                f"FROM expenses {where}ORDER BY id",
+                parameters,
+            )
+            links = conn.execute(
+                "SELECT expense_tags.expense_id, expense_tags.tag_id "
+                f"FROM expense_tags {join}{where}ORDER BY expense_tags.expense_id",
+                parameters,
+            )
+
+            link = next(links, None)
+            for id, cost, day in rows:
+                tag_ids = []
+                while link is not None and link[0] <= id:
+                    if link[0] == id:
+                        tag_ids.append(link[1])
+                    link = next(links, None)
+                batch.append(id, cost, day, tag_ids)
+        return batch
+
+    def search(self, text: str, limit: int = 20) -> list[Expense]:
+        """Full-text search expense and tag names, newest matches first.
+
+        Every word must match, and the words are treated as prefixes, so
+        partially typed input already finds results.
+        """
+
+        match = fulltext.match_expression(text)
+        if not match:
+            return []
+        query = (
+            f"SELECT {queries.EXPENSE_COLUMNS} FROM expense_search "
+            "INNER JOIN expenses ON expenses.id = expense_search.rowid "
+            "WHERE expense_search MATCH :match "
+            "ORDER BY expense_search.rowid DESC LIMIT :limit"
+        )
+        return self._query(query, {"match": match, "limit": limit})
+
+    def get_expense(self, expense: Expense) -> Optional[Expense]:
+        """Query database for a specific expense, or None if it does not exist."""
 
-        return self.convert_to_object(self.c.fetchone())
+        try:
+            parameters = {"id": expense.key}
+        except AttributeError:
+            parameters = {"id": expense}
+
+        expenses = self._query(queries.GET_EXPENSE, parameters)
+        return expenses[0] if expenses else None
+
+    def find_duplicates(self) -> list[list[Expense]]:
+        """Group expenses that share a date, name and cost."""
+
+        with self.pool.reading() as conn:
+            return self._groups(conn, dedup.duplicate_groups(conn))
+
+    def find_near_duplicates(
+        self, days: int = 3, match_name: bool = False
+    ) -> list[list[Expense]]:
+        """Group same-cost expenses dated at most 'days' days after one another.
+
+        With 'match_name' the names must also agree once case, width and
+        spacing are ignored.
+        """
+
+        with self.pool.reading() as conn:
+            groups = dedup.near_duplicate_groups(conn, days, match_name)
+            return self._groups(conn, groups)
+
+    def _groups(
+        self, conn: sqlite3.Connection, groups: list[list[int]]
+    ) -> list[list[Expense]]:
+        """Hydrate groups of expense ids, keeping their order."""
+
+        ids = [id for group in groups for id in group]
+        expenses = {}
+        for start in range(0, len(ids), MAX_QUERY_PARAMETERS):
+            chunk = ids[start : start + MAX_QUERY_PARAMETERS]
+            keys, names = queries.in_list("id", len(chunk))
+            records = conn.execute(
+                f"SELECT {queries.EXPENSE_COLUMNS} FROM expenses WHERE id IN {keys}",
+                dict(zip(names, chunk)),
+            ).fetchall()
+            for expense in self._to_objects(conn, records):
+                expenses[expense.key] = expense
+        return [[expenses[id] for id in group] for group in groups]
+
+    @property
+    def lookup(self) -> dict[Lookup, dict]:
+        """Tag lookup tables in both directions, read from the tags table once."""
+
+        lookup = self._lookup
+        if lookup is None:
+            with self.pool.reading() as conn:
+                lookup = self._lookup_on(conn)
+        return lookup
+
+    def _lookup_on(self, conn: sqlite3.Connection) -> dict[Lookup, dict]:
+        """Return the tag lookup, loading it on 'conn' if it is not loaded.
+
+        Callers already holding a pooled connection use this instead of the
+        lookup property, which would check out a second one and could wait
+        forever once every reader is held by such a caller.
+        """
+
+        lookup = self._lookup
+        if lookup is None:
+            with self._lookup_lock:
+                if self._lookup is None:
+                    self._lookup = self._load_lookup(conn)
+                lookup = self._lookup
+        return lookup
+
+    def get_tag_names(self) -> list[str]:
+        """Return every tag name in the order the tags were created."""
+
+        return list(self.lookup[Lookup.ID_FROM_NAME])
+
+    def _load_lookup(self, conn: sqlite3.Connection) -> dict[Lookup, dict]:
+        """Build both tag lookup directions from the tags table."""
+
+        name_from_id, id_from_name = self._create_lookup_tables(conn)
+        return {
+            Lookup.ID_FROM_NAME: id_from_name,
+            Lookup.NAME_FROM_ID: name_from_id,
+        }
 
-    def _create_lookup_tables(self) -> tuple[dict[str, str], dict[str, str]]:
+    def _create_lookup_tables(
+        self, conn: sqlite3.Connection
+    ) -> tuple[dict[str, str], dict[str, str]]:
         """Creates lookup tables for tags."""
 
         id_from_name = {}
         name_from_id = {}
         query = "SELECT id, name FROM tags"
 
-        with self.conn:
-            self.c.execute(query)
-            for expense in self.c.fetchall():
-                id, name = expense
-                id_from_name[name] = id
-                name_from_id[id] = name
-            return (name_from_id, id_from_name)
+        for id, name in conn.execute(query):
+            id_from_name[name] = id
+            name_from_id[id] = name
+        return (name_from_id, id_from_name)
 
     def get_expense_tags(self, expense_id: int) -> list[str]:
-        query = "SELECT tag_id FROM expense_tags WHERE expense_id=:key"
-        self.c.execute(query, {"key": expense_id})
-        tag_ids = [tag[0] for tag in self.c.fetchall()]
-        tag_names = []
-        for id in tag_ids:
-            tag_names.append(self.lookup[Lookup.NAME_FROM_ID][id])
-        return tag_names
+        """Query database for the tag names of a single expense."""
+
+        return self.get_tags_for([expense_id]).get(expense_id, [])
+
+    def get_tags_for(self, expense_ids: list[int]) -> dict[int, list[str]]:
+        """Query database for the tag names of many expenses at once."""
+
+        with self.pool.reading() as conn:
+            return self._tags_for(conn, expense_ids)
+
+    def _tags_for(
+        self, conn: sqlite3.Connection, expense_ids: list[int]
+    ) -> dict[int, list[str]]:
+        name_from_id = self._lookup_on(conn)[Lookup.NAME_FROM_ID]
+        tags: dict[int, list[str]] = {}
+        for start in range(0, len(expense_ids), MAX_QUERY_PARAMETERS):
+            chunk = expense_ids[start : start + MAX_QUERY_PARAMETERS]
+            query = (
+                "SELECT expense_id, tag_id FROM expense_tags "
+                f"WHERE expense_id IN ({', '.join('?' * len(chunk))})"
+            )
+            for expense_id, tag_id in conn.execute(query, chunk):
+                tags.setdefault(expense_id, []).append(name_from_id[tag_id])
+        return tags
 
     def get_over(self, upper: int, limit: int = 100) -> list[Expense]:
         """Get all expenses over a specified amount."""
 
-        self.c.execute(
-            "SELECT * FROM expenses WHERE cost > :upper LIMIT :limit",
-            {"upper": upper, "limit": limit},
-        )
-        return [self.convert_to_object(expense) for expense in self.c.fetchall()]
+        return self._query(queries.GET_OVER, {"upper": upper, "limit": limit})
+
+    def get_total(self, currency: Optional[str] = None) -> float:
+        """Query database for sum total of expenses, in yen or 'currency'."""
+
+        with self.pool.reading() as conn:
+            if currency is None or currency == BASE_CURRENCY:
+                return rollups.total(conn)
+            return reports.total(conn, currency=currency, rates=self.rates)
 
-    def get_total(self) -> int:
-        """Query database for sum total of expenses."""
+    def load_exchange_rates(self, path: str) -> int:
+        """Load a date,currency,rate CSV file and return how many rates it had."""
 
-        self.c.execute("SELECT SUM(cost) FROM expenses")
-        return self.c.fetchone()[0]
+        with self.pool.writing() as conn:
+            count = currency.load_csv(conn, path)
+        self.rates.clear()
+        return count
+
+    def convert(
+        self,
+        amount: float,
+        source: str,
+        target: str = BASE_CURRENCY,
+        date: Optional[DateLike] = None,
+    ) -> float:
+        """Convert 'amount' between currencies at the rate for 'date' (today)."""
+
+        day = normalize_date(date or datetime.date.today())
+        with self.pool.reading() as conn:
+            return amount * self.rates.factor(conn, source, target, day)
+
+    def get_month_totals(self) -> list[tuple[str, int, int]]:
+        """Query rollups for (month, total, count) of every month."""
+
+        with self.pool.reading() as conn:
+            return rollups.month_totals(conn)
+
+    def get_month_tag_totals(self, month: str, year: str) -> list[tuple[str, int, int]]:
+        """Query rollups for (tag, total, count) within a given month."""
+
+        start, _ = month_bounds(normalize_year(year), int(month))
+        with self.pool.reading() as conn:
+            return rollups.tag_totals(conn, start[:7])
 
     def convert_to_object(self, record: list) -> Expense:
         """Converts database record into an Expense object."""
-        id, date, name, cost, _ = record
-        print(id, name, date, cost)
-        tags = self.get_expense_tags(id)
-        return Expense(id, name, cost, tags, date)
-
-    # def create_report(self):
-    #     self.c.execute(
-    #         "SELECT tags, SUM(cost), COUNT(*) FROM expenses WHERE date >= date_sub(CURRENT_TIMESTAMP, INTERVAL 30 DAY) GROUP BY tags"
-    #     )
-    #     raws = self.c.fetchall()
-    #     categories = []
-    #     for category in raws:
-    #         categories.append(
-    #             {
-    #                 "category": category[0],
-    #                 "cost": round(category[1]),
-    #                 "count": category[2],
-    #             }
-    #         )
-
-    #     self.c.execute(
-    #         "SELECT SUM(cost) FROM expenses WHERE date >= date_sub(CURRENT_TIMESTAMP, INTERVAL 30 DAY)"
-    #     )
-    #     sum: int = round(self.c.fetchone()[0])
-
-    #     return {"categories": categories, "total": sum}
-
-    def add_expense(self, expense: Expense):
-        insert_query = (
-            "INSERT INTO expenses(name, cost, date) VALUES (:name, :cost, :date)"
-        )
-        expense_info = {
+
+        return self.convert_to_objects([record])[0]
+
+    def convert_to_objects(self, records: list) -> list[Expense]:
+        """Converts database records into Expense objects with one tag query.
+
+        Records hold the columns of queries.EXPENSE_COLUMNS, in that order.
+        """
+
+        with self.pool.reading() as conn:
+            return self._to_objects(conn, records)
+
+    def _query(self, query: str, parameters: dict) -> list[Expense]:
+        """Run an expenses query and hydrate the rows from the same snapshot."""
+
+        with self.pool.reading() as conn:
+            return self._to_objects(conn, conn.execute(query, parameters).fetchall())
+
+    def _to_objects(self, conn: sqlite3.Connection, records: list) -> list[Expense]:
+        tags = self._tags_for(conn, [record[0] for record in records])
+        return [
+            Expense(id, name, cost, tags.get(id, []), date, original_amount, currency)
+            for id, date, name, cost, original_amount, currency in records
+        ]
+
+    def create_report(self, days: int = 30, currency: Optional[str] = None) -> dict:
+        """Summarize spending per tag over the last 'days' days.
+
+        Costs are whole yen, or amounts in 'currency' rounded to cents.
+        """
+
+        start = datetime.date.today() - datetime.timedelta(days=days)
+        digits = None if currency is None or currency == BASE_CURRENCY else 2
+        options = {"currency": currency, "rates": self.rates}
+        with self.pool.reading() as conn:
+            categories = [
+                {
+                    "category": row.key,
+                    "cost": round(row.total, digits),
+                    "count": row.count,
+                }
+                for row in reports.by_tag(conn, start, **options)
+            ]
+            total = round(reports.total(conn, start, **options), digits)
+        return {"categories": categories, "total": total}
+
+    def add_expense(
+        self,
+        expense: Expense,
+        on_duplicate: Union[OnDuplicate, str] = OnDuplicate.ALLOW,
+    ) -> int:
+        """Insert an expense with its tags and return its new id.
+
+        'on_duplicate' decides what happens when an expense with the same
+        date, name and cost is already stored; see OnDuplicate.
+        """
+
+        on_duplicate = OnDuplicate(on_duplicate)
+        with self.pool.writing() as conn:
+            expense_info = self._columns(conn, expense)
+            if on_duplicate is not OnDuplicate.ALLOW:
+                existing = conn.execute(
+                    "SELECT id FROM expenses WHERE fingerprint = :fingerprint "
+                    "LIMIT 1",
+                    expense_info,
+                ).fetchone()
+                if existing is not None:
+                    if on_duplicate is OnDuplicate.SKIP:
+                        return existing[0]
+                    if on_duplicate is OnDuplicate.RAISE:
+                        raise DuplicateExpenseError(existing[0])
+                    logger.warning(
+                        "%r duplicates expense %d", expense, existing[0]
+                    )
+            expense_id = conn.execute(
+                f"INSERT INTO expenses ({COLUMNS}) VALUES ({PARAMETERS})",
+                expense_info,
+            ).lastrowid
+
+            conn.executemany(
+                queries.INSERT_EXPENSE_TAG,
+                [
+                    {"expense_id": expense_id, "tag_id": tag_id}
+                    for tag_id in self._tag_ids(expense.tags)
+                ],
+            )
+        return expense_id
+
+    def add_expenses(
+        self,
+        expenses: Iterable[Expense],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        create_tags: bool = False,
+        on_duplicate: Union[OnDuplicate, str] = OnDuplicate.ALLOW,
+    ) -> int:
+        """Insert many expenses in one transaction and return how many were added.
+
+        Rows are consumed lazily and written with executemany 'batch_size' at a
+        time, so arbitrarily long iterables can be imported in bounded memory.
+        Nothing is committed unless every row is inserted. Unknown tag names
+        raise KeyError unless 'create_tags' is set.
+
+        'on_duplicate' applies to rows matching expenses stored before the
+        import; each stored expense matches one imported row at most, so
+        purchases that really were made twice survive re-importing a file.
+        """
+
+        on_duplicate = OnDuplicate(on_duplicate)
+        added = 0
+        flagged = 0
+        iterator = iter(expenses)
+        try:
+            with self.pool.writing() as conn, self._triggers_suspended(conn):
+                next_id = first_id = conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) + 1 FROM expenses"
+                ).fetchone()[0]
+                # Stored ids per fingerprint that imported rows may still match.
+                stored: dict[int, list[int]] = {}
+                while batch := list(islice(iterator, batch_size)):
+                    rows = [
+                        (expense, self._columns(conn, expense)) for expense in batch
+                    ]
+                    if on_duplicate is not OnDuplicate.ALLOW:
+                        fingerprints = [columns["fingerprint"] for _, columns in rows]
+                        duplicates = self._match_stored(
+                            conn, fingerprints, first_id, stored, on_duplicate
+                        )
+                        flagged += len(duplicates)
+                        if on_duplicate is OnDuplicate.SKIP:
+                            keep = [
+                                index not in duplicates for index in range(len(rows))
+                            ]
+                            rows = list(compress(rows, keep))
+                            if not rows:
+                                continue
+                    self._insert_batch(conn, rows, next_id, create_tags)
+                    last_id = next_id + len(rows) - 1
+                    rollups.add_range(conn, next_id, last_id)
+                    fulltext.index_range(conn, next_id, last_id)
+                    next_id = last_id + 1
+                    added += len(rows)
+        except Exception:
+            # Tags created during a rolled-back import no longer exist.
+            self._lookup = None
+            raise
+        if flagged and on_duplicate is OnDuplicate.FLAG:
+            logger.warning("Imported %d duplicates of stored expenses", flagged)
+        return added
+
+    def _columns(self, conn: sqlite3.Connection, expense: Expense) -> dict:
+        """Return the values stored for an expense, keyed by column.
+
+        An expense paid in another currency needs its original_amount; a cost
+        of None is that amount converted at the rate for its date, and a
+        given cost, such as one from an export, is kept. Its fingerprint
+        uses the amount paid, so reloaded rates do not hide duplicates.
+        """
+
+        date = normalize_date(expense.date)
+        code = expense.currency
+        if code is None or code == BASE_CURRENCY:
+            return {
+                "date": date,
+                "name": expense.name,
+                "cost": expense.cost,
+                "original_amount": None,
+                "currency": None,
+                "fingerprint": dedup.fingerprint(date, expense.name, expense.cost),
+            }
+        if expense.original_amount is None:
+            raise ValueError(f"{expense!r} in {code} has no original_amount")
+        amount = float(expense.original_amount)
+        cost = expense.cost
+        if cost is None:
+            cost = round(amount * self.rates.rate(conn, code, date))
+        return {
+            "date": date,
             "name": expense.name,
-            "cost": expense.cost,
-            "date": expense.date,
+            "cost": cost,
+            "original_amount": amount,
+            "currency": code,
+            "fingerprint": dedup.fingerprint(date, expense.name, amount, code),
         }
-        self.c.execute(insert_query, expense_info)
-        expense_id = self.c.lastrowid
-
-        tags = expense.tags.split(", ")
-        for tag in tags:
-            tag_id = self.lookup[Lookup.ID_FROM_NAME][tag]
-            self.c.execute(
-                "INSERT INTO expense_tags VALUES (:expense_id, :tag_id)",
-                {"expense_id": expense_id, "tag_id": tag_id},
+
+    def _match_stored(
+        self,
+        conn: sqlite3.Connection,
+        fingerprints: list[int],
+        before_id: int,
+        stored: dict[int, list[int]],
+        on_duplicate: OnDuplicate,
+    ) -> set[int]:
+        """Return the indexes of 'fingerprints' that match a stored expense.
+
+        Only expenses with ids below 'before_id' count as stored. 'stored'
+        holds their unmatched ids per fingerprint, is filled on first sight of
+        a fingerprint and loses one id per match.
+        """
+
+        new = list({key for key in fingerprints if key not in stored})
+        for key in new:
+            stored[key] = []
+        # One parameter is taken by :before.
+        step = MAX_QUERY_PARAMETERS - 1
+        for start in range(0, len(new), step):
+            chunk = new[start : start + step]
+            keys, names = queries.in_list("fingerprint", len(chunk))
+            query = (
+                f"SELECT fingerprint, id FROM expenses WHERE fingerprint IN {keys} "
+                "AND id < :before ORDER BY id DESC"
             )
-        self.conn.commit()
+            parameters = {"before": before_id, **dict(zip(names, chunk))}
+            for key, id in conn.execute(query, parameters):
+                stored[key].append(id)
+
+        duplicates = set()
+        for index, key in enumerate(fingerprints):
+            if stored[key]:
+                existing = stored[key].pop()
+                if on_duplicate is OnDuplicate.RAISE:
+                    raise DuplicateExpenseError(existing)
+                duplicates.add(index)
+        return duplicates
+
+    def _insert_batch(
+        self,
+        conn: sqlite3.Connection,
+        rows: list[tuple[Expense, dict]],
+        first_id: int,
+        create_tags: bool,
+    ) -> None:
+        """Insert (expense, _columns) rows with consecutive ids from 'first_id'."""
+
+        expense_rows = []
+        tag_rows = []
+        for expense_id, (expense, columns) in enumerate(rows, start=first_id):
+            expense_rows.append({"id": expense_id, **columns})
+            for tag_id in self._tag_ids(expense.tags, create_tags):
+                tag_rows.append((expense_id, tag_id))
+
+        conn.executemany(
+            f"INSERT INTO expenses (id, {COLUMNS}) VALUES (:id, {PARAMETERS})",
+            expense_rows,
+        )
+        conn.executemany("INSERT INTO expense_tags VALUES (?, ?)", tag_rows)
+
+    @contextmanager
+    def _triggers_suspended(self, conn: sqlite3.Connection) -> Iterator[None]:
+        """Drop the expense write triggers for the rest of the transaction.
+
+        Bulk writers use this to replace per-row trigger work with set-based
+        upkeep of the rollup and search tables. The triggers are recreated when
+        the block finishes; if it fails, rolling back the transaction restores
+        them along with everything else.
+        """
+
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        triggers = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name IN ('expenses', 'expense_tags')"
+        ).fetchall()
+        for name, _ in triggers:
+            conn.execute(f'DROP TRIGGER "{name}"')
+        yield
+        for _, sql in triggers:
+            conn.execute(sql)
+
+    def add_tag(self, name: str) -> int:
+        """Insert a tag if it is new and return its id."""
+
+        id_from_name = self.lookup[Lookup.ID_FROM_NAME]
+        with self.pool.writing() as conn:
+            if name not in id_from_name:
+                tag_id = conn.execute(queries.INSERT_TAG, {"name": name}).lastrowid
+                self.lookup[Lookup.NAME_FROM_ID][tag_id] = name
+                id_from_name[name] = tag_id
+        return id_from_name[name]
+
+    def _tag_ids(self, tags: Union[str, list[str]], create: bool = False) -> list[int]:
+        """Resolve a ", "-separated string or list of tag names to tag ids.
+
+        A name given more than once is resolved once, so no write path links
+        an expense to the same tag twice.
+        """
+
+        if isinstance(tags, str):
+            tags = tags.split(", ") if tags else []
+        tags = list(dict.fromkeys(tags))
+        if create:
+            return [self.add_tag(tag) for tag in tags]
+        return [self.lookup[Lookup.ID_FROM_NAME][tag] for tag in tags]
@@ -0,0 +1,201 @@
+"""Materialized month and month x tag totals.
+
+The rollup tables are created by migration 4 and maintained by triggers on
+expenses and expense_tags, so they are only rebuilt here when verification
+finds drift (for example after editing the file with another tool).
+
+Usage from the project root: python -m repository.rollups verify|rebuild [DB_PATH]
+"""
+import sqlite3
+import sys
+from typing import NamedTuple, Optional
+
+from repository.migrations import migrate
+
+# Floating point costs from legacy imports can differ in the last bits
+# depending on the order they were added in.
+TOLERANCE = 1e-6
+
+RECOMPUTE_MONTHS = (
+    "SELECT IFNULL(substr(date, 1, 7), ''), TOTAL(cost), COUNT(*) "
+    "FROM expenses GROUP BY 1"
+)
+RECOMPUTE_MONTH_TAGS = (
+    "SELECT IFNULL(substr(expenses.date, 1, 7), ''), expense_tags.tag_id, "
+    "TOTAL(expenses.cost), COUNT(*) "
+    "FROM expenses "
+    "INNER JOIN expense_tags ON expenses.id = expense_tags.expense_id "
+    "GROUP BY 1, 2"
+)
+
+
+class Mismatch(NamedTuple):
+    """A rollup row that disagrees with a full recompute."""
+
+    table: str
+    key: tuple
+    stored: Optional[tuple]
+    expected: Optional[tuple]
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Recompute both rollup tables from scratch in one transaction."""
+
+    with conn:
+        conn.execute("DELETE FROM rollup_months")
+        conn.execute("DELETE FROM rollup_month_tags")
+        conn.execute(f"INSERT INTO rollup_months {RECOMPUTE_MONTHS}")
+        conn.execute(f"INSERT INTO rollup_month_tags {RECOMPUTE_MONTH_TAGS}")
+
+
+def add_range(conn: sqlite3.Connection, first_id: int, last_id: int) -> None:
+    """Fold expenses with ids in [first_id, last_id] into the rollups at once.
+
+    Used by bulk inserts, which load rows with the per-row triggers suspended.
+    """
+
+    parameters = {"first": first_id, "last": last_id}
+    conn.execute(
+        "INSERT INTO rollup_months (month, total, count) "
+        "SELECT IFNULL(substr(date, 1, 7), ''), TOTAL(cost), COUNT(*) "
+        "FROM expenses WHERE id BETWEEN :first AND :last GROUP BY 1 "
+        "ON CONFLICT (month) DO UPDATE "
+        "SET total = total + excluded.total, count = count + excluded.count",
+        parameters,
+    )
+    conn.execute(
+        "INSERT INTO rollup_month_tags (month, tag_id, total, count) "
+        "SELECT IFNULL(substr(expenses.date, 1, 7), ''), expense_tags.tag_id, "
+        "TOTAL(expenses.cost), COUNT(*) "
+        "FROM expenses "
+        "INNER JOIN expense_tags ON expenses.id = expense_tags.expense_id "
+        "WHERE expenses.id BETWEEN :first AND :last GROUP BY 1, 2 "
+        "ON CONFLICT (month, tag_id) DO UPDATE "
+        "SET total = total + excluded.total, count = count + excluded.count",
+        parameters,
+    )
+
+
+def add_selected(
+    conn: sqlite3.Connection, table: str, sign: int = 1, months: bool = True
+) -> None:
+    """Fold the expenses whose ids are in 'table' into the rollups at once.
+
+    With 'sign' -1 they are taken out instead, and with 'months' False only
+    the month x tag rollups change. Used by set-based deletes and retags,
+    which run with the per-row triggers suspended.
+    """
+
+    selected = f"expenses.id IN (SELECT id FROM {table})"
+    parameters = {"sign": sign}
+    if months:
+        conn.execute(
+            "INSERT INTO rollup_months (month, total, count) "
+            "SELECT IFNULL(substr(date, 1, 7), ''), :sign * TOTAL(cost), "
+            f":sign * COUNT(*) FROM expenses WHERE {selected} GROUP BY 1 "
+            "ON CONFLICT (month) DO UPDATE "
+            "SET total = total + excluded.total, count = count + excluded.count",
+            parameters,
+        )
+        conn.execute("DELETE FROM rollup_months WHERE count = 0")
+    conn.execute(
+        "INSERT INTO rollup_month_tags (month, tag_id, total, count) "
+        "SELECT IFNULL(substr(expenses.date, 1, 7), ''), expense_tags.tag_id, "
+        ":sign * TOTAL(expenses.cost), :sign * COUNT(*) "
+        "FROM expenses "
+        "INNER JOIN expense_tags ON expenses.id = expense_tags.expense_id "
+        f"WHERE {selected} GROUP BY 1, 2 "
+        "ON CONFLICT (month, tag_id) DO UPDATE "
+        "SET total = total + excluded.total, count = count + excluded.count",
+        parameters,
+    )
+    conn.execute("DELETE FROM rollup_month_tags WHERE count = 0")
+
+
+def verify(conn: sqlite3.Connection) -> list[Mismatch]:
+    """Compare the rollup tables with a full recompute and list differences."""
+
+    mismatches = []
+    for table, stored_query, expected_query, key_length in (
+        (
+            "rollup_months",
+            "SELECT month, total, count FROM rollup_months",
+            RECOMPUTE_MONTHS,
+            1,
+        ),
+        (
+            "rollup_month_tags",
+            "SELECT month, tag_id, total, count FROM rollup_month_tags",
+            RECOMPUTE_MONTH_TAGS,
+            2,
+        ),
+    ):
+        stored = {
+            tuple(row[:key_length]): tuple(row[key_length:])
+            for row in conn.execute(stored_query)
+        }
+        expected = {
+            tuple(row[:key_length]): tuple(row[key_length:])
+            for row in conn.execute(expected_query)
+        }
+        for key in stored.keys() | expected.keys():
+            if not _matches(stored.get(key), expected.get(key)):
+                mismatches.append(
+                    Mismatch(table, key, stored.get(key), expected.get(key))
+                )
+    return mismatches
+
+
+def _matches(stored: Optional[tuple], expected: Optional[tuple]) -> bool:
+    if stored is None or expected is None:
+        return stored == expected
+    (stored_total, stored_count), (expected_total, expected_count) = stored, expected
+    return (
+        stored_count == expected_count
+        and abs(stored_total - expected_total) <= TOLERANCE
+    )
+
+
+def total(conn: sqlite3.Connection) -> int:
+    """Sum of every expense, read from one row per month."""
+
+    query = "SELECT COALESCE(SUM(total), 0) FROM rollup_months"
+    return conn.execute(query).fetchone()[0]
+
+
+def month_totals(conn: sqlite3.Connection) -> list[tuple[str, int, int]]:
+    """Return (month, total, count) for every month with expenses."""
+
+    query = "SELECT month, total, count FROM rollup_months ORDER BY month"
+    return conn.execute(query).fetchall()
+
+
+def tag_totals(conn: sqlite3.Connection, month: str) -> list[tuple[str, int, int]]:
+    """Return (tag name, total, count) for a "YYYY-MM" month."""
+
+    query = (
+        "SELECT tags.name, rollup_month_tags.total, rollup_month_tags.count "
+        "FROM rollup_month_tags "
+        "INNER JOIN tags ON rollup_month_tags.tag_id = tags.id "
+        "WHERE rollup_month_tags.month = :month "
+        "ORDER BY rollup_month_tags.total DESC"
+    )
+    return conn.execute(query, {"month": month}).fetchall()
+
+
+def main(argv: list[str]) -> int:
+    """Verify or rebuild the rollups of the database named on the command line."""
+
+    conn = sqlite3.connect(argv[2] if len(argv) > 2 else "expenses.db")
+    migrate(conn)
+    if argv[1] == "rebuild":
+        rebuild(conn)
+    mismatches = verify(conn)
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"{len(mismatches)} mismatched rollup rows")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
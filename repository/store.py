@@ -0,0 +1,183 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Union
+
+from entities.expense import Expense
+from repository import queries
+from repository.backends import Backend
+from repository.dates import DateLike, month_bounds, normalize_date, normalize_year
+
+# Matches Repository's limit for SQLite builds before 3.32.
+MAX_QUERY_PARAMETERS = 999
+
+
+class ExpenseStore:
+    """The core expense reads and writes on any Backend.
+
+    This covers what a service such as the Lambda handler needs, using only the
+    shared queries, so the same logic runs on SQLite and MySQL. The desktop
+    Repository adds the SQLite-only rollups, search and bulk paths on top of
+    the same schema. Every call reuses the backend's kept-open connection.
+    """
+
+    def __init__(self, backend: Backend) -> None:
+        self.backend = backend
+
+    def close(self) -> None:
+        """Close the backend's connection."""
+
+        self.backend.close()
+
+    @contextmanager
+    def _cursor(self, commit: bool = False) -> Iterator[Any]:
+        """Yield a cursor, committing writes or rolling them back on error.
+
+        Reads end their transaction too: MySQL opens one on the first SELECT
+        and keeps its snapshot until it ends, so a kept-open connection would
+        otherwise never see later writes.
+        """
+
+        conn = self.backend.connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _execute(self, cursor: Any, query: str, parameters: dict) -> Any:
+        cursor.execute(self.backend.prepare(query), parameters)
+        return cursor
+
+    def _query(self, query: str, parameters: dict) -> list[Expense]:
+        with self._cursor() as cursor:
+            records = self._execute(cursor, query, parameters).fetchall()
+            return self._to_objects(cursor, records)
+
+    def _to_objects(self, cursor: Any, records: list) -> list[Expense]:
+        tags = self._tags_for(cursor, [record[0] for record in records])
+        return [
+            Expense(id, name, cost, tags.get(id, []), date, original_amount, currency)
+            for id, date, name, cost, original_amount, currency in records
+        ]
+
+    def _tags_for(self, cursor: Any, expense_ids: list[int]) -> dict[int, list[str]]:
+        tags: dict[int, list[str]] = {}
+        for start in range(0, len(expense_ids), MAX_QUERY_PARAMETERS):
+            chunk = expense_ids[start : start + MAX_QUERY_PARAMETERS]
+            query, names = queries.tag_names_for(len(chunk))
+            self._execute(cursor, query, dict(zip(names, chunk)))
+            for expense_id, name in cursor.fetchall():
+                tags.setdefault(expense_id, []).append(name)
+        return tags
+
+    # Reads
+
+    def get_limit(self, limit: int = 10) -> list[Expense]:
+        """Query for the 'limit' most recently added expenses."""
+
+        return self._query(queries.GET_LIMIT, {"limit": limit})
+
+    def order_by_price(self, limit: int = 100) -> list[Expense]:
+        """Query for a list of expenses ordered by cost."""
+
+        return self._query(queries.ORDER_BY_PRICE, {"limit": limit})
+
+    def get_over(self, upper: int, limit: int = 100) -> list[Expense]:
+        """Get expenses over a specified amount."""
+
+        return self._query(queries.GET_OVER, {"upper": upper, "limit": limit})
+
+    def get_tag(self, tag: str, limit: int = 100) -> list[Expense]:
+        """Query for a list of expenses with a given tag."""
+
+        return self._query(queries.GET_TAG, {"tag": tag, "limit": limit})
+
+    def get_range(self, start: DateLike, end: DateLike) -> list[Expense]:
+        """Query for expenses from 'start' up to but excluding 'end'."""
+
+        parameters = {"start": normalize_date(start), "end": normalize_date(end)}
+        return self._query(queries.GET_RANGE, parameters)
+
+    def get_month(self, month: str, year: str) -> list[Expense]:
+        """Query for expenses on a given month."""
+
+        return self.get_range(*month_bounds(normalize_year(year), int(month)))
+
+    def get_expense(self, expense_id: int) -> Optional[Expense]:
+        """Query for one expense, or None if it does not exist."""
+
+        expenses = self._query(queries.GET_EXPENSE, {"id": expense_id})
+        return expenses[0] if expenses else None
+
+    def get_total(self) -> Union[int, float]:
+        """Query for the sum total of expenses.
+
+        MySQL sums to DECIMAL, which the driver returns as decimal.Decimal, so
+        the total is converted to an int, or a float for fractional costs.
+        """
+
+        with self._cursor() as cursor:
+            total = self._execute(cursor, queries.GET_TOTAL, {}).fetchone()[0]
+        return int(total) if total == int(total) else float(total)
+
+    # Writes
+
+    def add_expense(self, expense: Expense) -> int:
+        """Insert an expense with its tags and return its new id.
+
+        Unknown tag names raise KeyError, as in Repository.
+        """
+
+        tags = expense.tags
+        if isinstance(tags, str):
+            tags = tags.split(", ") if tags else []
+        parameters = {
+            "name": expense.name,
+            "cost": expense.cost,
+            "date": normalize_date(expense.date),
+        }
+        with self._cursor(commit=True) as cursor:
+            tag_ids = self._tag_ids(cursor, tags)
+            expense_id = self._execute(
+                cursor, queries.INSERT_EXPENSE, parameters
+            ).lastrowid
+            for tag_id in tag_ids:
+                self._execute(
+                    cursor,
+                    queries.INSERT_EXPENSE_TAG,
+                    {"expense_id": expense_id, "tag_id": tag_id},
+                )
+        return expense_id
+
+    def remove_expense(self, expense: Union[Expense, int]) -> None:
+        """Remove an expense and its tag links."""
+
+        parameters = {"key": getattr(expense, "key", expense)}
+        with self._cursor(commit=True) as cursor:
+            self._execute(cursor, queries.DELETE_EXPENSE, parameters)
+            self._execute(cursor, queries.DELETE_EXPENSE_TAGS, parameters)
+
+    def add_tag(self, name: str) -> int:
+        """Insert a tag if it is new and return its id."""
+
+        with self._cursor(commit=True) as cursor:
+            existing = self._tag_ids_known(cursor, [name])
+            if existing:
+                return existing[name]
+            return self._execute(cursor, queries.INSERT_TAG, {"name": name}).lastrowid
+
+    def _tag_ids(self, cursor: Any, tags: list[str]) -> list[int]:
+        tags = list(dict.fromkeys(tags))
+        id_from_name = self._tag_ids_known(cursor, tags) if tags else {}
+        return [id_from_name[tag] for tag in tags]
+
+    def _tag_ids_known(self, cursor: Any, tags: list[str]) -> dict[str, int]:
+        query, names = queries.tag_ids_for(len(tags))
+        self._execute(cursor, query, dict(zip(names, tags)))
+        return dict(cursor.fetchall())
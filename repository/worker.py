@@ -0,0 +1,130 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Union
+
+from repository.repository import Repository
+
+Call = Union[str, Callable[[Repository], Any]]
+
+
+class RepositoryWorker:
+    """Run Repository calls on a background thread so the Tk loop never waits.
+
+    The worker thread opens its own Repository and executes submitted calls
+    in order, so slow queries never run on the Tk thread. Callbacks are handed
+    back to the Tk thread by polling with root.after, so they may safely touch
+    widgets.
+    """
+
+    def __init__(
+        self, root: tk.Misc, poll_interval: int = 20, **repository_options: Any
+    ) -> None:
+        """Start the worker thread and begin polling for finished calls."""
+
+        self.root = root
+        self.poll_interval = poll_interval
+        self._repository: Optional[Repository] = None
+        self._open_error: Optional[BaseException] = None
+        self._ready = threading.Event()
+        self._requests: queue.Queue = queue.Queue()
+        self._finished: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(repository_options,),
+            name="repository-worker",
+            daemon=True,
+        )
+        self._thread.start()
+        self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def submit(
+        self,
+        call: Call,
+        *args: Any,
+        callback: Optional[Callable[[Any], None]] = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Queue a Repository method name or a function of the Repository.
+
+        'callback' receives the result on the Tk thread. If the call fails,
+        the error is raised on the Tk thread instead, where Tk reports it like
+        any other callback error.
+        """
+
+        future: Future = Future()
+        self._requests.put((future, call, args, kwargs, callback))
+        return future
+
+    @property
+    def repository(self) -> Repository:
+        """Wait until the worker's Repository is open and return it.
+
+        Only read-only state such as 'lookup' should be used from other
+        threads; queries must go through submit.
+        """
+
+        self._ready.wait()
+        if self._repository is None:
+            raise RuntimeError("Repository failed to open") from self._open_error
+        return self._repository
+
+    @property
+    def lookup(self) -> dict:
+        """Tag lookup tables of the worker's Repository."""
+
+        return self.repository.lookup
+
+    def close(self) -> None:
+        """Finish queued calls, stop the thread and stop polling."""
+
+        self._requests.put(None)
+        self._thread.join()
+        try:
+            self.root.after_cancel(self._poll_id)
+        except tk.TclError:
+            # The window was already destroyed, taking its timers with it.
+            pass
+
+    def _run(self, repository_options: dict) -> None:
+        """Open the Repository and serve queued calls until closed."""
+
+        try:
+            self._repository = Repository(**repository_options)
+        except BaseException as error:
+            self._open_error = error
+        finally:
+            self._ready.set()
+
+        while (request := self._requests.get()) is not None:
+            future, call, args, kwargs, callback = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                repository = self.repository
+                if isinstance(call, str):
+                    result = getattr(repository, call)(*args, **kwargs)
+                else:
+                    result = call(repository, *args, **kwargs)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            self._finished.put((future, callback))
+
+        if self._repository is not None:
+            self._repository.close()
+
+    def _poll(self) -> None:
+        """Deliver finished calls to their callbacks on the Tk thread."""
+
+        self._poll_id = self.root.after(self.poll_interval, self._poll)
+        while True:
+            try:
+                future, callback = self._finished.get_nowait()
+            except queue.Empty:
+                return
+            result = future.result()
+            if callback is not None:
+                callback(result)